@@ -0,0 +1,90 @@
+from __future__ import annotations
+from typing import List, Tuple
+import argparse
+import os
+import py_compile
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipapp
+
+from revenger.domain.logger import Logger
+
+SOURCE_DIR: str = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_NAME: str = 'revenger'
+MAIN_FUNCTION: str = 'revenger.cli:main'
+# Modules a python source run must not load when the CLI starts: they are imported by the runs using them
+LAZY_MODULE_NAMES: List[str] = ['yaml', 'pprint', 'subprocess', 'numpy', 'sqlite3', 'zipfile', \
+    'revenger.infrastructure.yaml_adapter', 'revenger.infrastructure.python_adapter', 'revenger.infrastructure.svg_renderer', \
+    'revenger.infrastructure.render_pipeline', 'revenger.infrastructure.output_store', 'revenger.infrastructure.checkpoint', \
+    'revenger.services.application_service', 'revenger.services.shard_service', 'revenger.domain.navigation_index', \
+    'revenger.domain.dependency_graph', 'revenger.domain.slice_engine', 'revenger.domain.diagram_budget', 'revenger.domain.hub_classes']
+IMPORT_RUN_COUNT: int = 5
+
+def copy_sources(build_dir: str) -> None:
+    shutil.copytree(os.path.join(SOURCE_DIR, PACKAGE_NAME), os.path.join(build_dir, PACKAGE_NAME), \
+        ignore=shutil.ignore_patterns('__pycache__', '*.pyc', '*.txt'))
+
+def compile_sources(build_dir: str, logger: Logger) -> None:
+    # zipimport only loads byte code stored next to the sources (not in __pycache__): without it, every module is compiled
+    # at each start. Unchecked hashes are used as the sources of an archive never change; another python version compiles the sources.
+    for directory, _, file_names in os.walk(build_dir):
+        for file_name in file_names:
+            if file_name.endswith('.py'):
+                source_file_name: str = os.path.join(directory, file_name)
+                py_compile.compile(source_file_name, cfile=source_file_name + 'c', doraise=True, \
+                    invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+                logger.log_info(f'Compiled {os.path.relpath(source_file_name, build_dir)}')
+
+def measure_import(path: str) -> Tuple[float, List[str]]:
+    # Time to import the CLI in a fresh interpreter and the modules it loaded
+    code: str = f'import sys, time; sys.path.insert(0, {path!r}); start = time.perf_counter(); import revenger.cli; ' + \
+        'print((time.perf_counter() - start) * 1000); print(" ".join(sorted(sys.modules)))'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    import_time, module_names = result.stdout.strip().split('\n')
+    return float(import_time), module_names.split(' ')
+
+def check_import_time(path: str, budget_ms: float, logger: Logger) -> bool:
+    # Best of several runs: the first one may pay for a cold file system cache
+    import_times: List[float] = []
+    for _ in range(0, IMPORT_RUN_COUNT):
+        import_time, module_names = measure_import(path)
+        import_times.append(import_time)
+    eager_module_names: List[str] = [module_name for module_name in LAZY_MODULE_NAMES if module_name in module_names]
+    if len(eager_module_names) > 0:
+        logger.log_error(f'Starting the CLI from {path} imports {", ".join(eager_module_names)}, they must be imported when needed')
+        return False
+    if min(import_times) > budget_ms:
+        logger.log_error(f'Starting the CLI from {path} takes {min(import_times):.1f} ms, more than the budget of {budget_ms} ms')
+        return False
+    logger.log_warn(f'Starting the CLI from {path} takes {min(import_times):.1f} ms (budget {budget_ms} ms)')
+    return True
+
+def build(output_file_name: str, logger: Logger) -> None:
+    with tempfile.TemporaryDirectory(prefix='revenger-zipapp-') as build_dir:
+        copy_sources(build_dir)
+        compile_sources(build_dir, logger)
+        os.makedirs(os.path.dirname(os.path.abspath(output_file_name)), exist_ok=True)
+        zipapp.create_archive(build_dir, output_file_name, interpreter='/usr/bin/env python3', main=MAIN_FUNCTION, compressed=True)
+    logger.log_warn(f'Created {output_file_name} for python {sys.version_info.major}.{sys.version_info.minor}, ' + \
+        f'run it with: python3 {output_file_name} --from_dir ... --out_dir ...')
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog=os.path.basename(sys.argv[0]), \
+        description='Build revenger as a single file zipapp with compiled byte code and check the start up time of its CLI')
+    parser.add_argument('--output', type=str, default=os.path.join('dist', 'revenger.pyz'), help='File name of the zipapp')
+    parser.add_argument('--import_budget_ms', type=float, default=150, help='Maximum time to import the CLI')
+    parser.add_argument('--check_only', action="store_true", help='Only check the start up time of the CLI from the sources')
+    parser.add_argument('--info', action="store_true", help='Set logging to info')
+    args = parser.parse_args()
+
+    logger: Logger = Logger(args.info)
+    if args.check_only:
+        exit(0 if check_import_time(SOURCE_DIR, args.import_budget_ms, logger) else 1)
+    build(args.output, logger)
+    if not check_import_time(os.path.abspath(args.output), args.import_budget_ms, logger):
+        exit(1)
+
+if __name__ == "__main__":
+    main()
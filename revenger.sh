@@ -35,6 +35,39 @@ function usage() {
     echo "               [ -d | --plantuml_install ]      Install plantuml (not graphviz however, you will have to install it yourself)"
     echo "               [ -p | --plantweb_dep_install ]  Uses plantweb server instead of local plantuml: Insecure DO NOT USE IT for sensitive data."
     echo "               [ --skip_uses_relation ]         Skip UML uses relations"
+    echo "               [ --output_format dot ]          Write Graphviz dot files rendered by a local dot instead of plantuml files"
+    echo "               [ --bundle zip|sqlite ]          Store all diagrams in one indexed container instead of loose files"
+    echo "               [ --model_store file ]           Keep the model in an on-disk sqlite database (very large code bases)"
+    echo "               [ --reuse_model_store ]          Reuse the model stored by a previous run instead of reading all source files"
+    echo "               [ --resume ]                     Continue an interrupted run instead of starting again (the output directory is kept)"
+    echo "               [ --memory_budget size|auto ]    Stay below this memory (for instance 4g, auto for the cgroup limit): caches and workers are sized for it"
+    echo "               [ --shard_dir dir ]              Shared directory holding the model shards of a multi-node run"
+    echo "               [ --ingest_shard index/count ]   Only read this share of the source files into --shard_dir (no diagram is created)"
+    echo "               [ --merge_shards ]               Build the model from the shards in --shard_dir instead of reading the source files"
+    echo "               [ --emit_shard index/count ]     Only create this share of the diagrams into a shared output directory (no svg rendering)"
+    echo "               [ --graph_report ]               Create dependency-graph-report.txt (fan-in/fan-out rankings, cycles, neighbourhoods)"
+    echo "               [ --graph_report_top n ]         Number of classes listed in the rankings of the report (default 20)"
+    echo "               [ --graph_report_hops n ]        Number of hops of the neighbourhoods of the report (default 2)"
+    echo "               [ --write_workers n ]            Threads writing diagrams while the next ones are created (default 4, 0: synchronous)"
+    echo "               [ --max_diagram_classes n ]      Diagrams with more classes are simplified, grouped per namespace or split in sheets"
+    echo "               [ --max_diagram_relations n ]    Same for diagrams with more relations"
+    echo "               [ --max_diagram_members n ]      Same for diagrams with more class members"
+    echo "               [ --hub_min_fan_in n ]           Classes referenced by at least n classes are hub classes"
+    echo "               [ --hub_classes a,b ]            Comma separated list of hub classes (for instance domain.logger.Logger)"
+    echo "               [ --hub_referrers_per_page n ]   Classes referencing a hub class shown per page of its diagrams (default 50)"
+    echo "               [ --granularity module ]         One diagram per source file instead of one diagram per class"
+    echo "               [ --slice_ancestors n ]          Hops of base classes shown in class and namespace diagrams (default 1)"
+    echo "               [ --slice_descendants n ]        Hops of derived classes shown in class and namespace diagrams (default 1)"
+    echo "               [ --slice_uses n ]               Hops of used classes (members, parameters, inner classes) shown in class and namespace diagrams (default 1)"
+    echo "               [ --slice_used_by n ]            Hops of classes using the class shown in class and namespace diagrams (default 1)"
+    echo "               [ --slice_max_classes n ]        Maximum number of classes of class and namespace diagrams"
+    echo "               [ --render_cache dir ]           svg cache shared by all runs (default \$HOME/.cache/revenger/svg)"
+    echo "               [ --render_cache_size_mb n ]     Size of the svg cache, least recently used svg files are evicted above it (default 1024)"
+    echo "               [ --no_render_cache ]            Render all puml files without using the svg cache"
+    echo "               [ --render_workers n ]           Number of plantuml processes rendering at the same time (default 1)"
+    echo "               [ --compress sidecar|svgz ]      Write .gz sidecars next to the files or replace them by svgz and puml.gz files"
+    echo "               [ --render_timeout s ]           Seconds after which a diagram not yet rendered is replaced by a placeholder"
+    echo "               [ --events file ]                Write the progress of the source analysis and diagram creation as JSON lines"
     echo "               [ --info ]                       Info logs"
     echo "               [ --debug ]                      Debug logs"
     echo "               [ --trace ]                      Trace logs"
@@ -88,6 +121,12 @@ $var_pip --version | grep python3 >/dev/null 2>&1 || error "$var_pip does not su
 
 statements=""
 keep_tmp_files=0
+resume=0
+compress=none
+bundle=
+output_format=puml
+shard=
+render_statements=""
 while [[ "$1" != "" ]]; do
     case $1 in
         --init )
@@ -144,12 +183,77 @@ while [[ "$1" != "" ]]; do
           usage;
           exit;
           ;;
-        --trace | --info | --debug | --skip_uses_relation)
+        --trace | --info | --debug | --skip_uses_relation | --graph_report)
          statements="$statements $1"
          ;;
         --keep )
           keep_tmp_files=1
           ;;
+        --render_cache )
+          shift
+          mkdir -p $1
+          render_statements="$render_statements --render_cache $(readlink -f $1)"
+          ;;
+        --render_cache_size_mb | --render_timeout | --render_workers )
+          render_statements="$render_statements $1 $2"
+          shift
+          ;;
+        --no_render_cache )
+          render_statements="$render_statements $1"
+          ;;
+        --bundle )
+          shift
+          bundle=$1
+          statements="$statements --bundle $bundle"
+          ;;
+        --output_format )
+          shift
+          output_format=$1
+          statements="$statements --output_format $output_format"
+          ;;
+        --model_store )
+          shift
+          statements="$statements --model_store $(readlink -f $1)"
+          ;;
+        --events )
+          shift
+          statements="$statements --events $(readlink -f $1)"
+          ;;
+        --reuse_model_store | --merge_shards )
+          statements="$statements $1"
+          ;;
+        --compress )
+          compress=$2
+          statements="$statements $1 $2"
+          render_statements="$render_statements $1 $2"
+          shift
+          ;;
+        --memory_budget )
+          statements="$statements $1 $2"
+          render_statements="$render_statements $1 $2"
+          shift
+          ;;
+        --resume )
+          resume=1
+          statements="$statements $1"
+          ;;
+        --shard_dir )
+          shift
+          mkdir -p $1
+          statements="$statements --shard_dir $(readlink -f $1)"
+          ;;
+        --graph_report_top | --graph_report_hops | --write_workers | \
+        --max_diagram_classes | --max_diagram_relations | --max_diagram_members | \
+        --hub_min_fan_in | --hub_classes | --hub_referrers_per_page | \
+        --granularity | --slice_ancestors | --slice_descendants | --slice_uses | --slice_used_by | --slice_max_classes )
+          statements="$statements $1 $2"
+          shift
+          ;;
+        --ingest_shard | --emit_shard )
+          statements="$statements $1 $2"
+          shard=$1
+          shift
+          ;;
         * )
           usage
           error "Parameter $1 is not know."
@@ -164,7 +268,15 @@ if [[ $force_docker_plantuml == 0 ]]; then
 else
   plantuml="docker run -v $out_dir:/data ghcr.io/plantuml/plantuml"
 fi
-if [[ $svg_dep == "secure" ]]; then
+if [[ $compress != "none" ]]; then
+  [[ $svg_dep == "secure" ]] || error "Compressed svg files can only be created with a local plantuml or dot, not with plantweb."
+  [[ -z $bundle ]] || error "--compress cannot be combined with --bundle (bundles are already indexed containers)."
+fi
+if [[ $output_format == "dot" ]]; then
+  [[ $svg_dep == "secure" ]] || error "Graphviz dot files can only be rendered with a local dot, not with plantweb."
+  dot -V > /dev/null 2>&1 || error "Graphviz dot is not accessible on your system, install graphviz to use --output_format dot."
+  render_statements="$render_statements --renderer graphviz"
+elif [[ $svg_dep == "secure" ]]; then
   $plantuml -h > /dev/null 2>&1 
   if [[ $? != 0 ]];then 
       info "$plantuml not found trying /opt/homebrew/bin/plantuml."
@@ -191,9 +303,9 @@ if [[ $svg_dep == "secure" ]]; then
   fi
 fi
 
-info "Using plantuml from $plantuml"
+[[ $output_format == "dot" ]] && info "Using Graphviz dot" || info "Using plantuml from $plantuml"
 info "Using adapter from language $from_language"
-if [[ $keep_tmp_files == 0 ]]; then
+if [[ $keep_tmp_files == 0 && -z $shard && $resume == 0 ]]; then
   info "Cleaning output directory"
   find $out_dir -type f | xargs rm -f  > /dev/null
 fi
@@ -224,13 +336,44 @@ case $from_language in
 esac
 
 
-info "Generating puml files"
-$python revenger --from_dir $from_dir --out_dir $out_dir $(echo $statements) || error "Could not process source files"
+# The revenger package is run from this directory, wherever the render stage changes to
+export PYTHONPATH=$(readlink -f .)${PYTHONPATH:+:$PYTHONPATH}
+
+# Loose puml files are rendered by the python stage while the next diagrams are created
+render_while_generating=0
+if [[ $svg_dep == "secure" && -z $bundle && -z $shard ]]; then
+  render_while_generating=1
+fi
+
+if [[ $render_while_generating == 1 ]]; then
+  info "Generating puml files and transforming them with plantuml ($plantuml)"
+  $python -m revenger --from_dir $from_dir --out_dir $out_dir $(echo $statements) \
+    --render --plantuml "$plantuml" $(echo $render_statements) || error "Could not process source files"
+else
+  info "Generating puml files"
+  $python -m revenger --from_dir $from_dir --out_dir $out_dir $(echo $statements) || error "Could not process source files"
+fi
+if [[ ! -z $shard ]]; then
+  info "Shard done ($shard): render $out_dir once all shards are done"
+  exit 0
+fi
 
 info "Transforming puml to svg"
-if [[ $svg_dep == "secure" ]]; then
+bundle_file=
+render_dir=$out_dir
+if [[ ! -z $bundle ]]; then
+  bundle_file=$out_dir/diagrams.$bundle
+  render_dir=$(mktemp -d)
+  bundle_tool="-m revenger.bundle_tool"
+  info "Extracting puml files from $bundle_file into $render_dir for rendering"
+  $python $bundle_tool extract $bundle_file $render_dir --pattern "*.$output_format" || error "Could not extract $bundle_file"
+fi
+if [[ $render_while_generating == 1 ]]; then
+    info "svg files were rendered while the puml files were generated"
+elif [[ $svg_dep == "secure" ]]; then
     info "Transforming with plantuml ($plantuml)"
-    create_svg_files "$plantuml -tsvg -progress" "$out_dir" 
+    # Identical diagrams are copied from the svg cache instead of being rendered again
+    $python -m revenger.render_tool $render_dir --plantuml "$plantuml" $(echo $render_statements) || warning "Some puml files could not be rendered"
 
 else
     wait_time=5
@@ -241,9 +384,16 @@ else
       wait_time=$((wait_time - 1));
       sleep 1;
     done
-    cd $out_dir && \
+    cd $render_dir && \
       create_svg_files "plantweb --engine=plantuml" "." 
 fi
+if [[ ! -z $bundle_file ]]; then
+  info "Packing rendered svg files into $bundle_file"
+  $python $bundle_tool pack $bundle_file $render_dir --pattern '*.svg' || error "Could not pack svg files into $bundle_file"
+  rm -rf $render_dir
+  info "Browse the diagrams with: $python $bundle_tool serve $bundle_file"
+  exit 0
+fi
 if [[ ! -z $tmp_dir ]]; then
   if [[ $keep_tmp_files == 0 ]]; then
     rm -rf $tmp_dir
@@ -251,4 +401,6 @@ if [[ ! -z $tmp_dir ]]; then
     info "Kept tmp_dir: $tmp_dir"
   fi
 fi
-$python -m webbrowser $out_dir/full-diagram-detailed.svg
+# The navigation index opens in milliseconds, unlike the full diagram of a large code base
+[[ -f $out_dir/index.html ]] && entry_point=index.html || entry_point=full-diagram-detailed.svg
+$python -m webbrowser $out_dir/$entry_point
@@ -0,0 +1,169 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+
+from revenger.domain.logger import Logger
+
+# Parsed files of the worker process, passed to each project it runs
+worker_parse_cache = None
+KEEP_OUT_DIR_OPTIONS: List[str] = ['--resume', '--ingest_shard', '--emit_shard']
+
+@dataclass
+class Project:
+    from_dir: str
+    out_dir: str
+    options: List[str]
+
+@dataclass
+class ProjectTask:
+    project_index: int
+    out_dir: str
+    clean_out_dir: bool
+    argv: List[str]
+
+@dataclass
+class ProjectResult:
+    project_index: int
+    exit_code: int
+    seconds: float
+    process_id: int
+
+def read_manifest(manifest_file_name: str) -> List[Project]:
+    # JSON lines: {"from_dir": ..., "out_dir": ..., "options": ["--render", ...]}, relative directories are relative to the manifest.
+    # Blank lines and lines starting with # are ignored.
+    manifest_dir: str = os.path.dirname(os.path.abspath(manifest_file_name))
+    projects: List[Project] = []
+    with open(manifest_file_name, 'r', encoding='utf-8') as file:
+        for line_number, line in enumerate(file, 1):
+            if len(line.strip()) == 0 or line.lstrip().startswith('#'):
+                continue
+            try:
+                entry: dict = json.loads(line)
+                projects.append(Project(os.path.join(manifest_dir, entry['from_dir']), os.path.join(manifest_dir, entry['out_dir']), \
+                    [str(option) for option in entry.get('options', [])]))
+            except (ValueError, KeyError, TypeError) as error:
+                raise ValueError(f'Invalid manifest entry line {line_number} of {manifest_file_name}: {error}')
+    return projects
+
+def has_option(options: List[str], option_name: str) -> bool:
+    return any(option == option_name or option.startswith(option_name + '=') for option in options)
+
+def get_options(project: Project, render_workers: int, render_cache: str) -> List[str]:
+    options: List[str] = list(project.options)
+    # Rendering projects share the cpus of the pool and one render cache, unless their options say otherwise
+    if has_option(options, '--render'):
+        if not has_option(options, '--render_workers'):
+            options += ['--render_workers', str(render_workers)]
+        if render_cache is not None and not has_option(options, '--render_cache') and not has_option(options, '--no_render_cache'):
+            options += ['--render_cache', render_cache]
+    return ['--from_dir', project.from_dir, '--out_dir', project.out_dir] + options
+
+def keeps_out_dir(options: List[str]) -> bool:
+    # Same rule as revenger.sh: resumed runs check the diagrams already written and shards share their output directory
+    return any(has_option(options, option_name) for option_name in KEEP_OUT_DIR_OPTIONS)
+
+def clean_out_dir(out_dir: str) -> None:
+    # Files of the previous run are removed, directories are kept
+    for directory, _, file_names in os.walk(out_dir):
+        for file_name in file_names:
+            os.remove(os.path.join(directory, file_name))
+
+def get_source_bytes(from_dir: str) -> int:
+    source_bytes: int = 0
+    for directory, _, file_names in os.walk(from_dir):
+        for file_name in file_names:
+            try:
+                source_bytes += os.path.getsize(os.path.join(directory, file_name))
+            except OSError:
+                pass
+    return source_bytes
+
+def initialize_worker(parse_cache_bytes: int) -> None:
+    # Warm workers: the modules, the interned type strings and the parsed files stay in the process for the next projects it runs
+    global worker_parse_cache
+    if parse_cache_bytes > 0:
+        from revenger.infrastructure.parse_cache import ParseCache
+        worker_parse_cache = ParseCache(parse_cache_bytes)
+
+def run_project(task: ProjectTask) -> ProjectResult:
+    from revenger.cli import main as revenger_main
+    start: float = time.perf_counter()
+    exit_code: int = 0
+    try:
+        if task.clean_out_dir:
+            clean_out_dir(task.out_dir)
+        revenger_main(argv=task.argv, parse_cache=worker_parse_cache)
+    except SystemExit as error:
+        exit_code = error.code if type(error.code) is int else (0 if error.code is None else 1)
+    except Exception:
+        # A failing project does not stop the other projects of the batch
+        Logger().log_error(f'Project {task.argv[1]} failed:\n{traceback.format_exc()}')
+        exit_code = 1
+    sys.stdout.flush()
+    return ProjectResult(task.project_index, exit_code, time.perf_counter() - start, os.getpid())
+
+def run_projects(projects: List[Project], worker_count: int, parse_cache_bytes: int, render_cache: str, \
+        logger: Logger) -> List[ProjectResult]:
+    render_workers: int = max(1, (os.cpu_count() or 1) // worker_count)
+    # Largest projects first: the small ones fill the workers at the end of the batch
+    project_indexes: List[int] = sorted(range(0, len(projects)), key=lambda project_index: -get_source_bytes(projects[project_index].from_dir))
+    tasks: List[ProjectTask] = [ProjectTask(project_index, projects[project_index].out_dir, \
+        not keeps_out_dir(projects[project_index].options), get_options(projects[project_index], render_workers, render_cache)) \
+            for project_index in project_indexes]
+    for project in projects:
+        os.makedirs(project.out_dir, exist_ok=True)
+    results: List[ProjectResult] = []
+    with multiprocessing.Pool(worker_count, initializer=initialize_worker, initargs=(parse_cache_bytes,)) as pool:
+        for result in pool.imap_unordered(run_project, tasks):
+            results.append(result)
+            logger.log_info(f'Project {projects[result.project_index].from_dir} done in {result.seconds:.2f} s (exit code {result.exit_code})')
+    return sorted(results, key=lambda result: result.project_index)
+
+def log_summary(projects: List[Project], results: List[ProjectResult], seconds: float, logger: Logger) -> None:
+    name_width: int = max([len(project.out_dir) for project in projects] + [len('Project')])
+    logger.log_warn(f'{"Project":<{name_width}}  {"Status":<8}  {"Seconds":>9}  Worker')
+    for result in results:
+        logger.log_warn(f'{projects[result.project_index].out_dir:<{name_width}}  ' + \
+            f'{"ok" if result.exit_code == 0 else "failed":<8}  {result.seconds:>9.2f}  {result.process_id}')
+    failed_count: int = len([result for result in results if result.exit_code != 0])
+    logger.log_warn(f'{len(results)} projects in {seconds:.2f} s ({sum(result.seconds for result in results):.2f} s of project time), ' + \
+        f'{failed_count} failed')
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog=os.path.basename(sys.argv[0]), \
+        description='Create the diagrams of several projects listed in a manifest with one pool of worker processes')
+    parser.add_argument('manifest', type=str, help='JSON lines file, one {"from_dir": ..., "out_dir": ..., "options": [...]} entry per project')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of worker processes, each runs one project at a time')
+    parser.add_argument('--parse_cache_mb', type=int, default=0, \
+                        help='Megabytes of parsed python files kept by each worker for the projects sharing sources (0, default, disables the cache)')
+    parser.add_argument('--render_cache', type=str, help='Directory of the svg cache used by all rendering projects without a render cache of their own')
+    parser.add_argument('--info', action="store_true", help='Set logging to info')
+    args = parser.parse_args()
+
+    logger: Logger = Logger(args.info)
+    try:
+        projects: List[Project] = read_manifest(args.manifest)
+    except (OSError, ValueError) as error:
+        logger.log_error(f'{error}! Exiting!')
+        exit(1)
+    if len(projects) == 0:
+        logger.log_error(f'No project in {args.manifest}! Exiting!')
+        exit(1)
+    if args.workers <= 0 or args.parse_cache_mb < 0:
+        parser.error('--workers must be strictly positive and --parse_cache_mb positive')
+    start: float = time.perf_counter()
+    results: List[ProjectResult] = run_projects(projects, min(args.workers, len(projects)), \
+        args.parse_cache_mb * 1024 * 1024, args.render_cache, logger)
+    log_summary(projects, results, time.perf_counter() - start, logger)
+    if any(result.exit_code != 0 for result in results):
+        exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import os
+import sys
+import fnmatch
+import argparse
+import mimetypes
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from revenger.domain.logger import Logger
+from revenger.infrastructure.generic_classes import GenericOutputStore
+from revenger.infrastructure.output_store import ZipOutputStore
+from revenger.infrastructure.output_store import SqliteOutputStore
+from revenger.infrastructure.output_store import OutputStoreFactory
+
+ENTRY_POINT: str = 'index.html'
+# Bundles created before the navigation index
+FULL_DIAGRAM_ENTRY_POINT: str = 'full-diagram-detailed.svg'
+
+def list_bundle(store: GenericOutputStore) -> None:
+    for name in store.get_names():
+        print(name)
+
+def extract_bundle(store: GenericOutputStore, to_dir: str, pattern: str, logger: Logger) -> None:
+    os.makedirs(to_dir, exist_ok=True)
+    for name in store.get_names():
+        if fnmatch.fnmatch(name, pattern):
+            logger.log_info(f'Extracting {name} into {to_dir}')
+            with open(os.path.join(to_dir, name), 'wb') as file:
+                file.write(store.read(name))
+
+def pack_directory(bundle_file_name: str, from_dir: str, pattern: str, logger: Logger) -> None:
+    store: GenericOutputStore = ZipOutputStore(bundle_file_name, keep_entries=True) if bundle_file_name.endswith('.zip') \
+        else SqliteOutputStore(bundle_file_name, keep_entries=True)
+    for name in sorted(os.listdir(from_dir)):
+        file_name: str = os.path.join(from_dir, name)
+        if os.path.isfile(file_name) and fnmatch.fnmatch(name, pattern) and not store.exists(name):
+            logger.log_info(f'Packing {file_name} into {bundle_file_name}')
+            with open(file_name, 'rb') as file:
+                store.write(name, file.read())
+    store.close()
+
+def serve_bundle(store: GenericOutputStore, port: int, logger: Logger) -> None:
+    entry_point: str = ENTRY_POINT if store.exists(ENTRY_POINT) else FULL_DIAGRAM_ENTRY_POINT
+    class BundleRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            name: str = unquote(self.path.split('?')[0]).lstrip('/')
+            if name == '':
+                self.send_response(302)
+                self.send_header('Location', f'/{entry_point}')
+                self.end_headers()
+                return
+            if not store.exists(name):
+                self.send_error(404, f'{name} is not part of the bundle')
+                return
+            content: bytes = store.read(name)
+            content_type, _ = mimetypes.guess_type(name)
+            self.send_response(200)
+            self.send_header('Content-Type', content_type if content_type is not None else 'text/plain; charset=utf-8')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format: str, *args) -> None:
+            logger.log_debug(format % args)
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), BundleRequestHandler)
+    logger.log_warn(f'Serving bundle on http://127.0.0.1:{port}/{entry_point} (ctrl-c to stop)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog=os.path.basename(sys.argv[0]), description='Read diagrams stored in a bundle created with --bundle')
+    parser.add_argument('--info', action="store_true", help='Set logging to info')
+    sub_parsers = parser.add_subparsers(dest='command', required=True)
+    list_parser = sub_parsers.add_parser('list', help='List all diagrams stored in the bundle')
+    list_parser.add_argument('bundle', type=str)
+    extract_parser = sub_parsers.add_parser('extract', help='Extract diagrams into a directory')
+    extract_parser.add_argument('bundle', type=str)
+    extract_parser.add_argument('to_dir', type=str)
+    extract_parser.add_argument('--pattern', type=str, default='*', help='Only extract names matching this pattern')
+    pack_parser = sub_parsers.add_parser('pack', help='Add files of a directory (rendered svg files for instance) to the bundle')
+    pack_parser.add_argument('bundle', type=str)
+    pack_parser.add_argument('from_dir', type=str)
+    pack_parser.add_argument('--pattern', type=str, default='*.svg', help='Only pack names matching this pattern')
+    serve_parser = sub_parsers.add_parser('serve', help='Serve the bundle over http so that [[...]] links can be followed')
+    serve_parser.add_argument('bundle', type=str)
+    serve_parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    logger: Logger = Logger(args.info)
+    if args.command == 'pack':
+        pack_directory(args.bundle, args.from_dir, args.pattern, logger)
+        return
+    store: GenericOutputStore = OutputStoreFactory.open_bundle(args.bundle)
+    if args.command == 'list':
+        list_bundle(store)
+    elif args.command == 'extract':
+        extract_bundle(store, args.to_dir, args.pattern, logger)
+    elif args.command == 'serve':
+        serve_bundle(store, args.port, logger)
+    store.close()
+
+if __name__ == "__main__":
+    main()
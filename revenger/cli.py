@@ -0,0 +1,168 @@
+from __future__ import annotations
+import os
+import sys
+import argparse
+from typing import List, TYPE_CHECKING
+
+from revenger.domain.logger import Logger
+from revenger.services.run_options import SourceType
+from revenger.services.run_options import RunOptions
+from revenger.services.run_options import OutputFormat
+from revenger.services.run_options import DiagramGranularity
+from revenger.render_tool import add_render_arguments
+from revenger.render_tool import create_renderer
+from revenger.infrastructure.generic_classes import BundleType
+from revenger.infrastructure.compressor import Compression
+
+if TYPE_CHECKING:
+    from revenger.infrastructure.parse_cache import ParseCache
+    
+
+def main(from_dir: str = None, out_dir: str = None, argv: List[str] = None, parse_cache: ParseCache = None) -> None:
+    # Console entry point of the installed package and of the zipapp, from_dir and out_dir are required options.
+    # The batch tool runs several projects in the same process with their own argv and the parse cache of the worker.
+    program_name = os.path.basename(sys.argv[0])
+    
+    # create the top-level parser
+    source_type: SourceType = SourceType.PYTHON_SOURCE
+    parser = argparse.ArgumentParser(prog=program_name)
+    parser.add_argument('--from_dir', type=str, help='Specify where to read the python files from', required=True)
+    parser.add_argument('--out_dir', type=str, help='Specify where to store all puml files', required=True)
+    parser.add_argument('--bundle', type=str, choices=[bundle_type.value for bundle_type in BundleType], default=BundleType.DIRECTORY.value, \
+                        help='Store all diagrams as loose files (directory, default) or in one indexed zip or sqlite container')
+    parser.add_argument('--model_store', type=str, help='Keep the model in this on-disk sqlite database instead of memory (for very large code bases)')
+    parser.add_argument('--reuse_model_store', action="store_true", help='Reuse the model stored by a previous run in --model_store instead of reading all source files again')
+    parser.add_argument('--ingest_shard', type=str, help='Only read the index/count share of the source files (for instance 0/4) and store it as a model shard in --shard_dir')
+    parser.add_argument('--merge_shards', action="store_true", help='Build the model from all model shards stored in --shard_dir instead of reading the source files')
+    parser.add_argument('--emit_shard', type=str, help='Only create the index/count share of the class and namespace diagrams (full diagrams are created by shard 0)')
+    parser.add_argument('--shard_dir', type=str, help='Shared directory where model shards are stored')
+    parser.add_argument('--graph_report', action="store_true", help='Create dependency-graph-report.txt with fan-in/fan-out rankings, dependency cycles and neighbourhoods')
+    parser.add_argument('--graph_report_top', type=int, default=20, help='Number of classes listed in the rankings of the dependency graph report')
+    parser.add_argument('--graph_report_hops', type=int, default=2, help='Number of hops of the neighbourhoods of the dependency graph report')
+    parser.add_argument('--write_workers', type=int, default=4, help='Number of threads writing the diagrams while the next ones are created (0 writes synchronously)')
+    parser.add_argument('--max_diagram_classes', type=int, help='Diagrams with more classes are created without members, as a namespace overview or on several sheets')
+    parser.add_argument('--max_diagram_relations', type=int, help='Diagrams with more relations are created without members, as a namespace overview or on several sheets')
+    parser.add_argument('--max_diagram_members', type=int, help='Detailed diagrams with more members are created without members (or as a namespace overview or on several sheets)')
+    parser.add_argument('--hub_min_fan_in', type=int, help='Classes referenced by at least this number of classes are hub classes')
+    parser.add_argument('--hub_classes', type=str, help='Comma separated list of hub classes (for instance domain.logger.Logger)')
+    parser.add_argument('--hub_referrers_per_page', type=int, default=50, help='Number of classes referencing a hub class shown per page of its diagrams')
+    parser.add_argument('--granularity', type=str, choices=[granularity.value for granularity in DiagramGranularity], \
+                        default=DiagramGranularity.CLASS.value, help='Create one diagram per class (class, default) or one diagram per source file (module)')
+    parser.add_argument('--slice_ancestors', type=int, default=1, help='Number of hops of base classes added to the class and namespace diagrams')
+    parser.add_argument('--slice_descendants', type=int, default=1, help='Number of hops of derived classes added to the class and namespace diagrams')
+    parser.add_argument('--slice_uses', type=int, default=1, help='Number of hops of member, parameter and inner class types added to the class and namespace diagrams')
+    parser.add_argument('--slice_used_by', type=int, default=1, help='Number of hops of classes using the class added to the class and namespace diagrams')
+    parser.add_argument('--slice_max_classes', type=int, help='Maximum number of classes of the class and namespace diagrams, the farthest and least referenced classes are cut')
+    parser.add_argument('--resume', action="store_true", help='Continue an interrupted run: the model and the completed diagrams are kept in a checkpoint of the output directory')
+    parser.add_argument('--memory_budget', type=str, help='Memory available for the run (for instance 4g, or auto for 80%% of the cgroup limit): ' + \
+                        'buffers, caches and plantuml processes are sized for it and the model is spilled to disk when it does not fit')
+    parser.add_argument('--events', type=str, help='Write the progress of the run as JSON lines into this file')
+    parser.add_argument('--events_fd', type=int, help='Write the progress of the run as JSON lines into this already opened file descriptor')
+    parser.add_argument('--output_format', type=str, choices=[output_format.value for output_format in OutputFormat], default=OutputFormat.PUML.value, \
+                        help='Write the diagrams as plantuml files (puml, default) or as Graphviz dot files rendered without plantuml (dot)')
+    parser.add_argument('--render', action="store_true", help='Render the svg files with plantuml while the next diagrams are created')
+    add_render_arguments(parser)
+    parser.add_argument('--skip_uses_relation', action="store_true", help='Do not create use relationship')
+    parser.add_argument('--info', action="store_true", help='Set logging to info')
+    parser.add_argument('--debug', action="store_true", help='Set logging to debug')
+    parser.add_argument('--trace', action="store_true", help='Set logging to trace')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--python', action='store_true', help='Use python code as source')
+    group.add_argument('--yaml', action='store_true', help='Use yaml code as source')
+    args = parser.parse_args(argv)
+    if args.write_workers < 0:
+        parser.error('--write_workers must be positive')
+    # Imported once the arguments are parsed: --help and invalid arguments do not load the services
+    from revenger.domain.datastructure import PythonLanguage
+    from revenger.domain.navigation_index import NavigationIndex
+    from revenger.services.application_service import ApplicationService
+    from revenger.services.shard_service import ShardService
+    from revenger.domain.diagram_budget import DiagramBudget
+    from revenger.domain.hub_classes import HubPolicy
+    from revenger.domain.slice_engine import SlicePolicy
+    from revenger.infrastructure.output_store import OutputStoreFactory
+    from revenger.infrastructure.output_store import OutputStoreError
+    from revenger.infrastructure.memory_budget import MemoryBudget
+    if args.from_dir: from_dir = args.from_dir
+    if args.out_dir: out_dir = args.out_dir
+    if args.yaml:
+        source_type = SourceType.YAML_SOURCE
+
+    logger: Logger = Logger(args.info, args.debug, args.trace)
+    if not from_dir.startswith('/'):
+        logger.log_error(f'Source directory ({from_dir}) is invalid, it requires an absolute path! Exiting!')
+        exit(1)
+
+    bundle_type: BundleType = BundleType(args.bundle)
+    if (args.ingest_shard is not None or args.merge_shards) and args.shard_dir is None:
+        logger.log_error('--ingest_shard and --merge_shards require --shard_dir! Exiting!')
+        exit(1)
+    if args.emit_shard is not None and bundle_type != BundleType.DIRECTORY:
+        logger.log_error('--emit_shard writes into a shared output directory and cannot be combined with --bundle! Exiting!')
+        exit(1)
+    try:
+        ingest_shard = ShardService.parse_shard(args.ingest_shard) if args.ingest_shard is not None else None
+        emit_shard = ShardService.parse_shard(args.emit_shard) if args.emit_shard is not None else None
+    except ValueError as error:
+        logger.log_error(f'{error}! Exiting!')
+        exit(1)
+    if args.hub_referrers_per_page <= 0 or (args.hub_min_fan_in is not None and args.hub_min_fan_in <= 0):
+        logger.log_error('--hub_min_fan_in and --hub_referrers_per_page must be strictly positive! Exiting!')
+        exit(1)
+    hub_policy: HubPolicy = HubPolicy(args.hub_min_fan_in, \
+        [class_name.strip() for class_name in args.hub_classes.split(',') if len(class_name.strip()) > 0] if args.hub_classes else [], \
+        args.hub_referrers_per_page)
+    if min(args.slice_ancestors, args.slice_uses, args.slice_descendants, args.slice_used_by) < 0 or \
+            (args.slice_max_classes is not None and args.slice_max_classes <= 0):
+        logger.log_error('--slice_* hops must be positive and --slice_max_classes strictly positive! Exiting!')
+        exit(1)
+    slice_policy: SlicePolicy = SlicePolicy(args.slice_ancestors, args.slice_uses, args.slice_descendants, args.slice_used_by, \
+        args.slice_max_classes)
+    output_format: OutputFormat = OutputFormat(args.output_format)
+    # dot files are rendered by Graphviz
+    args.renderer = 'graphviz' if output_format == OutputFormat.DOT else 'plantuml'
+    if args.render and (bundle_type != BundleType.DIRECTORY or args.ingest_shard is not None):
+        logger.log_error('--render renders the diagrams of the output directory and cannot be combined with --bundle or --ingest_shard! Exiting!')
+        exit(1)
+    if args.resume and (bundle_type != BundleType.DIRECTORY or args.ingest_shard is not None):
+        logger.log_error('--resume checks the diagrams of the output directory and cannot be combined with --bundle or --ingest_shard! Exiting!')
+        exit(1)
+    try:
+        memory_budget: int = MemoryBudget.parse(args.memory_budget) if args.memory_budget is not None else None
+    except ValueError as error:
+        logger.log_error(f'{error}! Exiting!')
+        exit(1)
+    compression: Compression = Compression(args.compress)
+    if compression != Compression.NONE and bundle_type != BundleType.DIRECTORY:
+        logger.log_error('--compress writes compressed files next to the diagrams of the output directory and cannot be combined with --bundle! Exiting!')
+        exit(1)
+    if compression == Compression.SVGZ and args.resume:
+        logger.log_error('--compress svgz replaces the puml files checked by --resume! Exiting!')
+        exit(1)
+    if args.shard_dir is not None:
+        os.makedirs(args.shard_dir, exist_ok=True)
+    run_options: RunOptions = RunOptions(skip_uses_relation=args.skip_uses_relation, source_type=source_type, bundle_type=bundle_type, \
+        model_store_file_name=args.model_store, reuse_model_store=args.reuse_model_store, ingest_shard=ingest_shard, \
+        emit_shard=emit_shard, merge_shards=args.merge_shards, shard_dir=args.shard_dir, graph_report=args.graph_report, \
+        graph_report_top=args.graph_report_top, graph_report_hops=args.graph_report_hops, write_worker_count=args.write_workers, \
+        diagram_budget=DiagramBudget(args.max_diagram_classes, args.max_diagram_relations, args.max_diagram_members), \
+        hub_policy=hub_policy, events_file_name=args.events, events_file_descriptor=args.events_fd, \
+        renderer=create_renderer(args, parser, logger) if args.render else None, render_worker_count=args.render_workers, \
+        output_format=output_format, slice_policy=slice_policy, diagram_granularity=DiagramGranularity(args.granularity), \
+        resume=args.resume, memory_budget=memory_budget, compression=compression, parse_cache=parse_cache)
+    try:
+        ApplicationService.read_all_source_files(from_dir, out_dir, logger, PythonLanguage(logger), run_options)
+    except OutputStoreError as error:
+        logger.log_error(f'{error}! Exiting!')
+        exit(1)
+    if ingest_shard is not None:
+        logger.log_warn(f'Model shard {args.ingest_shard} stored in {args.shard_dir}')
+        return
+
+    # The navigation index opens in milliseconds, unlike the full diagram of a large code base
+    file_name: str = os.path.join(os.getcwd(), out_dir, NavigationIndex.PAGE_FILE_NAME)
+    if bundle_type != BundleType.DIRECTORY:
+        bundle_file_name: str = OutputStoreFactory.get_bundle_file_name(os.path.join(os.getcwd(), out_dir), bundle_type)
+        logger.log_warn(f'Diagrams are bundled in {bundle_file_name}, run python -m revenger.bundle_tool serve {bundle_file_name} to browse them')
+    else:
+        logger.log_warn(f'Please open {file_name} in your browser')
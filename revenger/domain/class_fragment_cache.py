@@ -0,0 +1,54 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Callable
+
+from revenger.domain.logger import Logger
+from revenger.domain.datastructure import Datastructure
+
+class ClassFragmentCache:
+    # Rendered class fragments shared by all diagrams: only the colour is specific to a diagram.
+    def __init__(self, logger: Logger, cached_fragment_count: int = 16384):
+        self.logger = logger
+        self.cached_fragment_count: int = cached_fragment_count
+        self.fragments: OrderedDict[Tuple[str, bool, bool, str], Tuple[str, List[str]]] = OrderedDict()
+
+    def get_fragment(self, sub_datastructure: Datastructure.SubDataStructure, detailed: bool, grouped_per_ns: bool, \
+            empty_spaces: str, get_class_link: Callable[[], str]) -> Tuple[str, List[str]]:
+        key: Tuple[str, bool, bool, str] = (sub_datastructure.get_fqdn_class_name(), detailed, grouped_per_ns, empty_spaces)
+        fragment: Tuple[str, List[str]] = self.fragments.get(key)
+        if fragment is not None:
+            self.fragments.move_to_end(key)
+            return fragment
+        fragment = ClassFragmentCache.__create_fragment(sub_datastructure, get_class_link(), detailed, empty_spaces)
+        self.fragments[key] = fragment
+        if len(self.fragments) > self.cached_fragment_count:
+            self.fragments.popitem(last=False)
+        return fragment
+
+    def clear(self) -> None:
+        self.fragments.clear()
+
+    @staticmethod
+    def __create_fragment(sub_datastructure: Datastructure.SubDataStructure, class_link: str, \
+            detailed: bool, empty_spaces: str) -> Tuple[str, List[str]]:
+        is_abstract: str = 'abstract ' if sub_datastructure.is_abstract() else ''
+        class_type: str = 'interface ' if sub_datastructure.is_interface() else 'class '
+        header: str = f'{empty_spaces}{is_abstract}{class_type}{sub_datastructure.get_fqdn_class_name()} [[{class_link}]] '
+        body: List[str] = []
+        if detailed:
+            static_field: Datastructure.Static
+            for static_field in sub_datastructure.get_static_fields():
+                body.append(f'{empty_spaces}  + {{static}} {static_field.static_name}: {static_field.static_type}')
+            variable_field: Datastructure.Variable
+            for variable_field in sub_datastructure.get_variable_fields():
+                body.append(f'{empty_spaces}  - {variable_field.variable_name}: {variable_field.variable_type}' )
+            method_field: Datastructure.Method
+            for method_field in sub_datastructure.get_method_fields():
+                visible = '+'
+                method_name: str = method_field.method_name
+                parameters: str = ', '.join([f'{parameter.parameter}:{parameter.user_type}' for parameter in method_field.parameters])
+                if method_field.is_private:
+                    visible = '-'
+                body.append(f'{empty_spaces}  {visible} {method_name}({parameters})' )
+        body.append(f'{empty_spaces}}}')
+        return header, body
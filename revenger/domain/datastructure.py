@@ -1,14 +1,15 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Set, FrozenSet, Callable
 from abc import ABC, abstractmethod
 import re
-from domain.logger import Logger
-from domain.common import Common
+import sys
+from revenger.domain.logger import Logger
+from revenger.domain.common import Common
 
-from infrastructure.common import CommonInfrastructure
-from infrastructure.generic_classes import GenericDatastructure
-from infrastructure.generic_classes import GenericSubDataStructure
+from revenger.infrastructure.common import CommonInfrastructure
+from revenger.infrastructure.generic_classes import GenericDatastructure
+from revenger.infrastructure.generic_classes import GenericSubDataStructure
 
 class LanguageDependent(ABC):
     @abstractmethod
@@ -67,6 +68,12 @@ class Datastructure(GenericDatastructure):
             self.statics: List[Datastructure.Static] = []
             self.variables: List[Datastructure.Variable] = []
             self.methods: List[Datastructure.Method] = []
+            # Members whose annotation could not be imported
+            self.unsupported_members: List[str] = []
+            # Relation layer of classes whose members are loaded when first needed (detailed diagrams)
+            self.member_types: List[Tuple[str, Common.ConnectionType]] = None
+            self.member_loader: Callable[[], Tuple[List[Datastructure.Static], List[Datastructure.Variable], List[Datastructure.Method], \
+                List[str]]] = None
             self.logger = logger
             self.color = None
             self.default_color = None
@@ -94,17 +101,32 @@ class Datastructure(GenericDatastructure):
             else:
                 base_class = f'{self.filemodule}.{base_class}'
                 self.logger.log_debug(f'  Created base class name {base_class} from filemodule: >{self.filemodule}< and >{base_class}<')
-            self.bases.append(base_class)
+            self.bases.append(Datastructure.intern(base_class))
  
+        # Type strings are interned: the same types are referenced by many classes (and by all runs of a batch)
         def add_static(self, static_name: str, static_type: str) -> None:
-            self.statics.append(Datastructure.Static(static_name, static_type))
+            self.statics.append(Datastructure.Static(static_name, Datastructure.intern(static_type)))
         def add_method(self, method_name: str, arguments_tuple: List[Tuple[str, str]], is_private: bool) -> None:
-            arguments = [Datastructure.Method.ParameterType(parameter, user_type) for parameter, user_type in arguments_tuple]
+            arguments = [Datastructure.Method.ParameterType(parameter, Datastructure.intern(user_type)) for parameter, user_type in arguments_tuple]
             self.methods.append(Datastructure.Method(method_name, arguments, is_private))
         def add_variable(self, variable_name: str, variable_type: str, is_member: bool) -> None:
-            self.variables.append(Datastructure.Variable(variable_name, variable_type, is_member))
+            self.variables.append(Datastructure.Variable(variable_name, Datastructure.intern(variable_type), is_member))
         def add_inner_class(self, inner_class_name: str) -> None:
             self.inner_classes.append(inner_class_name)
+        def add_unsupported_member(self, member_name: str) -> None:
+            self.unsupported_members.append(member_name)
+
+        def set_member_loader(self, member_types: List[Tuple[str, Common.ConnectionType]], \
+                member_loader: Callable[[], Tuple[List[Datastructure.Static], List[Datastructure.Variable], List[Datastructure.Method], \
+                    List[str]]]) -> None:
+            self.member_types = member_types
+            self.member_loader = member_loader
+
+        def __load_members(self) -> None:
+            if self.member_loader is not None:
+                self.statics, self.variables, self.methods, self.unsupported_members = self.member_loader()
+                self.member_loader = None
+                self.member_types = None
 
         def is_abstract(self) -> bool:
             return self.is_abstract_field
@@ -112,10 +134,13 @@ class Datastructure(GenericDatastructure):
             return self.is_interface_field
 
         def has_static_fields(self) -> bool:
+            self.__load_members()
             return len(self.statics) > 0
         def has_method_fields(self) -> bool:
+            self.__load_members()
             return len(self.methods) > 0
         def has_variables_fields(self) -> bool:
+            self.__load_members()
             return len(self.variables) > 0
 
         def get_fqdn_class_name(self) -> str:
@@ -123,11 +148,29 @@ class Datastructure(GenericDatastructure):
         def get_base_classes(self) -> List[str]:
             return self.bases
         def get_static_fields(self) -> List[Datastructure.Static]:
+            self.__load_members()
             return self.statics
         def get_method_fields(self) -> List[Datastructure.Method]:
+            self.__load_members()
             return self.methods
         def get_variable_fields(self) -> List[Datastructure.Variable]:
+            self.__load_members()
             return self.variables
+        def get_unsupported_members(self) -> List[str]:
+            self.__load_members()
+            return self.unsupported_members
+        def get_member_types(self) -> List[Tuple[str, Common.ConnectionType]]:
+            # Types of statics, variables and parameters (not reduced) with the relation they create, in this order:
+            # relations and slices only need these types, not the members
+            if self.member_loader is not None:
+                return self.member_types
+            member_types: List[Tuple[str, Common.ConnectionType]] = \
+                [(static_field.static_type, Common.ConnectionType.IS_MEMBER) for static_field in self.statics]
+            member_types.extend((variable_field.variable_type, \
+                Common.ConnectionType.IS_MEMBER if variable_field.is_member else Common.ConnectionType.USES) for variable_field in self.variables)
+            member_types.extend((parameter.user_type, Common.ConnectionType.USES) \
+                for method_field in self.methods for parameter in method_field.parameters)
+            return member_types
         def get_inner_class_name(self) -> List[str]:
             return self.inner_classes
         def get_filename(self) -> str:
@@ -136,19 +179,68 @@ class Datastructure(GenericDatastructure):
             return self.filemodule
         def get_name_space_list(self) -> None:
             return self.name_space_list
-
-    def __init__(self, language_dependent: LanguageDependent, logger: Logger):
+        def get_from_imports(self) -> Dict[str, str]:
+            return self.from_imports
+        def get_default_color(self) -> str:
+            return self.default_color
+
+        def replace_types(self, type_mapping: Dict[str, str]) -> None:
+            self.__load_members()
+            self.bases = [Datastructure.replace_type(base, type_mapping) for base in self.bases]
+            for static_field in self.statics:
+                static_field.static_type = Datastructure.replace_type(static_field.static_type, type_mapping)
+            for variable_field in self.variables:
+                variable_field.variable_type = Datastructure.replace_type(variable_field.variable_type, type_mapping)
+            for method_field in self.methods:
+                for parameter in method_field.parameters:
+                    parameter.user_type = Datastructure.replace_type(parameter.user_type, type_mapping)
+
+        def get_referenced_types(self) -> List[str]:
+            referenced_types: List[str] = list(self.bases)
+            for member_type, _ in self.get_member_types():
+                referenced_types.append(Common.reduce_member_type(member_type)[1])
+            for inner_class_name in self.inner_classes:
+                referenced_types.append(Common.reduce_member_type(inner_class_name)[1])
+            return referenced_types
+
+    def __init__(self, language_dependent: LanguageDependent, logger: Logger, skip_types: FrozenSet[str] = None):
         self.class_to_datastructure: Dict[str, Datastructure.SubDataStructure] = {}
         self.filename_to_datastructure: Dict[str, List[Datastructure.SubDataStructure]] = {}
         self.namespace_to_datastructures: Dict[str, List[Datastructure.SubDataStructure]] = {}
         self.namespace_to_namespace_list: Dict[str, List[str]] = {}
         self.language_dependent = language_dependent
-        self.skip_types = language_dependent.get_skip_types()
-        self.skip_types.append(self.NOT_EXTRACTED)
-        self.skip_types.append(Common.COMPLEX_TYPE)
-        self.skip_types.append(CommonInfrastructure.NOT_PROVIDED_TYPE)
+        # Built once per model, slices and sheets share it
+        self.skip_types: FrozenSet[str] = skip_types if skip_types is not None else \
+            Datastructure.create_skip_type_table(language_dependent)
         self.logger = logger
 
+    def create_empty(self) -> Datastructure:
+        # Slices and sheets share the skip types of the model they are cut from
+        return Datastructure(self.language_dependent, self.logger, self.skip_types)
+
+    @staticmethod
+    def intern(type_name: str) -> str:
+        # yaml sources may hold types that are not strings
+        return sys.intern(type_name) if type(type_name) is str else type_name
+
+    @staticmethod
+    def create_skip_type_table(language_dependent: LanguageDependent) -> FrozenSet[str]:
+        return frozenset(sys.intern(type_name) for type_name in \
+            language_dependent.get_skip_types() + [Datastructure.NOT_EXTRACTED, Common.COMPLEX_TYPE, CommonInfrastructure.NOT_PROVIDED_TYPE])
+
+    @staticmethod
+    def replace_type(type_name: str, type_mapping: Dict[str, str]) -> str:
+        if type_name in type_mapping:
+            return type_mapping[type_name]
+        container, separator, contained_type = type_name.partition('[')
+        if len(separator) > 0 and contained_type[0: -1] in type_mapping:
+            return f'{container}[{type_mapping[contained_type[0: -1]]}]'
+        return type_name
+
+    def replace_types(self, type_mapping: Dict[str, str]) -> None:
+        for sub_datastructure in self.class_to_datastructure.values():
+            sub_datastructure.replace_types(type_mapping)
+
     def clear_color(self) -> None:
         for sub_datastructure in self.class_to_datastructure.values():
             sub_datastructure.clear_color()
@@ -158,7 +250,7 @@ class Datastructure(GenericDatastructure):
             sub_datastructure = self.get_datastructures_from_class_name(class_name)
             sub_datastructure.set_color(color)
 
-    def get_skip_types(self) -> List[str]:
+    def get_skip_types(self) -> FrozenSet[str]:
         return self.skip_types
 
     def get_language_dependent(self) -> LanguageDependent:
@@ -171,6 +263,9 @@ class Datastructure(GenericDatastructure):
         self.append_sub_datastructure(sub_datastructure)
         return sub_datastructure
 
+    def get_class_count(self) -> int:
+        return len(self.class_to_datastructure)
+
     def get_classname_list(self) -> List[str]:
         return self.class_to_datastructure.keys()
 
@@ -186,15 +281,39 @@ class Datastructure(GenericDatastructure):
     def get_datastructures_from_namespace(self, namespace: str) -> List[Datastructure.SubDataStructure]:
         return self.namespace_to_datastructures[namespace]
 
+    def get_classname_list_from_namespace(self, namespace: str) -> List[str]:
+        return [sub_datastructure.get_fqdn_class_name() for sub_datastructure in self.namespace_to_datastructures[namespace]]
+
     def get_namespace_list_from_namespace_name(self, namespace_name: str) -> List[str]:
         return self.namespace_to_namespace_list[namespace_name]
 
+    def get_referrer_class_names(self, class_name_list: List[str]) -> List[str]:
+        class_names: Set[str] = set(class_name_list)
+        referrer_class_names: List[str] = []
+        for namespace_name in self.get_sorted_name_spaces():
+            for sub_datastructure in self.get_datastructures_from_namespace(namespace_name):
+                if not class_names.isdisjoint(sub_datastructure.get_referenced_types()):
+                    referrer_class_names.append(sub_datastructure.get_fqdn_class_name())
+        return referrer_class_names
+
+    def set_file_order(self, file_order: int) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
     def class_exists(self, class_name) -> bool:
         return class_name in self.class_to_datastructure.keys()
 
     def filename_exists(self, filename) -> bool:
         return filename in self.filename_to_datastructure.keys()
 
+    def get_sorted_filenames(self) -> List[str]:
+        return sorted(self.filename_to_datastructure.keys())
+
+    def get_datastructures_from_filename(self, filename: str) -> List[Datastructure.SubDataStructure]:
+        return self.filename_to_datastructure[filename]
+
     def append_sub_datastructure(self, sub_datastructure: Datastructure.SubDataStructure) -> None:
         fqdn_class_name = sub_datastructure.get_fqdn_class_name()
         if fqdn_class_name not in self.class_to_datastructure.keys():
@@ -204,6 +323,7 @@ class Datastructure(GenericDatastructure):
                 self.namespace_to_datastructures[namespace] = []
             self.namespace_to_datastructures[namespace].append(sub_datastructure)
             self.namespace_to_namespace_list[namespace] = sub_datastructure.get_name_space_list()
+            self.filename_to_datastructure.setdefault(sub_datastructure.get_filename(), []).append(sub_datastructure)
         else:
             self.logger.log_debug(f'WARNING: Class {fqdn_class_name} is being registered a second time \n' + \
                   f'   -> First time content is from file {self.class_to_datastructure[fqdn_class_name].get_filename()}, from class: {self.class_to_datastructure[fqdn_class_name].get_fqdn_class_name()}: Ignoring.')
@@ -215,8 +335,11 @@ class DatastructureHandler:
         self.logger = logger
 
     def __append_sub_datastructures_from_classname(self, classname: str, \
-                reduced_datastructure: Datastructure) -> Datastructure.SubDataStructure:
+                reduced_datastructure: Datastructure, excluded_class_names: Set[str] = None) -> Datastructure.SubDataStructure:
         #type_wo_namespace: str = re.sub('^.*\.', '', classname)
+        if excluded_class_names is not None and classname in excluded_class_names:
+            self.logger.log_debug(f'  {classname} was skipped because it is a hub class')
+            return None
         if classname not in self.datastructure.get_skip_types():
             sub_datastructure: Datastructure.SubDataStructure = self.datastructure.get_datastructures_from_class_name(classname)
             if sub_datastructure is not None:
@@ -235,10 +358,14 @@ class DatastructureHandler:
             return self.__append_sub_datastructures_from_classname(class_name, reduced_datastructure)
         return None
 
-    def create_reduced_class_list_from_class_name_list(self, class_name_list: List[str]) -> Datastructure:
+    def create_reduced_class_list_from_class_name_list(self, class_name_list: List[str], \
+            hub_class_names: Set[str] = None, referrer_class_names: List[str] = None) -> Datastructure:
+        # Hub classes are only added when they are part of class_name_list, referrer_class_names
+        # replaces the classes referencing class_name_list (one page of the referrers of a hub class)
         self.datastructure.clear_color()
-        reduced_datastructure: Datastructure = Datastructure(self.datastructure.get_language_dependent(), self.logger)
+        reduced_datastructure: Datastructure = self.datastructure.create_empty()
         self.logger.log_debug(f'create_reduced_class_list_from_class_name_list(class_name_list = {class_name_list})')
+        excluded_class_names: Set[str] = hub_class_names.difference(class_name_list) if hub_class_names else None
 
         for class_name in class_name_list:
             self.logger.log_debug(f' Adding class {class_name}')
@@ -248,86 +375,36 @@ class DatastructureHandler:
                 sub_datastructure.set_color('yellow')
                 for base_class_name in sub_datastructure.get_base_classes():
                     self.__append_sub_datastructures_from_classname(\
-                        base_class_name, reduced_datastructure)
+                        base_class_name, reduced_datastructure, excluded_class_names)
                     self.logger.log_debug(f' Adding parent class {base_class_name} of {class_name}')
                     self.logger.log_debug(f'  All reduced base classes for {class_name}: {reduced_datastructure.get_datastructures_from_class_name(class_name).get_base_classes()})')
 
-                static_field: Datastructure.Static
-                for static_field in sub_datastructure.get_static_fields():
-                    _, reduced_member_type, _ = Common.reduce_member_type(static_field.static_type)
-                    self.__append_sub_datastructures_from_classname(\
-                        reduced_member_type, reduced_datastructure)
-                    self.logger.log_debug(f' Adding static related class {reduced_member_type} of {class_name}')
-
-                variable_field: Datastructure.Variable
-                for variable_field in sub_datastructure.get_variable_fields():
-                    _, reduced_member_type, _ = Common.reduce_member_type(variable_field.variable_type)
+                # Types of statics, variables and method parameters
+                for member_type, _ in sub_datastructure.get_member_types():
+                    _, reduced_member_type, _ = Common.reduce_member_type(member_type)
                     self.__append_sub_datastructures_from_classname(\
-                        reduced_member_type, reduced_datastructure)
-                    self.logger.log_debug(f' Adding variable related class {reduced_member_type} of {class_name}')
-
-                method_field: Datastructure.Method
-                for method_field in sub_datastructure.get_method_fields():
-                    for parameter in method_field.parameters:
-                        _, reduced_member_type, _ = Common.reduce_member_type(parameter.user_type)
-                        self.__append_sub_datastructures_from_classname(\
-                            reduced_member_type, reduced_datastructure)
-                        self.logger.log_debug(f' {reduced_member_type} is a parameter from method {method_field.method_name} from class {sub_datastructure.get_fqdn_class_name()} ')
+                        reduced_member_type, reduced_datastructure, excluded_class_names)
+                    self.logger.log_debug(f' Adding member related class {reduced_member_type} of {class_name}')
 
                 for inner_class_name in sub_datastructure.get_inner_class_name():
                     _, reduced_member_type, _ = Common.reduce_member_type(inner_class_name)
                     self.__append_sub_datastructures_from_classname(\
-                        reduced_member_type, reduced_datastructure)
+                        reduced_member_type, reduced_datastructure, excluded_class_names)
                     self.logger.log_debug(f' Adding inner class {reduced_member_type} of {class_name}')
 
-        for namespace_name in self.datastructure.get_sorted_name_spaces():
-            for sub_datastructure in self.datastructure.get_datastructures_from_namespace(namespace_name):
-
-                for base_classname in sub_datastructure.get_base_classes():
-                    if base_classname in class_name_list:
-                        self.__append_sub_datastructures_from_classname(\
-                            sub_datastructure.get_fqdn_class_name(), reduced_datastructure)
-                        self.logger.log_debug(f' Adding child related class {sub_datastructure.get_fqdn_class_name()} of {base_classname}')
-
-                static_field: Datastructure.Static
-                for static_field in sub_datastructure.get_static_fields():
-                    _, reduced_member_type, _ = Common.reduce_member_type(static_field.static_type)
-                    if reduced_member_type in class_name_list:
-                        self.__append_sub_datastructures_from_classname(\
-                            sub_datastructure.get_fqdn_class_name(), reduced_datastructure)
-                        self.logger.log_debug(f' {reduced_member_type} is a static related class of {sub_datastructure.get_fqdn_class_name()} ')
-
-                variable_field: Datastructure.Variable
-                for variable_field in sub_datastructure.get_variable_fields():
-                    _, reduced_member_type, _ = Common.reduce_member_type(variable_field.variable_type)
-                    if reduced_member_type in class_name_list:
-                        self.__append_sub_datastructures_from_classname(\
-                            sub_datastructure.get_fqdn_class_name(), reduced_datastructure)
-                        self.logger.log_debug(f' {reduced_member_type} is a variable related class of {sub_datastructure.get_fqdn_class_name()} ')
-
-                method_field: Datastructure.Method
-                for method_field in sub_datastructure.get_method_fields():
-                    for parameter in method_field.parameters:
-                        _, reduced_member_type, _ = Common.reduce_member_type(parameter.user_type)
-                        if reduced_member_type in class_name_list:
-                            self.__append_sub_datastructures_from_classname(\
-                                sub_datastructure.get_fqdn_class_name(), reduced_datastructure)
-                            self.logger.log_debug(f' {reduced_member_type} is a parameter from method {method_field.method_name} related class of {sub_datastructure.get_fqdn_class_name()} ')
-
-                for inner_class_name in sub_datastructure.get_inner_class_name():
-                    _, reduced_member_type, _ = Common.reduce_member_type(inner_class_name)
-                    if reduced_member_type in class_name_list:
-                        self.__append_sub_datastructures_from_classname(\
-                            sub_datastructure.get_fqdn_class_name(), reduced_datastructure)
-                        self.logger.log_debug(f' {reduced_member_type} contains class of {sub_datastructure.get_fqdn_class_name()} ')
+        if referrer_class_names is None:
+            referrer_class_names = self.datastructure.get_referrer_class_names(class_name_list)
+        for referrer_class_name in referrer_class_names:
+            self.__append_sub_datastructures_from_classname(\
+                referrer_class_name, reduced_datastructure)
+            self.logger.log_debug(f' Adding class {referrer_class_name} referencing one of {class_name_list}')
 
         return reduced_datastructure
 
     def get_class_name_list_grouped_by_namespaces(self) -> Dict[List[str]]:
         class_name_list_grouped_by_namespaces: Dict[List[str]] = {}
         for namespace_name in self.datastructure.get_sorted_name_spaces():
-            for sub_datastructure in self.datastructure.get_datastructures_from_namespace(namespace_name):
-                classname: str = sub_datastructure.get_fqdn_class_name()
+            for classname in self.datastructure.get_classname_list_from_namespace(namespace_name):
                 namespace_list = classname.split('.')[0: -1]
                 full_name_space = ''
                 for namespace in namespace_list:
@@ -335,8 +412,9 @@ class DatastructureHandler:
                     full_name_space += namespace
                     if full_name_space not in class_name_list_grouped_by_namespaces.keys():
                        class_name_list_grouped_by_namespaces[full_name_space] = []
+        classname_list: List[str] = list(self.datastructure.get_classname_list())
         for namespace in class_name_list_grouped_by_namespaces.keys():
-            for classname in self.datastructure.get_classname_list():
+            for classname in classname_list:
                 if classname.startswith(namespace):
                     class_name_list_grouped_by_namespaces[namespace].append(classname)
         return class_name_list_grouped_by_namespaces
\ No newline at end of file
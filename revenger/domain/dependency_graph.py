@@ -0,0 +1,268 @@
+from __future__ import annotations
+from array import array
+from collections import deque
+from typing import List, Dict, Tuple, FrozenSet, Iterator
+
+from revenger.domain.logger import Logger
+from revenger.domain.common import Common
+from revenger.domain.datastructure import Datastructure
+
+# numpy takes longer to import than most runs take to start: it is imported by the first graph, arrays are used without it
+numpy: any = None
+is_numpy_imported: bool = False
+
+def import_numpy() -> any:
+    global numpy, is_numpy_imported
+    if not is_numpy_imported:
+        try:
+            import numpy as numpy_module
+            numpy = numpy_module
+        except ImportError:
+            numpy = None
+        is_numpy_imported = True
+    return numpy
+
+class DependencyGraph:
+    # Edges go from the class to the class it depends on, stored as compressed sparse rows:
+    # the outgoing edges of class i are targets[offsets[i]:offsets[i + 1]] with their types in edge_types.
+    def __init__(self, class_names: List[str], sources: List[int], targets: List[int], edge_types: List[int], logger: Logger):
+        import_numpy()
+        self.logger = logger
+        self.class_names: List[str] = class_names
+        self.class_ids: Dict[str, int] = {class_name: class_id for class_id, class_name in enumerate(class_names)}
+        self.offsets, self.targets, self.edge_types = \
+            DependencyGraph.__compress(len(class_names), sources, targets, edge_types)
+        incoming_order: List[int] = DependencyGraph.__get_stable_order(targets, len(class_names))
+        self.incoming_offsets, self.incoming_sources, self.incoming_edge_types = \
+            DependencyGraph.__compress(len(class_names), [targets[index] for index in incoming_order], \
+                [sources[index] for index in incoming_order], [edge_types[index] for index in incoming_order])
+        self.adjacency_lists: Tuple[List[int], List[int], List[int], List[int]] = None
+        self.logger.log_info(f'Dependency graph created with {len(class_names)} classes and {len(targets)} edges ' + \
+            f'({"numpy" if numpy is not None else "array"} storage)')
+
+    @staticmethod
+    def __to_array(type_code: str, values: List[int]) -> any:
+        if numpy is not None:
+            return numpy.array(values, dtype=numpy.int8 if type_code == 'b' else numpy.int32)
+        return array(type_code, values)
+
+    @staticmethod
+    def __to_list(values: any) -> List[int]:
+        return values.tolist() if numpy is not None else list(values)
+
+    @staticmethod
+    def __compress(class_count: int, sources: List[int], targets: List[int], edge_types: List[int]) -> Tuple[any, any, any]:
+        # Sources are expected in ascending order
+        offsets: List[int] = [0] * (class_count + 1)
+        for source in sources:
+            offsets[source + 1] += 1
+        for class_id in range(0, class_count):
+            offsets[class_id + 1] += offsets[class_id]
+        return DependencyGraph.__to_array('i', offsets), DependencyGraph.__to_array('i', targets), \
+            DependencyGraph.__to_array('b', edge_types)
+
+    @staticmethod
+    def __get_stable_order(keys: List[int], key_count: int) -> List[int]:
+        if numpy is not None:
+            return numpy.argsort(numpy.array(keys, dtype=numpy.int32), kind='stable').tolist()
+        buckets: List[List[int]] = [[] for _ in range(0, key_count)]
+        for index, key in enumerate(keys):
+            buckets[key].append(index)
+        return [index for bucket in buckets for index in bucket]
+
+    @staticmethod
+    def from_datastructure(datastructure: Datastructure, skip_uses_relation: bool, logger: Logger) -> DependencyGraph:
+        class_names: List[str] = []
+        sub_datastructures: List[Datastructure.SubDataStructure] = []
+        for namespace_name in datastructure.get_sorted_name_spaces():
+            for sub_datastructure in datastructure.get_datastructures_from_namespace(namespace_name):
+                class_names.append(sub_datastructure.get_fqdn_class_name())
+                sub_datastructures.append(sub_datastructure)
+        class_ids: Dict[str, int] = {class_name: class_id for class_id, class_name in enumerate(class_names)}
+        skip_types: FrozenSet[str] = datastructure.get_skip_types()
+
+        sources: List[int] = []
+        targets: List[int] = []
+        edge_types: List[int] = []
+        for class_id, sub_datastructure in enumerate(sub_datastructures):
+            known_edges: set = set()
+            for target_type, connection_type in DependencyGraph.__get_dependencies(sub_datastructure, skip_uses_relation):
+                target_id: int = class_ids.get(target_type)
+                if target_id is None or target_type in skip_types or (target_id, connection_type) in known_edges:
+                    continue
+                known_edges.add((target_id, connection_type))
+                sources.append(class_id)
+                targets.append(target_id)
+                edge_types.append(connection_type.value)
+        return DependencyGraph(class_names, sources, targets, edge_types, logger)
+
+    @staticmethod
+    def __get_dependencies(sub_datastructure: Datastructure.SubDataStructure, skip_uses_relation: bool) -> Iterator[Tuple[str, Common.ConnectionType]]:
+        # Same relations as the ones drawn in the diagrams
+        for base in sub_datastructure.get_base_classes():
+            yield base, Common.ConnectionType.IS_BASE
+        for inner_class_name in sub_datastructure.get_inner_class_name():
+            yield inner_class_name, Common.ConnectionType.IS_INNER_CLASS
+        for member_type, connection_type in sub_datastructure.get_member_types():
+            if connection_type != Common.ConnectionType.USES or not skip_uses_relation:
+                yield Common.reduce_member_type(member_type)[1], connection_type
+
+    def get_class_count(self) -> int:
+        return len(self.class_names)
+
+    def get_edge_count(self) -> int:
+        return len(self.targets)
+
+    def get_class_id(self, class_name: str) -> int:
+        return self.class_ids.get(class_name)
+
+    def get_class_name(self, class_id: int) -> str:
+        return self.class_names[class_id]
+
+    def __get_adjacency_lists(self) -> Tuple[List[int], List[int], List[int], List[int]]:
+        # Plain lists are much faster than numpy arrays for element wise traversals
+        if self.adjacency_lists is None:
+            self.adjacency_lists = (DependencyGraph.__to_list(self.offsets), DependencyGraph.__to_list(self.targets), \
+                DependencyGraph.__to_list(self.incoming_offsets), DependencyGraph.__to_list(self.incoming_sources))
+        return self.adjacency_lists
+
+    def get_successors(self, class_id: int) -> List[Tuple[int, Common.ConnectionType]]:
+        start, end = int(self.offsets[class_id]), int(self.offsets[class_id + 1])
+        return [(int(self.targets[index]), Common.ConnectionType(int(self.edge_types[index]))) for index in range(start, end)]
+
+    def get_predecessors(self, class_id: int) -> List[Tuple[int, Common.ConnectionType]]:
+        start, end = int(self.incoming_offsets[class_id]), int(self.incoming_offsets[class_id + 1])
+        return [(int(self.incoming_sources[index]), Common.ConnectionType(int(self.incoming_edge_types[index]))) \
+            for index in range(start, end)]
+
+    def get_edge_count_per_type(self) -> Dict[Common.ConnectionType, int]:
+        if numpy is not None:
+            counts: List[int] = numpy.bincount(self.edge_types, minlength=len(Common.ConnectionType) + 1).tolist()
+        else:
+            counts: List[int] = [0] * (len(Common.ConnectionType) + 1)
+            for edge_type in self.edge_types:
+                counts[edge_type] += 1
+        return {connection_type: counts[connection_type.value] for connection_type in Common.ConnectionType}
+
+    def __get_fan(self, offsets: any, neighbours: any) -> List[int]:
+        # Number of distinct neighbour classes: two typed edges between the same classes count once
+        if numpy is not None:
+            sources = numpy.repeat(numpy.arange(self.get_class_count(), dtype=numpy.int64), numpy.diff(offsets))
+            pairs = numpy.unique(sources * self.get_class_count() + neighbours)
+            return numpy.bincount(pairs // self.get_class_count(), minlength=self.get_class_count()).tolist()
+        return [len(set(neighbours[offsets[class_id]:offsets[class_id + 1]])) for class_id in range(0, self.get_class_count())]
+
+    def get_fan_in(self) -> List[int]:
+        return self.__get_fan(self.incoming_offsets, self.incoming_sources)
+
+    def get_fan_out(self) -> List[int]:
+        return self.__get_fan(self.offsets, self.targets)
+
+    @staticmethod
+    def __rank(counts: List[int], count: int) -> List[Tuple[int, int]]:
+        # Ties are ordered by class id which follows the diagram order
+        ranked_ids: List[int] = sorted(range(0, len(counts)), key=lambda class_id: -counts[class_id])
+        return [(class_id, counts[class_id]) for class_id in ranked_ids[0: count] if counts[class_id] > 0]
+
+    def rank_by_fan_in(self, count: int) -> List[Tuple[int, int]]:
+        return DependencyGraph.__rank(self.get_fan_in(), count)
+
+    def rank_by_fan_out(self, count: int) -> List[Tuple[int, int]]:
+        return DependencyGraph.__rank(self.get_fan_out(), count)
+
+    def get_strongly_connected_components(self) -> List[List[int]]:
+        # Iterative Tarjan algorithm: recursion would overflow on deep dependency chains
+        offsets, targets, _, _ = self.__get_adjacency_lists()
+        class_count: int = self.get_class_count()
+        indexes: List[int] = [-1] * class_count
+        low_links: List[int] = [0] * class_count
+        on_stack: List[bool] = [False] * class_count
+        stack: List[int] = []
+        components: List[List[int]] = []
+        next_index: int = 0
+        for root in range(0, class_count):
+            if indexes[root] != -1:
+                continue
+            indexes[root] = low_links[root] = next_index
+            next_index += 1
+            stack.append(root)
+            on_stack[root] = True
+            work: List[List[int]] = [[root, offsets[root]]]
+            while len(work) > 0:
+                node, edge = work[-1]
+                if edge < offsets[node + 1]:
+                    work[-1][1] += 1
+                    successor: int = targets[edge]
+                    if indexes[successor] == -1:
+                        indexes[successor] = low_links[successor] = next_index
+                        next_index += 1
+                        stack.append(successor)
+                        on_stack[successor] = True
+                        work.append([successor, offsets[successor]])
+                    elif on_stack[successor] and indexes[successor] < low_links[node]:
+                        low_links[node] = indexes[successor]
+                    continue
+                work.pop()
+                if len(work) > 0 and low_links[node] < low_links[work[-1][0]]:
+                    low_links[work[-1][0]] = low_links[node]
+                if low_links[node] == indexes[node]:
+                    component: List[int] = []
+                    member: int = -1
+                    while member != node:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                    components.append(sorted(component))
+        return components
+
+    def get_cycles(self) -> List[List[int]]:
+        offsets, targets, _, _ = self.__get_adjacency_lists()
+        cycles: List[List[int]] = [component for component in self.get_strongly_connected_components() \
+            if len(component) > 1 or component[0] in targets[offsets[component[0]]:offsets[component[0] + 1]]]
+        return sorted(cycles, key=lambda component: (-len(component), component[0]))
+
+    def get_neighbourhood(self, class_id: int, hop_count: int, outgoing: bool = True, incoming: bool = True) -> Dict[int, int]:
+        offsets, targets, incoming_offsets, incoming_sources = self.__get_adjacency_lists()
+        distances: Dict[int, int] = {class_id: 0}
+        queue: deque = deque([class_id])
+        while len(queue) > 0:
+            node: int = queue.popleft()
+            distance: int = distances[node]
+            if distance >= hop_count:
+                continue
+            neighbours: List[int] = []
+            if outgoing:
+                neighbours.extend(targets[offsets[node]:offsets[node + 1]])
+            if incoming:
+                neighbours.extend(incoming_sources[incoming_offsets[node]:incoming_offsets[node + 1]])
+            for neighbour in neighbours:
+                if neighbour not in distances:
+                    distances[neighbour] = distance + 1
+                    queue.append(neighbour)
+        return distances
+
+    def create_report(self, top_count: int, hop_count: int) -> List[str]:
+        lines: List[str] = [f'Dependency graph: {self.get_class_count()} classes, {self.get_edge_count()} edges']
+        for connection_type, count in self.get_edge_count_per_type().items():
+            lines.append(f'  {connection_type.name}: {count}')
+
+        lines.extend(['', f'Top {top_count} classes by fan-in (number of classes depending on them):'])
+        fan_in_ranking: List[Tuple[int, int]] = self.rank_by_fan_in(top_count)
+        lines.extend([f'  {count:6d} {self.class_names[class_id]}' for class_id, count in fan_in_ranking])
+        lines.extend(['', f'Top {top_count} classes by fan-out (number of classes they depend on):'])
+        lines.extend([f'  {count:6d} {self.class_names[class_id]}' for class_id, count in self.rank_by_fan_out(top_count)])
+
+        cycles: List[List[int]] = self.get_cycles()
+        lines.extend(['', f'Dependency cycles (strongly connected components): {len(cycles)}'])
+        for cycle in cycles:
+            lines.append(f'  {len(cycle)} classes: {", ".join(self.class_names[class_id] for class_id in cycle)}')
+
+        lines.extend(['', f'Neighbourhoods of the top fan-in classes up to {hop_count} hops (dependencies and dependents):'])
+        for class_id, _ in fan_in_ranking:
+            distances: Dict[int, int] = self.get_neighbourhood(class_id, hop_count)
+            hop_sizes: List[int] = [0] * (hop_count + 1)
+            for distance in distances.values():
+                hop_sizes[distance] += 1
+            lines.append(f'  {self.class_names[class_id]}: ' + \
+                ', '.join(f'{hop} hop{"s" if hop > 1 else ""}: {hop_sizes[hop]}' for hop in range(1, hop_count + 1)))
+        return lines
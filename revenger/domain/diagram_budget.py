@@ -0,0 +1,39 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import math
+
+@dataclass
+class DiagramBudget:
+    max_classes: int = None
+    max_relations: int = None
+    max_members: int = None
+
+    def is_limited(self) -> bool:
+        return self.max_classes is not None or self.max_relations is not None or self.max_members is not None
+
+@dataclass
+class DiagramSize:
+    class_count: int = 0
+    relation_count: int = 0
+    member_count: int = 0
+
+    @staticmethod
+    def __is_within(count: int, max_count: int) -> bool:
+        return max_count is None or count <= max_count
+
+    def is_within(self, budget: DiagramBudget) -> bool:
+        return DiagramSize.__is_within(self.class_count, budget.max_classes) and \
+            DiagramSize.__is_within(self.relation_count, budget.max_relations) and \
+            DiagramSize.__is_within(self.member_count, budget.max_members)
+
+    def get_sheet_class_count(self, budget: DiagramBudget) -> int:
+        # Classes per sheet so that each sheet roughly fits the budget, assuming relations and members are evenly spread
+        sheet_class_count: int = self.class_count
+        for count, max_count in [(self.class_count, budget.max_classes), (self.relation_count, budget.max_relations), \
+                (self.member_count, budget.max_members)]:
+            if max_count is not None and count > max_count:
+                sheet_class_count = min(sheet_class_count, math.floor(self.class_count * max_count / count))
+        return max(1, sheet_class_count)
+
+    def __str__(self) -> str:
+        return f'{self.class_count} classes, {self.relation_count} relations, {self.member_count} members'
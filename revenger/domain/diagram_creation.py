@@ -1,15 +1,18 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Set
 from abc import ABC, abstractmethod
+import math
 import re
 
-from pprint import pprint
-
-from domain.saver import Saver
-from domain.logger import Logger
-from domain.common import Common
-from domain.datastructure import Datastructure
+from revenger.domain.saver import Saver
+from revenger.domain.logger import Logger
+from revenger.domain.common import Common
+from revenger.domain.datastructure import Datastructure
+from revenger.domain.edge_table import EdgeTable
+from revenger.domain.class_fragment_cache import ClassFragmentCache
+from revenger.domain.diagram_budget import DiagramBudget
+from revenger.domain.diagram_budget import DiagramSize
 
 
 
@@ -18,22 +21,55 @@ class DiagramCreation:
     SIMPLIFIED_FILENAME_SUFFIX: str         = '-diagram-simplified.puml'
     DETAILED_PER_NS_FILE_NAME_SUFFIX: str   = '-diagram-detailed-grouped-per-namespace.puml'
     SIMPLIFIED_PER_NS_FILE_NAME_SUFFIX: str = '-diagram-simplified-grouped-per-namespace.puml'
+    # Extension of the rendered files the diagrams link to by default (svgz when they are compressed)
+    LINK_SUFFIX: str                        = 'svg'
 
-    def __init__(self, datastructure: Datastructure, saver: Saver, logger: Logger):
+    def __init__(self, datastructure: Datastructure, saver: Saver, logger: Logger, \
+            edge_table: EdgeTable = None, fragment_cache: ClassFragmentCache = None, diagram_budget: DiagramBudget = None, \
+            hub_class_names: Set[str] = None, link_per_module: bool = False, link_suffix: str = LINK_SUFFIX):
         self.datastructure: Datastructure = datastructure
         self.saver = saver
         self.logger = logger
+        self.edge_table: EdgeTable = edge_table
+        self.fragment_cache: ClassFragmentCache = fragment_cache
+        self.diagram_budget: DiagramBudget = diagram_budget if diagram_budget is not None and diagram_budget.is_limited() else None
+        # Relations to hub classes are summarized in a note instead of being drawn
+        self.hub_class_names: Set[str] = hub_class_names if hub_class_names else None
+        self.page_names: List[str] = None
+        # Classes link to the diagram of their module instead of their own diagram
+        self.link_per_module: bool = link_per_module
+        self.link_suffix: str = link_suffix
     
     def get_data_structure(self) -> Datastructure:
         return self.datastructure
 
+    def get_edge_table(self) -> EdgeTable:
+        return self.edge_table
+
+    def set_hub_class_names(self, hub_class_names: Set[str]) -> None:
+        self.hub_class_names = hub_class_names if hub_class_names else None
+
+    def get_class_link_name(self, sub_datastructure: Datastructure.SubDataStructure) -> str:
+        if not self.link_per_module:
+            return sub_datastructure.get_fqdn_class_name()
+        # Classes that were not read from a source file link to the full diagram
+        return sub_datastructure.get_filemodule() if len(sub_datastructure.get_filemodule()) > 0 else 'full'
+
+    def __is_hub_class(self, class_name: str) -> bool:
+        return self.hub_class_names is not None and class_name in self.hub_class_names
+
+    def __get_fragment_cache(self) -> ClassFragmentCache:
+        if self.fragment_cache is None:
+            self.fragment_cache = ClassFragmentCache(self.logger)
+        return self.fragment_cache
+
 
     def __add_inexistent_class(self, class_name: str):
         no_file_read: str = "**NoFileRead**"
         color: str = 'MintCream'
         if class_name != Common.COMPLEX_TYPE and \
             class_name not in self.datastructure.get_skip_types() and \
-            class_name not in self.datastructure.get_classname_list():
+            not self.datastructure.class_exists(class_name):
             self.logger.log_debug(f'  Creating non defined type {class_name} as Grey type.')
             tmp_sub_datastructure: Datastructure.SubDataStructure = \
                 self.datastructure.append_class(no_file_read, "", {}, class_name, [])
@@ -49,25 +85,14 @@ class DiagramCreation:
                 for inner_class_name in sub_datastructure.get_inner_class_name():
                     self.__add_inexistent_class(inner_class_name)
 
-                static_field: Datastructure.Static
-                for static_field in sub_datastructure.get_static_fields():
-                    _, naked_type, _ = Common.reduce_member_type(static_field.static_type)
-                    self.__add_inexistent_class(naked_type)
-
-                variable_field: Datastructure.Variable
-                for variable_field in sub_datastructure.get_variable_fields():
-                    if variable_field.is_member or not skip_uses_relation:
-                        _, naked_type, _ = Common.reduce_member_type(variable_field.variable_type)
+                for member_type, connection_type in sub_datastructure.get_member_types():
+                    if connection_type != Common.ConnectionType.USES or not skip_uses_relation:
+                        _, naked_type, _ = Common.reduce_member_type(member_type)
                         self.__add_inexistent_class(naked_type)
 
-                if not skip_uses_relation:
-                    for method_field in sub_datastructure.get_method_fields():
-                        for parameter in method_field.parameters:
-                            _, naked_type, _ = Common.reduce_member_type(parameter.user_type)
-                            self.__add_inexistent_class(naked_type)
-
     @staticmethod
-    def __get_file_name_from_class_namespace_name(detailed: bool, grouped_per_ns: bool, class_name: str, want_svg_file: bool) -> str:
+    def __get_file_name_from_class_namespace_name(detailed: bool, grouped_per_ns: bool, class_name: str, want_svg_file: bool, \
+            link_suffix: str = LINK_SUFFIX) -> str:
         file_name: str = ''
         if detailed:
             if grouped_per_ns:
@@ -81,10 +106,21 @@ class DiagramCreation:
                 file_name = f'{class_name}{DiagramCreation.SIMPLIFIED_FILENAME_SUFFIX}'            
 
         if want_svg_file:
-            file_name = re.sub('puml$', 'svg', file_name)
+            file_name = re.sub('puml$', link_suffix, file_name)
         
         return file_name
     
+    @staticmethod
+    def get_diagram_file_name(detailed: bool, grouped_per_ns: bool, class_namespace_name: str, want_svg_file: bool, \
+            link_suffix: str = LINK_SUFFIX) -> str:
+        return DiagramCreation.__get_file_name_from_class_namespace_name(detailed, grouped_per_ns, class_namespace_name, want_svg_file, link_suffix)
+
+    @staticmethod
+    def get_diagram_header(detailed: bool, grouped_per_ns: bool, class_namespace_name: str = None, \
+            link_suffix: str = LINK_SUFFIX) -> Tuple[str, str, str, str, str, str]:
+        # Title and puml file name of a diagram followed by the titles and svg file names of two related diagrams
+        return DiagramCreation.__get_file_name(detailed, grouped_per_ns, class_namespace_name, link_suffix)
+
     @staticmethod
     def __get_user_info(detailed: bool, grouped_per_ns: bool, class_namespace_name: str) -> str:
         user_info_detailed = 'simplified' if not detailed else 'detailed'
@@ -92,9 +128,9 @@ class DiagramCreation:
         return f'{class_namespace_name} **{user_info_detailed}** {user_info_svg_grouped}'
 
     @staticmethod
-    def __get_file_name(detailed: bool, grouped_per_ns: bool, class_namespace_name: str = None) -> Tuple[str, str, str]:
+    def __get_file_name(detailed: bool, grouped_per_ns: bool, class_namespace_name: str = None, link_suffix: str = LINK_SUFFIX) -> Tuple[str, str, str]:
 
-        puml2svg = lambda file_name :  re.sub('puml$', 'svg', file_name)
+        puml2svg = lambda file_name :  re.sub('puml$', link_suffix, file_name)
         full_detailed_file_name: str            = f'full{DiagramCreation.DETAILED_FILENAME_SUFFIX}'
         full_simplified_file_name: str          = f'full{DiagramCreation.SIMPLIFIED_FILENAME_SUFFIX}'
         full_detailed_file_name_per_ns: str     = f'full{DiagramCreation.DETAILED_PER_NS_FILE_NAME_SUFFIX}'
@@ -129,7 +165,8 @@ class DiagramCreation:
         puml_file: str = DiagramCreation.__get_file_name_from_class_namespace_name(detailed, grouped_per_ns, class_namespace_name, False)
 
         user_info_opposite_detailed_svg: str = DiagramCreation.__get_user_info(not detailed, grouped_per_ns, class_namespace_name)
-        svg_file_name_opposite_detailed: str = DiagramCreation.__get_file_name_from_class_namespace_name(not detailed, grouped_per_ns, class_namespace_name, True)
+        svg_file_name_opposite_detailed: str = DiagramCreation.__get_file_name_from_class_namespace_name(not detailed, grouped_per_ns, class_namespace_name, True, \
+            link_suffix)
 
         full_file_name: str = full_file_name_simplified_per_ns
         user_info_full_file_name: str = f"Full diagram **simplified** and **grouped per namespace**"
@@ -143,10 +180,10 @@ class DiagramCreation:
                 user_info_full_file_name, full_file_name
 
     @staticmethod
-    def __get_namespace_name(namespace_list: List[str], index: int, detailed: bool, grouped_per_ns: bool) -> str:
+    def __get_namespace_name(namespace_list: List[str], index: int, detailed: bool, grouped_per_ns: bool, link_suffix: str = LINK_SUFFIX) -> str:
         namespace_name: str = '.'.join([ namespace for namespace in namespace_list[0: index]])
 
-        namespace_filtered_filename: str = DiagramCreation.__get_file_name_from_class_namespace_name(detailed, grouped_per_ns, namespace_name, True)
+        namespace_filtered_filename: str = DiagramCreation.__get_file_name_from_class_namespace_name(detailed, grouped_per_ns, namespace_name, True, link_suffix)
 
         return f'namespace {namespace_name} [[{namespace_filtered_filename}]] {{'
 
@@ -155,7 +192,8 @@ class DiagramCreation:
         if ending_file:
 
             if len(previous_sub_namespace_list) > 0 and \
-                saver.removed_last_line_if_same(DiagramCreation.__get_namespace_name(previous_sub_namespace_list, len(previous_sub_namespace_list), detailed, grouped_per_ns)):
+                saver.removed_last_line_if_same(DiagramCreation.__get_namespace_name(previous_sub_namespace_list, len(previous_sub_namespace_list), detailed, grouped_per_ns, \
+                    self.link_suffix)):
                 previous_sub_namespace_list.pop()
             saver.append(f'\' Closing all previous_sub_namespace_list namespace {current_sub_namespace_list} because file analysis is finished.' )  
             while len(previous_sub_namespace_list) > 0:
@@ -167,13 +205,14 @@ class DiagramCreation:
             previous_sub_namespace_list.extend(current_sub_namespace_list)
             #saver.append(f'\' Creating namespaces {current_sub_namespace_list} because previous_sub_namespace_list is empty' )  
             for index in range(0, len(current_sub_namespace_list)):
-                saver.append(DiagramCreation.__get_namespace_name(current_sub_namespace_list, index + 1, detailed, grouped_per_ns))
+                saver.append(DiagramCreation.__get_namespace_name(current_sub_namespace_list, index + 1, detailed, grouped_per_ns, self.link_suffix))
             return          
         
         root_index: int = 0
         index: int = 0
         if len(current_sub_namespace_list) == 0 or current_sub_namespace_list[0] not in previous_sub_namespace_list:
-            if saver.removed_last_line_if_same(DiagramCreation.__get_namespace_name(previous_sub_namespace_list, len(previous_sub_namespace_list), detailed, grouped_per_ns)):
+            if saver.removed_last_line_if_same(DiagramCreation.__get_namespace_name(previous_sub_namespace_list, len(previous_sub_namespace_list), detailed, grouped_per_ns, \
+                    self.link_suffix)):
                 previous_sub_namespace_list.pop()
             saver.append(f'\' Closing all previous_sub_namespace_list namespace because previous_ns: {current_sub_namespace_list} and current_ns: {current_sub_namespace_list})' )  
             while len(previous_sub_namespace_list) > 0:
@@ -190,7 +229,8 @@ class DiagramCreation:
                     break
             
             if not found:
-                if saver.removed_last_line_if_same(DiagramCreation.__get_namespace_name(previous_sub_namespace_list, len(previous_sub_namespace_list), detailed, grouped_per_ns)):
+                if saver.removed_last_line_if_same(DiagramCreation.__get_namespace_name(previous_sub_namespace_list, len(previous_sub_namespace_list), detailed, grouped_per_ns, \
+                    self.link_suffix)):
                     previous_sub_namespace_list.pop()
                     index -= 1
                 saver.append(f'\' Closing previous_sub_namespace_list namespace from index {index} because previous_ns: {current_sub_namespace_list} and current_ns: {current_sub_namespace_list})' )  
@@ -201,40 +241,26 @@ class DiagramCreation:
         for sub_index in range(index - root_index, len(current_sub_namespace_list)):
             namespace = current_sub_namespace_list[sub_index]
             previous_sub_namespace_list.append(namespace)
-            saver.append(DiagramCreation.__get_namespace_name(current_sub_namespace_list, sub_index + 1, detailed, grouped_per_ns))
+            saver.append(DiagramCreation.__get_namespace_name(current_sub_namespace_list, sub_index + 1, detailed, grouped_per_ns, self.link_suffix))
 
     def __create_puml_class(self, sub_datastructure: Datastructure.SubDataStructure, saver: Saver,\
-            detailed: bool, grouped_per_ns: bool, empty_spaces: str):
+            detailed: bool, grouped_per_ns: bool, empty_spaces: str) -> int:
         fqdn_class_name: str = sub_datastructure.get_fqdn_class_name()
         self.logger.log_debug(f'{empty_spaces}- Analyzing class {fqdn_class_name}')
-        is_abstract: str = 'abstract ' if sub_datastructure.is_abstract() else ''
-        class_type: str = 'interface ' if sub_datastructure.is_interface() else 'class '
-        class_link: str = DiagramCreation.__get_file_name_from_class_namespace_name(\
-            detailed, grouped_per_ns, fqdn_class_name, True)
+        header, body = self.__get_fragment_cache().get_fragment(sub_datastructure, detailed, grouped_per_ns, empty_spaces, \
+            lambda: DiagramCreation.__get_file_name_from_class_namespace_name(detailed, grouped_per_ns, \
+                self.get_class_link_name(sub_datastructure), True, self.link_suffix))
         color: str = sub_datastructure.get_color()
         if color is None:
             color = ''
-        saver.append(f'{empty_spaces}{is_abstract}{class_type}{fqdn_class_name} [[{class_link}]] {color} {{')
-
         if detailed:
-            static_field: Datastructure.Static
-            for static_field in sub_datastructure.get_static_fields():
-                saver.append(f'{empty_spaces}  + {{static}} {static_field.static_name}: {static_field.static_type}')
-            #pprint(class_content['members'])
-            variable_field: Datastructure.Variable
-            for variable_field in sub_datastructure.get_variable_fields():
-                saver.append(f'{empty_spaces}  - {variable_field.variable_name}: {variable_field.variable_type}' )
-            method_field: Datastructure.Method
-            for method_field in sub_datastructure.get_method_fields():
-                visible = '+'
-                method_name: str = method_field.method_name
-                parameters: str = ', '.join([f'{parameter.parameter}:{parameter.user_type}' for parameter in method_field.parameters])
-                if method_field.is_private:
-                    visible = '-'
-                saver.append(f'{empty_spaces}  {visible} {method_name}({parameters})' )
-        saver.append(f'{empty_spaces}}}')
+            for member_name in sub_datastructure.get_unsupported_members():
+                saver.append(f'{empty_spaces}\'WARNING: Will not import member named {member_name}')
+        saver.append(f'{header}{color} {{')
+        saver.append_lines(body)
+        return len(body) - 1
     
-    def __create_puml_classes(self, detailed: bool, grouped_per_ns: bool, saver: Saver, from_dir: str) -> None:
+    def __create_puml_classes(self, detailed: bool, grouped_per_ns: bool, saver: Saver, from_dir: str, diagram_size: DiagramSize = None) -> None:
         previous_sub_namespace_list: List[str] = []
         list_file_namespaces = self.datastructure.get_sorted_name_spaces()
         for namespace_name in list_file_namespaces:
@@ -245,7 +271,10 @@ class DiagramCreation:
 
             empty_spaces = '  ' * (max(len(current_sub_namespace_list) - 1, 0))
             for sub_datastructure in classes:
-                self.__create_puml_class(sub_datastructure, saver, detailed, grouped_per_ns, empty_spaces)
+                member_count: int = self.__create_puml_class(sub_datastructure, saver, detailed, grouped_per_ns, empty_spaces)
+                if diagram_size is not None:
+                    diagram_size.class_count += 1
+                    diagram_size.member_count += member_count
 
             if grouped_per_ns:
                 self.__sub_namespace_handler(previous_sub_namespace_list, None, detailed, grouped_per_ns, saver, True)
@@ -255,79 +284,38 @@ class DiagramCreation:
         saver.append(' \' *************************************** ')
 
 
-    def __create_puml_connection(self, class_name: str, full_member_type: str, connection_type: Common.ConnectionType, saver: Saver) -> None:
-        connection, member_type, note = Common.reduce_member_type(full_member_type, connection_type)
-        if member_type not in self.datastructure.get_skip_types() and \
-                class_name not in self.datastructure.get_skip_types():
-            saver.append_connection(f'{class_name} {connection} {member_type} {note}')
+    def __get_edge_table(self, skip_uses_relation: bool) -> EdgeTable:
+        if self.edge_table is None or self.edge_table.get_skip_uses_relation() != skip_uses_relation:
+            self.edge_table = EdgeTable(self.datastructure.get_skip_types(), skip_uses_relation, self.logger)
+        return self.edge_table
 
-    def __create_puml_classes_relations(self, saver: Saver, create_all_relation: bool, skip_uses_relation: bool) -> None:
+    def __create_puml_classes_relations(self, saver: Saver, create_all_relation: bool, skip_uses_relation: bool, \
+            diagram_size: DiagramSize = None) -> None:
+        edge_table: EdgeTable = self.__get_edge_table(skip_uses_relation)
+        hub_referrer_names: Dict[str, Set[str]] = {}
         for namespace_name in self.datastructure.get_sorted_name_spaces():
             saver.append(f'\' Class relations extracted from namespace:\n\' {namespace_name}')
             sub_datastructure: Datastructure.SubDataStructure
             for sub_datastructure in self.datastructure.get_datastructures_from_namespace(namespace_name):
-                class_name = sub_datastructure.get_fqdn_class_name()
-                self.logger.log_debug(f' Creation relations for class {class_name} (create_all_relation: {create_all_relation}, Namespace {namespace_name})')
-                for base in sub_datastructure.get_base_classes():
-                    if base not in self.datastructure.get_skip_types() and \
-                        class_name not in self.datastructure.get_skip_types():
-                        if create_all_relation or self.datastructure.class_exists(base):
-                            saver.append_connection(f'{base} <|-- {class_name}')
-                        else:
-                            self.logger.log_debug(\
-                                f'  Relation skipped: {base} <|-- {class_name} ' + \
-                                    f'(create_all_relation: {create_all_relation}, ' + \
-                                        f'datastructure.class_exists({base}): {self.datastructure.class_exists(base)})')
-                for inner_class_name in sub_datastructure.get_inner_class_name():
-                    if create_all_relation or self.datastructure.class_exists(inner_class_name):
-                        self.__create_puml_connection(class_name, inner_class_name, Common.ConnectionType.IS_INNER_CLASS, saver)
-                    else:
-                        self.logger.log_debug(f'  Relation skipped: {class_name} +-- {inner_class_name} ' + \
-                            f'(create_all_relation: {create_all_relation}, datastructure.class_exists({inner_class_name}): ' + \
-                                f'{self.datastructure.class_exists(inner_class_name)})')
-                
-                static_field: Datastructure.Static
-                for static_field in sub_datastructure.get_static_fields():
-                    _, naked_type, _ = Common.reduce_member_type(static_field.static_type)
-                    if create_all_relation or self.datastructure.class_exists(naked_type):
-                        self.__create_puml_connection(class_name, static_field.static_type, Common.ConnectionType.IS_MEMBER, saver)
+                self.logger.log_debug(f' Creation relations for class {sub_datastructure.get_fqdn_class_name()} (create_all_relation: {create_all_relation}, Namespace {namespace_name})')
+                for target_class_name, relation, _, _ in edge_table.get_edges(sub_datastructure):
+                    if self.__is_hub_class(target_class_name):
+                        hub_referrer_names.setdefault(target_class_name, set()).add(sub_datastructure.get_fqdn_class_name())
+                    elif create_all_relation or self.datastructure.class_exists(target_class_name):
+                        saver.append(relation)
+                        if diagram_size is not None:
+                            diagram_size.relation_count += 1
                     else:
-                        self.logger.log_debug(f'  Relation skipped: {class_name} *-- {naked_type} ' + \
-                            f'(create_all_relation: {create_all_relation}, datastructure.class_exists({naked_type}): ' + \
-                                f'{self.datastructure.class_exists(naked_type)})')
-                variable_field: Datastructure.Variable
-                for variable_field in sub_datastructure.get_variable_fields():
-                    _, naked_type, _ = Common.reduce_member_type(variable_field.variable_type)
-                    if create_all_relation or self.datastructure.class_exists(naked_type):
-                        connection_type: str = Common.ConnectionType.IS_MEMBER if variable_field.is_member else Common.ConnectionType.USES
-                        if (not skip_uses_relation) or connection_type == Common.ConnectionType.IS_MEMBER:
-                            self.__create_puml_connection(class_name, variable_field.variable_type, connection_type, saver)
-                            self.logger.log_trace(f'  Relation created: {class_name} --- {naked_type} (Original type: {variable_field.variable_type}) ' + \
-                                f'(skip_uses_relation: {skip_uses_relation}, connection_type: {connection_type}, is_member: {variable_field.is_member})')
-                        else:
-                            self.logger.log_debug(f'  Relation skipped: {class_name} --> {naked_type} ' + \
-                                f'(skip_uses_relation: {skip_uses_relation}, connection_type: {connection_type})')
-                    else:
-                        self.logger.log_debug(f'  Relation skipped: {class_name} ?-- {naked_type} ' + \
-                            f'(create_all_relation: {create_all_relation}, datastructure.class_exists({naked_type}): ' + \
-                                f'{self.datastructure.class_exists(naked_type)})')
-                for method_field in sub_datastructure.get_method_fields():
-                    for parameter in method_field.parameters:
-                        _, naked_type, _ = Common.reduce_member_type(parameter.user_type)
-                        if (not skip_uses_relation) and (create_all_relation or self.datastructure.class_exists(naked_type)):
-                            self.__create_puml_connection(class_name, parameter.user_type, Common.ConnectionType.USES, saver)
-                            self.logger.log_debug(f'  Relation Created (Uses): {class_name} --> {naked_type} ' + \
-                                f'(create_all_relation: {create_all_relation}, self.datastructure.class_exists({naked_type}): ' + \
-                                    f'{self.datastructure.class_exists(naked_type)}, skip_uses_relation: {skip_uses_relation})')
-                        else:
-                            self.logger.log_debug(f'  Relation skipped: {class_name} --> {naked_type} ' + \
-                                f'(create_all_relation: {create_all_relation}, self.datastructure.class_exists({naked_type}): ' + \
-                                    f'{self.datastructure.class_exists(naked_type)}, skip_uses_relation: {skip_uses_relation})')
-            
-    def __create_full_diagram(self, detailed: bool, grouped_per_ns: bool, from_dir: str, skip_uses_relation: bool, class_namespace_name: str = None) -> None:
+                        self.logger.log_debug(f'  Relation skipped: {relation} (class {target_class_name} is not part of the diagram)')
+        if len(hub_referrer_names) > 0:
+            saver.append('note "==Hub classes==\\nTheir relations are not drawn:\\n' + \
+                '\\n'.join(f'* {hub_class_name} (used by {len(hub_referrer_names[hub_class_name])} classes):\\n   ' + \
+                    f'[[{DiagramCreation.__get_file_name_from_class_namespace_name(False, False, hub_class_name, True, self.link_suffix)}]]' \
+                        for hub_class_name in sorted(hub_referrer_names.keys())) + '" as HubNote')
+
+    def __create_diagram_header(self, user_info_filename: str, user_info_link_1: str, link_path_1: str, \
+            user_info_link_2: str, link_path_2: str) -> Saver:
         saver: Saver = self.saver.clone()
-        user_info_filename, filename, user_info_link_1, link_path_1, user_info_link_2, link_path_2 = \
-            DiagramCreation.__get_file_name(detailed, grouped_per_ns, class_namespace_name)
         saver.append(f'title <size:20>{user_info_filename}</size>')
         saver.append( f'note "Your are analyzing:\\n{user_info_filename}\\n\\n' +
                       '==Filter==\\n' +
@@ -336,13 +324,142 @@ class DiagramCreation:
                       'direct dependencies.\\n\\n' +
                       '==Select other==\\n' +
                       f'* {user_info_link_1}:\\n   [[{link_path_1}]]\\n* {user_info_link_2}:\\n   [[{link_path_2}]]" as FloatingNote')
-        self.__create_puml_classes(detailed, grouped_per_ns, saver, from_dir)
+        return saver
+
+    @staticmethod
+    def __append_budget_note(saver: Saver, diagram_size: DiagramSize, fallback: str) -> None:
+        saver.append(f'note "==Diagram too large==\\n{diagram_size}\\nare over the diagram budget:\\n{fallback}" as BudgetNote')
+
+    def __create_full_diagram(self, detailed: bool, grouped_per_ns: bool, from_dir: str, skip_uses_relation: bool, class_namespace_name: str = None) -> None:
+        user_info_filename, filename, user_info_link_1, link_path_1, user_info_link_2, link_path_2 = \
+            DiagramCreation.__get_file_name(detailed, grouped_per_ns, class_namespace_name, self.link_suffix)
+        header: Tuple[str, str, str, str, str] = (user_info_filename, user_info_link_1, link_path_1, user_info_link_2, link_path_2)
+        saver: Saver = self.__create_diagram_header(*header)
+        diagram_size: DiagramSize = DiagramSize()
+        self.__create_puml_classes(detailed, grouped_per_ns, saver, from_dir, diagram_size)
         create_all_relation: bool = class_namespace_name == None
-        self.__create_puml_classes_relations(saver, create_all_relation, skip_uses_relation)
+        self.__create_puml_classes_relations(saver, create_all_relation, skip_uses_relation, diagram_size)
+        if self.diagram_budget is not None and not diagram_size.is_within(self.diagram_budget):
+            saver = self.__create_fallback_diagram(detailed, grouped_per_ns, from_dir, skip_uses_relation, create_all_relation, \
+                diagram_size, filename, header)
+        if self.page_names is not None and len(self.page_names) > 1:
+            self.__append_page_note(saver, detailed, grouped_per_ns, class_namespace_name)
         saver.append('@enduml')
         saver.save(filename)
 
-    def create_puml_files(self, from_dir: str, skip_uses_relation: bool, class_namespace_name: str = None) -> None:
+    def __append_page_note(self, saver: Saver, detailed: bool, grouped_per_ns: bool, class_namespace_name: str) -> None:
+        page_index: int = self.page_names.index(class_namespace_name)
+        page_links: List[str] = [f'Page {page_index + 1}/{len(self.page_names)}']
+        if page_index > 0:
+            page_links.append('* Previous page: [[' + \
+                DiagramCreation.__get_file_name_from_class_namespace_name(detailed, grouped_per_ns, self.page_names[page_index - 1], True, \
+                    self.link_suffix) + ']]')
+        if page_index < len(self.page_names) - 1:
+            page_links.append('* Next page: [[' + \
+                DiagramCreation.__get_file_name_from_class_namespace_name(detailed, grouped_per_ns, self.page_names[page_index + 1], True, \
+                    self.link_suffix) + ']]')
+        saver.append('note "==Classes referencing this hub class==\\n' + '\\n'.join(page_links) + '" as PageNote')
+
+    def __create_fallback_diagram(self, detailed: bool, grouped_per_ns: bool, from_dir: str, skip_uses_relation: bool, \
+            create_all_relation: bool, diagram_size: DiagramSize, filename: str, header: Tuple[str, str, str, str, str]) -> Saver:
+        saver: Saver = self.__create_diagram_header(*header)
+        if detailed and DiagramSize(diagram_size.class_count, diagram_size.relation_count, 0).is_within(self.diagram_budget):
+            self.logger.log_warn(f'{filename} is too large ({diagram_size}): creating it without members')
+            DiagramCreation.__append_budget_note(saver, diagram_size, 'members are not shown.')
+            self.__create_puml_classes(False, grouped_per_ns, saver, from_dir)
+            self.__create_puml_classes_relations(saver, create_all_relation, skip_uses_relation)
+            return saver
+        if self.__create_namespace_overview(saver, detailed, grouped_per_ns, create_all_relation, skip_uses_relation, diagram_size):
+            self.logger.log_warn(f'{filename} is too large ({diagram_size}): creating an overview of its namespaces')
+            return saver
+        self.logger.log_warn(f'{filename} is too large ({diagram_size}): creating it on several sheets')
+        self.__create_sheets(saver, detailed, grouped_per_ns, from_dir, skip_uses_relation, diagram_size, filename, header[0])
+        return saver
+
+    @staticmethod
+    def __get_overview_namespace(class_name: str, depth: int) -> str:
+        return '.'.join(class_name.split('.')[0: -1][0: depth])
+
+    def __create_namespace_overview(self, saver: Saver, detailed: bool, grouped_per_ns: bool, create_all_relation: bool, \
+            skip_uses_relation: bool, diagram_size: DiagramSize) -> bool:
+        edge_table: EdgeTable = self.__get_edge_table(skip_uses_relation)
+        class_relations: List[Tuple[str, List[str]]] = []
+        for namespace_name in self.datastructure.get_sorted_name_spaces():
+            for sub_datastructure in self.datastructure.get_datastructures_from_namespace(namespace_name):
+                class_relations.append((sub_datastructure.get_fqdn_class_name(), \
+                    [target_class_name for target_class_name, _, _, _ in edge_table.get_edges(sub_datastructure) \
+                        if not self.__is_hub_class(target_class_name) and \
+                            (create_all_relation or self.datastructure.class_exists(target_class_name))]))
+
+        # The deepest namespace level fitting the budget is shown
+        max_depth: int = max([len(class_name.split('.')) - 1 for class_name, _ in class_relations] + [1])
+        for depth in range(max_depth, 0, -1):
+            namespace_class_counts: Dict[str, int] = {}
+            namespace_relation_counts: Dict[Tuple[str, str], int] = {}
+            for class_name, target_class_names in class_relations:
+                namespace: str = DiagramCreation.__get_overview_namespace(class_name, depth)
+                namespace_class_counts[namespace] = namespace_class_counts.get(namespace, 0) + 1
+                for target_class_name in target_class_names:
+                    target_namespace: str = DiagramCreation.__get_overview_namespace(target_class_name, depth)
+                    if target_namespace != namespace:
+                        namespace_relation_counts[(namespace, target_namespace)] = namespace_relation_counts.get((namespace, target_namespace), 0) + 1
+            for target_namespace in {target_namespace for _, target_namespace in namespace_relation_counts.keys()}:
+                namespace_class_counts.setdefault(target_namespace, 0)
+            if DiagramSize(len(namespace_class_counts), len(namespace_relation_counts), 0).is_within(self.diagram_budget):
+                DiagramCreation.__append_budget_note(saver, diagram_size, \
+                    f'classes are grouped per namespace (level {depth}),\\nclick a namespace to see its classes.')
+                aliases: Dict[str, str] = {}
+                for namespace in sorted(namespace_class_counts.keys()):
+                    aliases[namespace] = f'namespace_{len(aliases)}'
+                    label: str = namespace if len(namespace) > 0 else '(no namespace)'
+                    link: str = f' [[{DiagramCreation.__get_file_name_from_class_namespace_name(detailed, grouped_per_ns, namespace, True, self.link_suffix)}]]' \
+                        if len(namespace) > 0 else ''
+                    saver.append(f'package "{label} ({namespace_class_counts[namespace]} classes)" as {aliases[namespace]}{link} {{\n}}')
+                for (namespace, target_namespace), relation_count in sorted(namespace_relation_counts.items()):
+                    saver.append(f'{aliases[namespace]} --> {aliases[target_namespace]} : {relation_count} relations')
+                return True
+        return False
+
+    def __create_sheets(self, saver: Saver, detailed: bool, grouped_per_ns: bool, from_dir: str, skip_uses_relation: bool, \
+            diagram_size: DiagramSize, filename: str, user_info_filename: str) -> None:
+        sub_datastructures: List[Datastructure.SubDataStructure] = []
+        for namespace_name in self.datastructure.get_sorted_name_spaces():
+            sub_datastructures.extend(self.datastructure.get_datastructures_from_namespace(namespace_name))
+        sheet_class_count: int = diagram_size.get_sheet_class_count(self.diagram_budget)
+        sheet_count: int = math.ceil(len(sub_datastructures) / sheet_class_count)
+        sheet_detailed: bool = detailed and \
+            (self.diagram_budget.max_members is None or diagram_size.member_count <= self.diagram_budget.max_members)
+        sheet_file_names: List[str] = [re.sub('\\.puml$', f'-sheet-{sheet_index + 1}.puml', filename) for sheet_index in range(0, sheet_count)]
+        puml2svg = lambda file_name :  re.sub('puml$', self.link_suffix, file_name)
+
+        DiagramCreation.__append_budget_note(saver, diagram_size, \
+            f'classes are shown on {sheet_count} sheets,\\nonly relations within a sheet are shown.')
+        saver.append('note "==Sheets==\\n' + \
+            '\\n'.join(f'* Sheet {sheet_index + 1}: [[{puml2svg(sheet_file_name)}]]' for sheet_index, sheet_file_name in enumerate(sheet_file_names)) + \
+                '" as SheetsNote')
+        edge_table: EdgeTable = self.__get_edge_table(skip_uses_relation)
+        for sheet_index in range(0, sheet_count):
+            sheet_datastructure: Datastructure = self.datastructure.create_empty()
+            for sub_datastructure in sub_datastructures[sheet_index * sheet_class_count: (sheet_index + 1) * sheet_class_count]:
+                sheet_datastructure.append_sub_datastructure(sub_datastructure)
+            sheet_links: List[str] = [f'* All sheets: [[{puml2svg(filename)}]]']
+            if sheet_index > 0:
+                sheet_links.append(f'* Previous sheet: [[{puml2svg(sheet_file_names[sheet_index - 1])}]]')
+            if sheet_index < sheet_count - 1:
+                sheet_links.append(f'* Next sheet: [[{puml2svg(sheet_file_names[sheet_index + 1])}]]')
+            sheet_saver: Saver = self.saver.clone()
+            sheet_saver.append(f'title <size:20>{user_info_filename} (sheet {sheet_index + 1}/{sheet_count})</size>')
+            sheet_saver.append('note "' + '\\n'.join(sheet_links) + '" as FloatingNote')
+            sheet_diagram_creation: DiagramCreation = DiagramCreation(sheet_datastructure, self.saver, self.logger, \
+                edge_table, self.__get_fragment_cache(), None, self.hub_class_names, self.link_per_module, self.link_suffix)
+            sheet_diagram_creation.__create_puml_classes(sheet_detailed, grouped_per_ns, sheet_saver, from_dir)
+            sheet_diagram_creation.__create_puml_classes_relations(sheet_saver, False, skip_uses_relation)
+            sheet_saver.append('@enduml')
+            sheet_saver.save(sheet_file_names[sheet_index])
+
+    def create_puml_files(self, from_dir: str, skip_uses_relation: bool, class_namespace_name: str = None, page_names: List[str] = None) -> None:
+        # page_names: names of all the pages of a hub class diagram, class_namespace_name being one of them
+        self.page_names = page_names
         detailed: bool = True
         grouped_per_ns: bool = True
         self.__create_full_diagram(detailed,     not grouped_per_ns,  from_dir, skip_uses_relation, class_namespace_name)
@@ -0,0 +1,176 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple, Set
+import html
+import re
+
+from revenger.domain.saver import Saver
+from revenger.domain.logger import Logger
+from revenger.domain.common import Common
+from revenger.domain.datastructure import Datastructure
+from revenger.domain.edge_table import EdgeTable
+from revenger.domain.diagram_creation import DiagramCreation
+
+class DotDiagramCreation(DiagramCreation):
+    # Same diagrams, file names and links as DiagramCreation written as Graphviz DOT:
+    # they are rendered by dot (or any Graphviz binding) without starting plantuml.
+    FILE_NAME_SUFFIX: str = '.dot'
+    EDGE_ATTRIBUTES: Dict[Common.ConnectionType, str] = {
+        Common.ConnectionType.IS_BASE: 'arrowhead=empty',
+        Common.ConnectionType.IS_MEMBER: 'dir=back, arrowtail=diamond',
+        Common.ConnectionType.IS_INNER_CLASS: 'dir=back, arrowtail=odot',
+        Common.ConnectionType.USES: 'arrowhead=vee'
+    }
+
+    @dataclass
+    class Cluster:
+        name: str
+        clusters: Dict[str, DotDiagramCreation.Cluster] = field(default_factory=dict)
+        sub_datastructures: List[Datastructure.SubDataStructure] = field(default_factory=list)
+
+    @staticmethod
+    def get_dot_file_name(puml_file_name: str) -> str:
+        return re.sub('\\.puml$', DotDiagramCreation.FILE_NAME_SUFFIX, puml_file_name)
+
+    @staticmethod
+    def __quote(text: str) -> str:
+        return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+    @staticmethod
+    def __escape_record(text: str) -> str:
+        return re.sub(r'([{}|<>"\\])', r'\\\1', text)
+
+    @staticmethod
+    def __to_html(text: str) -> str:
+        # Plantuml creole bold (**text** and ==text==) is kept as bold
+        text = html.escape(text)
+        text = re.sub(r'\*\*(.+?)\*\*', r'<B>\1</B>', text)
+        return re.sub(r'==(.+?)==', r'<B>\1</B>', text)
+
+    @staticmethod
+    def __create_note(note_name: str, lines: List[str], links: List[Tuple[str, str]]) -> str:
+        rows: List[str] = [f'<TR><TD ALIGN="LEFT" BALIGN="LEFT">{"<BR/>".join(DotDiagramCreation.__to_html(line) for line in lines)}</TD></TR>']
+        for user_info, link in links:
+            rows.append(f'<TR><TD ALIGN="LEFT" HREF="{html.escape(link)}"><U>{DotDiagramCreation.__to_html(user_info)}</U></TD></TR>')
+        return f'  {note_name} [shape=plaintext, style="", label=<<TABLE BORDER="1" CELLBORDER="0" BGCOLOR="lightyellow">' + \
+            ''.join(rows) + '</TABLE>>];'
+
+    def __create_node(self, sub_datastructure: Datastructure.SubDataStructure, detailed: bool, grouped_per_ns: bool, empty_spaces: str) -> str:
+        fqdn_class_name: str = sub_datastructure.get_fqdn_class_name()
+        header: str = DotDiagramCreation.__escape_record(fqdn_class_name)
+        if sub_datastructure.is_interface():
+            header = f'\\<\\<interface\\>\\>\\n{header}'
+        elif sub_datastructure.is_abstract():
+            header = f'\\<\\<abstract\\>\\>\\n{header}'
+        compartments: List[str] = [header]
+        if detailed:
+            fields: List[str] = [f'+ static {static_field.static_name}: {static_field.static_type}' \
+                for static_field in sub_datastructure.get_static_fields()]
+            fields.extend(f'- {variable_field.variable_name}: {variable_field.variable_type}' \
+                for variable_field in sub_datastructure.get_variable_fields())
+            methods: List[str] = []
+            for method_field in sub_datastructure.get_method_fields():
+                parameters: str = ', '.join([f'{parameter.parameter}:{parameter.user_type}' for parameter in method_field.parameters])
+                methods.append(f'{"-" if method_field.is_private else "+"} {method_field.method_name}({parameters})')
+            for lines in [fields, methods]:
+                compartments.append(''.join(f'{DotDiagramCreation.__escape_record(line)}\\l' for line in lines))
+        attributes: List[str] = ['label="{' + '|'.join(compartments) + '}"', \
+            f'URL={DotDiagramCreation.__quote(DiagramCreation.get_diagram_file_name(detailed, grouped_per_ns, self.get_class_link_name(sub_datastructure), True, self.link_suffix))}', \
+            f'tooltip={DotDiagramCreation.__quote(fqdn_class_name)}']
+        color: str = sub_datastructure.get_color()
+        if color is not None:
+            attributes.append(f'fillcolor={DotDiagramCreation.__quote(color.lstrip("#").lower())}')
+        return f'{empty_spaces}{DotDiagramCreation.__quote(fqdn_class_name)} [{", ".join(attributes)}];'
+
+    def __create_clusters(self) -> DotDiagramCreation.Cluster:
+        root: DotDiagramCreation.Cluster = DotDiagramCreation.Cluster('')
+        for namespace_name in self.datastructure.get_sorted_name_spaces():
+            cluster: DotDiagramCreation.Cluster = root
+            namespace_list: List[str] = self.datastructure.get_namespace_list_from_namespace_name(namespace_name)
+            for index in range(0, len(namespace_list)):
+                cluster_name: str = '.'.join(namespace_list[0: index + 1])
+                if cluster_name not in cluster.clusters:
+                    cluster.clusters[cluster_name] = DotDiagramCreation.Cluster(cluster_name)
+                cluster = cluster.clusters[cluster_name]
+            cluster.sub_datastructures.extend(self.datastructure.get_datastructures_from_namespace(namespace_name))
+        return root
+
+    def __create_cluster(self, saver: Saver, cluster: DotDiagramCreation.Cluster, detailed: bool, grouped_per_ns: bool, empty_spaces: str) -> None:
+        for sub_datastructure in cluster.sub_datastructures:
+            saver.append(self.__create_node(sub_datastructure, detailed, grouped_per_ns, empty_spaces))
+        for sub_cluster in cluster.clusters.values():
+            namespace_file_name: str = DiagramCreation.get_diagram_file_name(detailed, grouped_per_ns, sub_cluster.name, True, self.link_suffix)
+            saver.append(f'{empty_spaces}subgraph {DotDiagramCreation.__quote("cluster_" + sub_cluster.name)} {{')
+            saver.append(f'{empty_spaces}  graph [label={DotDiagramCreation.__quote(sub_cluster.name)}, ' + \
+                f'URL={DotDiagramCreation.__quote(namespace_file_name)}, style=rounded];')
+            self.__create_cluster(saver, sub_cluster, detailed, grouped_per_ns, empty_spaces + '  ')
+            saver.append(f'{empty_spaces}}}')
+
+    def __create_nodes(self, saver: Saver, detailed: bool, grouped_per_ns: bool) -> None:
+        if grouped_per_ns:
+            self.__create_cluster(saver, self.__create_clusters(), detailed, grouped_per_ns, '  ')
+            return
+        for namespace_name in self.datastructure.get_sorted_name_spaces():
+            for sub_datastructure in self.datastructure.get_datastructures_from_namespace(namespace_name):
+                saver.append(self.__create_node(sub_datastructure, detailed, grouped_per_ns, '  '))
+
+    def __create_edges(self, saver: Saver, create_all_relation: bool, skip_uses_relation: bool) -> None:
+        if self.edge_table is None or self.edge_table.get_skip_uses_relation() != skip_uses_relation:
+            self.edge_table = EdgeTable(self.datastructure.get_skip_types(), skip_uses_relation, self.logger)
+        hub_referrer_names: Dict[str, Set[str]] = {}
+        for namespace_name in self.datastructure.get_sorted_name_spaces():
+            for sub_datastructure in self.datastructure.get_datastructures_from_namespace(namespace_name):
+                class_name: str = sub_datastructure.get_fqdn_class_name()
+                for target_class_name, _, connection_type, label in self.edge_table.get_edges(sub_datastructure):
+                    if self.hub_class_names is not None and target_class_name in self.hub_class_names:
+                        hub_referrer_names.setdefault(target_class_name, set()).add(class_name)
+                        continue
+                    if not create_all_relation and not self.datastructure.class_exists(target_class_name):
+                        continue
+                    attributes: List[str] = [DotDiagramCreation.EDGE_ATTRIBUTES[connection_type]]
+                    if label.startswith('(list)') or label.startswith('(set)'):
+                        attributes.append('taillabel="many", headlabel="1"')
+                    if len(label) > 0:
+                        attributes.append(f'label={DotDiagramCreation.__quote(label)}')
+                    saver.append(f'  {DotDiagramCreation.__quote(class_name)} -> {DotDiagramCreation.__quote(target_class_name)} [{", ".join(attributes)}];')
+        if len(hub_referrer_names) > 0:
+            saver.append(DotDiagramCreation.__create_note('HubNote', ['==Hub classes==', 'Their relations are not drawn:'], \
+                [(f'{hub_class_name} (used by {len(hub_referrer_names[hub_class_name])} classes)', \
+                    DiagramCreation.get_diagram_file_name(False, False, hub_class_name, True, self.link_suffix)) for hub_class_name in sorted(hub_referrer_names.keys())]))
+
+    def __create_page_note(self, saver: Saver, detailed: bool, grouped_per_ns: bool, class_namespace_name: str) -> None:
+        page_index: int = self.page_names.index(class_namespace_name)
+        links: List[Tuple[str, str]] = []
+        if page_index > 0:
+            links.append(('Previous page', DiagramCreation.get_diagram_file_name(detailed, grouped_per_ns, self.page_names[page_index - 1], True, self.link_suffix)))
+        if page_index < len(self.page_names) - 1:
+            links.append(('Next page', DiagramCreation.get_diagram_file_name(detailed, grouped_per_ns, self.page_names[page_index + 1], True, self.link_suffix)))
+        saver.append(DotDiagramCreation.__create_note('PageNote', \
+            ['==Classes referencing this hub class==', f'Page {page_index + 1}/{len(self.page_names)}'], links))
+
+    def __create_dot_file(self, detailed: bool, grouped_per_ns: bool, skip_uses_relation: bool, class_namespace_name: str = None) -> None:
+        user_info_filename, filename, user_info_link_1, link_path_1, user_info_link_2, link_path_2 = \
+            DiagramCreation.get_diagram_header(detailed, grouped_per_ns, class_namespace_name, self.link_suffix)
+        # The plantuml lines of the main saver are not part of dot files
+        saver: Saver = Saver(self.saver.out_dir, self.logger, None, self.saver.get_output_store())
+        saver.append(f'digraph {DotDiagramCreation.__quote(DotDiagramCreation.get_dot_file_name(filename))} {{')
+        saver.append(f'  graph [label=<{DotDiagramCreation.__to_html(user_info_filename)}>, labelloc=t, fontsize=20, fontname="Helvetica", rankdir=BT];')
+        saver.append('  node [shape=record, fontname="Helvetica", fontsize=10, style=filled, fillcolor=white];')
+        saver.append('  edge [fontname="Helvetica", fontsize=9];')
+        saver.append(DotDiagramCreation.__create_note('FloatingNote', \
+            ['Your are analyzing:', user_info_filename, '', '==Filter==', 'You can click either the namespaces', \
+                'or class names for filtering them and their', 'direct dependencies.', '', '==Select other=='], \
+            [(user_info_link_1, link_path_1), (user_info_link_2, link_path_2)]))
+        self.__create_nodes(saver, detailed, grouped_per_ns)
+        self.__create_edges(saver, class_namespace_name is None, skip_uses_relation)
+        if self.page_names is not None and len(self.page_names) > 1:
+            self.__create_page_note(saver, detailed, grouped_per_ns, class_namespace_name)
+        saver.append('}')
+        saver.save(DotDiagramCreation.get_dot_file_name(filename))
+
+    def create_puml_files(self, from_dir: str, skip_uses_relation: bool, class_namespace_name: str = None, page_names: List[str] = None) -> None:
+        # Same entry point as the plantuml diagrams: the four variants of the diagram are written as dot files
+        self.page_names = page_names
+        for detailed in [True, False]:
+            for grouped_per_ns in [False, True]:
+                self.__create_dot_file(detailed, grouped_per_ns, skip_uses_relation, class_namespace_name)
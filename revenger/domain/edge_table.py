@@ -0,0 +1,66 @@
+from __future__ import annotations
+from typing import List, Dict, Tuple, Set, FrozenSet
+
+from revenger.domain.logger import Logger
+from revenger.domain.common import Common
+from revenger.domain.datastructure import Datastructure
+
+class EdgeTable:
+    # Formatted and deduplicated relations of each class, computed once for the whole model:
+    # every diagram only keeps the relations whose target class belongs to it.
+    # Edges are (target class name, plantuml relation, connection type, label) tuples.
+    def __init__(self, skip_types: FrozenSet[str], skip_uses_relation: bool, logger: Logger):
+        self.skip_types: FrozenSet[str] = frozenset(skip_types)
+        self.skip_uses_relation: bool = skip_uses_relation
+        self.logger = logger
+        self.edges: Dict[str, List[Tuple[str, str, Common.ConnectionType, str]]] = {}
+
+    def get_skip_uses_relation(self) -> bool:
+        return self.skip_uses_relation
+
+    def clear(self) -> None:
+        # Edges are computed again when needed
+        self.edges.clear()
+
+    def get_edges(self, sub_datastructure: Datastructure.SubDataStructure) -> List[Tuple[str, str, Common.ConnectionType, str]]:
+        class_name: str = sub_datastructure.get_fqdn_class_name()
+        edges: List[Tuple[str, str, Common.ConnectionType, str]] = self.edges.get(class_name)
+        if edges is None:
+            edges = self.__create_edges(sub_datastructure)
+            self.edges[class_name] = edges
+        return edges
+
+    def __append_edge(self, edges: List[Tuple[str, str, Common.ConnectionType, str]], known_relations: Set[str], target_class_name: str, \
+            relation: str, connection_type: Common.ConnectionType, label: str) -> None:
+        if relation not in known_relations:
+            known_relations.add(relation)
+            edges.append((target_class_name, relation, connection_type, label))
+
+    def __append_connection(self, edges: List[Tuple[str, str, Common.ConnectionType, str]], known_relations: Set[str], class_name: str, \
+            target_class_name: str, full_member_type: str, connection_type: Common.ConnectionType) -> None:
+        connection, member_type, note = Common.reduce_member_type(full_member_type, connection_type)
+        if member_type not in self.skip_types:
+            self.__append_edge(edges, known_relations, target_class_name, f'{class_name} {connection} {member_type} {note}', \
+                connection_type, note.strip(' :'))
+
+    def __create_edges(self, sub_datastructure: Datastructure.SubDataStructure) -> List[Tuple[str, str, Common.ConnectionType, str]]:
+        class_name: str = sub_datastructure.get_fqdn_class_name()
+        edges: List[Tuple[str, str, Common.ConnectionType, str]] = []
+        if class_name in self.skip_types:
+            return edges
+        known_relations: Set[str] = set()
+        for base in sub_datastructure.get_base_classes():
+            if base not in self.skip_types:
+                self.__append_edge(edges, known_relations, base, f'{base} <|-- {class_name}', Common.ConnectionType.IS_BASE, '')
+        for inner_class_name in sub_datastructure.get_inner_class_name():
+            self.__append_connection(edges, known_relations, class_name, \
+                inner_class_name, inner_class_name, Common.ConnectionType.IS_INNER_CLASS)
+
+        # Statics, variables and method parameters: their types are enough, members are not loaded
+        for member_type, connection_type in sub_datastructure.get_member_types():
+            if connection_type != Common.ConnectionType.USES or not self.skip_uses_relation:
+                _, naked_type, _ = Common.reduce_member_type(member_type)
+                self.__append_connection(edges, known_relations, class_name, \
+                    naked_type, member_type, connection_type)
+        self.logger.log_trace(f'  Relations of class {class_name}: {edges}')
+        return edges
@@ -0,0 +1,50 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import List, Set
+
+from revenger.domain.logger import Logger
+from revenger.domain.datastructure import Datastructure
+from revenger.domain.dependency_graph import DependencyGraph
+
+@dataclass
+class HubPolicy:
+    min_fan_in: int = None
+    class_names: List[str] = field(default_factory=list)
+    referrers_per_page: int = 50
+
+    def is_enabled(self) -> bool:
+        return self.min_fan_in is not None or len(self.class_names) > 0
+
+class HubClasses:
+    # Classes referenced by most of the model (loggers, helpers...): they are not pulled into the diagrams of
+    # other classes, their relations are summarized in a note and the classes referencing them are paged.
+    def __init__(self, class_names: Set[str], referrers_per_page: int):
+        self.class_names: Set[str] = class_names
+        self.referrers_per_page: int = referrers_per_page
+
+    @staticmethod
+    def detect(datastructure: Datastructure, hub_policy: HubPolicy, dependency_graph: DependencyGraph, logger: Logger) -> HubClasses:
+        # dependency_graph is only needed with a minimum fan in
+        class_names: Set[str] = set()
+        for class_name in hub_policy.class_names:
+            if datastructure.class_exists(class_name):
+                class_names.add(class_name)
+            else:
+                logger.log_warn(f'Hub class {class_name} is not part of the model: ignoring it')
+        if hub_policy.min_fan_in is not None:
+            for class_id, fan_in in enumerate(dependency_graph.get_fan_in()):
+                if fan_in >= hub_policy.min_fan_in:
+                    class_names.add(dependency_graph.get_class_name(class_id))
+        logger.log_info(f'{len(class_names)} hub classes: {sorted(class_names)}')
+        return HubClasses(class_names, hub_policy.referrers_per_page)
+
+    def get_class_names(self) -> Set[str]:
+        return self.class_names
+
+    def is_hub(self, class_name: str) -> bool:
+        return class_name in self.class_names
+
+    def get_page_names(self, class_name: str, referrer_count: int) -> List[str]:
+        # The first page keeps the class name so that links to the class diagrams are unchanged
+        page_count: int = max(1, -(-referrer_count // self.referrers_per_page))
+        return [class_name] + [f'{class_name}-page-{page_index + 1}' for page_index in range(1, page_count)]
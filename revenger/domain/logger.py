@@ -1,5 +1,5 @@
 
-from infrastructure.generic_classes import GenericLogger
+from revenger.infrastructure.generic_classes import GenericLogger
 
 class Logger(GenericLogger):
     def __init__(self, info: bool = False, debug: bool = False, trace: bool = False):
@@ -0,0 +1,166 @@
+from __future__ import annotations
+from typing import List, Dict, Tuple
+import json
+
+from revenger.domain.logger import Logger
+from revenger.domain.diagram_creation import DiagramCreation
+
+class NavigationIndex:
+    # Small entry point of the diagrams: index.html shows the namespace tree and searches the names of a compact index
+    # (index.json, also written as index.js so that the page works from the file system) instead of opening the full diagram.
+    # Entries are [name, kinds] or [name, kinds, name of the diagram showing it] when the name has no diagram of its own.
+    PAGE_FILE_NAME: str = 'index.html'
+    JSON_FILE_NAME: str = 'index.json'
+    SCRIPT_FILE_NAME: str = 'index.js'
+    NAMESPACE: str = 'n'
+    CLASS: str = 'c'
+    HUB_CLASS: str = 'h'
+    MODULE: str = 'm'
+
+    def __init__(self, logger: Logger, link_suffix: str = DiagramCreation.LINK_SUFFIX):
+        self.logger = logger
+        self.link_suffix: str = link_suffix
+        self.kinds: Dict[str, str] = {}
+        self.targets: Dict[str, str] = {}
+
+    def add_diagrams(self, names: List[str], kind: str) -> None:
+        for name in names:
+            if kind not in self.kinds.get(name, ''):
+                self.kinds[name] = self.kinds.get(name, '') + kind
+            self.targets.pop(name, None)
+
+    def add_shown_in(self, name: str, kind: str, target_name: str) -> None:
+        # A name without diagram of its own (classes of module diagrams) links to the diagram showing it
+        if name not in self.kinds:
+            self.kinds[name] = kind
+            self.targets[name] = target_name
+
+    @staticmethod
+    def get_variants(link_suffix: str = DiagramCreation.LINK_SUFFIX) -> List[Tuple[str, str]]:
+        # File name suffixes of the four variants of a slice
+        return [(f'{"detailed" if detailed else "simplified"}{" per namespace" if grouped_per_ns else ""}', \
+            DiagramCreation.get_diagram_file_name(detailed, grouped_per_ns, '', True, link_suffix)) \
+                for detailed in [True, False] for grouped_per_ns in [False, True]]
+
+    def create_json(self) -> str:
+        entries: List[List[str]] = [[name, self.kinds[name]] + ([self.targets[name]] if name in self.targets else []) \
+            for name in sorted(self.kinds.keys())]
+        return json.dumps({'full': 'full', 'variants': NavigationIndex.get_variants(self.link_suffix), 'entries': entries}, separators=(',', ':'))
+
+    def create_script(self) -> List[str]:
+        return [f'window.REVENGER_INDEX = {self.create_json()};']
+
+    @staticmethod
+    def create_page() -> List[str]:
+        return ['<!DOCTYPE html>',
+            '<html>',
+            '<head>',
+            '<meta charset="utf-8">',
+            '<title>Diagrams</title>',
+            '<style>',
+            '  body { font-family: Helvetica, Arial, sans-serif; margin: 1em 2em; }',
+            '  input { width: 40em; max-width: 100%; padding: 0.3em; }',
+            '  ul { list-style: none; padding-left: 1.2em; }',
+            '  li { margin: 0.15em 0; }',
+            '  .variant { font-size: 0.8em; margin-left: 0.6em; color: #666; }',
+            '  .kind { font-size: 0.8em; margin-left: 0.6em; color: #999; }',
+            '</style>',
+            '</head>',
+            '<body>',
+            '<h1>Diagrams</h1>',
+            '<p id="full"></p>',
+            '<p><input id="search" type="search" placeholder="Search a class, namespace or module" autofocus> <span id="count" class="kind"></span></p>',
+            '<ul id="results"></ul>',
+            '<h2>Namespaces</h2>',
+            '<div id="tree"></div>',
+            f'<script src="{NavigationIndex.SCRIPT_FILE_NAME}"></script>',
+            '<script>',
+            'const index = window.REVENGER_INDEX;',
+            "const KINDS = {n: 'namespace', c: 'class', h: 'hub class', m: 'module'};",
+            'const MAX_RESULTS = 100;',
+            '',
+            'function createLinks(text, name) {',
+            "  const span = document.createElement('span');",
+            '  index.variants.forEach(([label, suffix], position) => {',
+            "    const link = document.createElement('a');",
+            "    link.className = position == 0 ? '' : 'variant';",
+            '    link.textContent = position == 0 ? text : label;',
+            '    link.href = encodeURI(name + suffix);',
+            '    span.appendChild(link);',
+            '  });',
+            '  return span;',
+            '}',
+            '',
+            'function createEntry(entry, text) {',
+            '  const [name, kinds, target] = entry;',
+            "  const item = document.createElement('li');",
+            '  item.appendChild(createLinks(text, target || name));',
+            "  const kind = document.createElement('span');",
+            "  kind.className = 'kind';",
+            "  kind.textContent = [...kinds].map(letter => KINDS[letter]).join(', ') + (target ? ` in ${target}` : '');",
+            '  item.appendChild(kind);',
+            '  return item;',
+            '}',
+            '',
+            '// Tree of the dotted names, the children of a node are created when it is opened',
+            'const root = {children: new Map()};',
+            'for (const entry of index.entries) {',
+            '  let node = root;',
+            "  const parts = entry[0].split('.');",
+            '  parts.forEach(part => {',
+            '    if (!node.children.has(part)) {',
+            "      node.children.set(part, {part: part, children: new Map()});",
+            '    }',
+            '    node = node.children.get(part);',
+            '  });',
+            '  node.entry = entry;',
+            '}',
+            '',
+            'function createTree(node) {',
+            "  const list = document.createElement('ul');",
+            '  for (const child of node.children.values()) {',
+            "    const item = child.entry ? createEntry(child.entry, child.part) : document.createElement('li');",
+            '    if (!child.entry) {',
+            '      item.textContent = child.part;',
+            '    }',
+            '    if (child.children.size > 0) {',
+            "      const details = document.createElement('details');",
+            "      const summary = document.createElement('summary');",
+            '      summary.append(...item.childNodes);',
+            '      details.appendChild(summary);',
+            "      details.addEventListener('toggle', () => {",
+            '        if (details.open && details.childNodes.length == 1) {',
+            '          details.appendChild(createTree(child));',
+            '        }',
+            '      });',
+            '      item.appendChild(details);',
+            '    }',
+            '    list.appendChild(item);',
+            '  }',
+            '  return list;',
+            '}',
+            '',
+            'function search(text) {',
+            "  const results = document.getElementById('results');",
+            "  results.textContent = '';",
+            '  const query = text.trim().toLowerCase();',
+            '  if (query.length == 0) {',
+            "    document.getElementById('count').textContent = '';",
+            '    return;',
+            '  }',
+            '  // Names whose last part starts with the query come first',
+            '  const rank = name => (name.toLowerCase().split(".").pop().startsWith(query) ? 0 : 1);',
+            '  const matches = index.entries.filter(entry => entry[0].toLowerCase().includes(query));',
+            '  matches.sort((first, second) => rank(first[0]) - rank(second[0]) || first[0].length - second[0].length);',
+            '  for (const entry of matches.slice(0, MAX_RESULTS)) {',
+            '    results.appendChild(createEntry(entry, entry[0]));',
+            '  }',
+            "  document.getElementById('count').textContent = `${matches.length} matches`;",
+            '}',
+            '',
+            "document.getElementById('full').appendChild(createLinks('Full diagram (slow to open on large code bases)', index.full));",
+            "document.getElementById('tree').appendChild(createTree(root));",
+            "document.getElementById('search').addEventListener('input', event => search(event.target.value));",
+            '</script>',
+            '</body>',
+            '</html>']
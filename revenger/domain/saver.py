@@ -2,15 +2,18 @@ from __future__ import annotations
 from typing import List, Dict, Tuple, Set
 import os
 
-from infrastructure.generic_classes import GenericSaver
-from domain.logger import Logger
+from revenger.infrastructure.generic_classes import GenericSaver
+from revenger.infrastructure.generic_classes import GenericOutputStore
+from revenger.domain.logger import Logger
 
 class Saver(GenericSaver):
-    def __init__(self, out_dir: str, logger: Logger, saver: Saver = None):
+    # The output store is given by the services: the domain does not depend on the concrete stores
+    def __init__(self, out_dir: str, logger: Logger, saver: Saver = None, output_store: GenericOutputStore = None):
         self.lines_to_save: List[str] = []
         self.connections: Set[str] = set()
         self.out_dir: str = out_dir
         self.logger = logger
+        self.output_store: GenericOutputStore = output_store
         if saver is not None:
             self.lines_to_save = saver.copy_content()
 
@@ -27,17 +30,28 @@ class Saver(GenericSaver):
         self.lines_to_save.append(line)
         return self
 
+    def append_lines(self, lines: List[str]) -> Saver:
+        self.lines_to_save.extend(lines)
+        return self
+
     def copy_content(self) -> List[str]:
         return self.lines_to_save.copy()
 
+    def get_line_count(self) -> int:
+        return len(self.lines_to_save)
+
+    def get_lines_from(self, index: int) -> List[str]:
+        return self.lines_to_save[index:]
+
+    def get_output_store(self) -> GenericOutputStore:
+        return self.output_store
+
     def save(self, filename) -> None:
-        filename = os.path.join(self.out_dir, filename)
-        self.logger.log_info(f'Creating file {filename}')
-        with open(filename, 'w', encoding="utf-8") as file:
-            file.write('\n'.join(self.lines_to_save))
+        self.logger.log_info(f'Creating file {os.path.join(self.out_dir, filename)}')
+        self.output_store.write(filename, '\n'.join(self.lines_to_save).encode('utf-8'))
 
     def clone(self) -> Saver:
-        return Saver(self.out_dir, self.logger, self)
+        return Saver(self.out_dir, self.logger, self, self.output_store)
 
     def removed_last_line_if_same(self, line: str) -> bool:
         return_value = False
@@ -0,0 +1,109 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Dict, Set, Tuple
+from enum import Enum
+
+from revenger.domain.logger import Logger
+from revenger.domain.common import Common
+from revenger.domain.datastructure import Datastructure
+from revenger.domain.dependency_graph import DependencyGraph
+
+class SliceDirection(Enum):
+    # Declaration order is the ranking order of classes found at the same distance
+    ANCESTORS = 1
+    USES = 2
+    DESCENDANTS = 3
+    USED_BY = 4
+
+@dataclass
+class SlicePolicy:
+    ancestors: int = 1
+    uses: int = 1
+    descendants: int = 1
+    used_by: int = 1
+    max_classes: int = None
+
+    def get_radius(self, slice_direction: SliceDirection) -> int:
+        return {SliceDirection.ANCESTORS: self.ancestors, SliceDirection.USES: self.uses, \
+            SliceDirection.DESCENDANTS: self.descendants, SliceDirection.USED_BY: self.used_by}[slice_direction]
+
+    def is_default(self) -> bool:
+        # One hop each way without cap is the slice created by DatastructureHandler
+        return self.max_classes is None and \
+            all(self.get_radius(slice_direction) == 1 for slice_direction in SliceDirection)
+
+class SliceEngine:
+    # Slices of the dependency graph around some classes: a bounded breadth first expansion per direction.
+    # Classes are added distance after distance and, when a distance does not fit below max_classes,
+    # its classes are ranked (direction, then fan-in, then diagram order) and the lowest ranked ones are cut.
+    def __init__(self, dependency_graph: DependencyGraph, slice_policy: SlicePolicy, hub_class_names: Set[str], logger: Logger):
+        self.dependency_graph: DependencyGraph = dependency_graph
+        self.slice_policy: SlicePolicy = slice_policy
+        self.logger = logger
+        self.hub_class_ids: Set[int] = set(dependency_graph.get_class_id(class_name) for class_name in hub_class_names) \
+            if hub_class_names else set()
+        self.fan_in: List[int] = dependency_graph.get_fan_in()
+
+    def __get_neighbours(self, class_id: int, slice_direction: SliceDirection) -> List[int]:
+        if slice_direction in [SliceDirection.ANCESTORS, SliceDirection.USES]:
+            edges: List[Tuple[int, Common.ConnectionType]] = self.dependency_graph.get_successors(class_id)
+        else:
+            edges = self.dependency_graph.get_predecessors(class_id)
+        is_base_direction: bool = slice_direction in [SliceDirection.ANCESTORS, SliceDirection.DESCENDANTS]
+        return [neighbour for neighbour, connection_type in edges \
+            if (connection_type == Common.ConnectionType.IS_BASE) == is_base_direction]
+
+    def get_slice(self, class_ids: List[int]) -> List[int]:
+        selected_ids: List[int] = list(dict.fromkeys(class_ids))
+        selected_id_set: Set[int] = set(selected_ids)
+        # Hub classes are neither added nor expanded unless they are part of the slice seeds
+        frontiers: Dict[SliceDirection, List[int]] = {slice_direction: list(selected_ids) for slice_direction in SliceDirection}
+        visited_ids: Dict[SliceDirection, Set[int]] = {slice_direction: selected_id_set | self.hub_class_ids for slice_direction in SliceDirection}
+        max_radius: int = max(self.slice_policy.get_radius(slice_direction) for slice_direction in SliceDirection)
+        for distance in range(1, max_radius + 1):
+            candidates: Dict[int, Tuple[int, int, int]] = {}
+            for slice_direction in SliceDirection:
+                if distance > self.slice_policy.get_radius(slice_direction):
+                    frontiers[slice_direction] = []
+                    continue
+                next_frontier: List[int] = []
+                for class_id in frontiers[slice_direction]:
+                    for neighbour in self.__get_neighbours(class_id, slice_direction):
+                        if neighbour in visited_ids[slice_direction]:
+                            continue
+                        visited_ids[slice_direction].add(neighbour)
+                        next_frontier.append(neighbour)
+                        if neighbour not in selected_id_set and neighbour not in candidates:
+                            candidates[neighbour] = (slice_direction.value, -self.fan_in[neighbour], neighbour)
+                frontiers[slice_direction] = next_frontier
+            ranked_ids: List[int] = sorted(candidates.keys(), key=lambda class_id: candidates[class_id])
+            if self.slice_policy.max_classes is not None and len(selected_ids) + len(ranked_ids) > self.slice_policy.max_classes:
+                kept_count: int = max(0, self.slice_policy.max_classes - len(selected_ids))
+                self.logger.log_debug(f'Slice of {len(class_ids)} classes cut at {distance} hops: ' + \
+                    f'{kept_count} of {len(ranked_ids)} classes kept')
+                selected_ids.extend(ranked_ids[0: kept_count])
+                break
+            selected_ids.extend(ranked_ids)
+            selected_id_set.update(ranked_ids)
+            if all(len(frontier) == 0 for frontier in frontiers.values()):
+                break
+        return selected_ids
+
+    def create_reduced_class_list_from_class_name_list(self, datastructure: Datastructure, class_name_list: List[str]) -> Datastructure:
+        # Same slice as DatastructureHandler.create_reduced_class_list_from_class_name_list with configurable radius and size
+        datastructure.clear_color()
+        reduced_datastructure: Datastructure = datastructure.create_empty()
+        class_ids: List[int] = [self.dependency_graph.get_class_id(class_name) for class_name in class_name_list \
+            if self.dependency_graph.get_class_id(class_name) is not None]
+        # Classes are appended in diagram order whatever their distance
+        for class_id in sorted(self.get_slice(class_ids)):
+            sub_datastructure: Datastructure.SubDataStructure = \
+                datastructure.get_datastructures_from_class_name(self.dependency_graph.get_class_name(class_id))
+            if sub_datastructure is None:
+                continue
+            reduced_datastructure.append_sub_datastructure(sub_datastructure)
+        for class_name in class_name_list:
+            sub_datastructure = reduced_datastructure.get_datastructures_from_class_name(class_name)
+            if sub_datastructure is not None:
+                sub_datastructure.set_color('yellow')
+        return reduced_datastructure
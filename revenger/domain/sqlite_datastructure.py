@@ -0,0 +1,328 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Iterator
+import json
+import sqlite3
+
+from revenger.domain.logger import Logger
+from revenger.domain.datastructure import Datastructure
+from revenger.domain.datastructure import LanguageDependent
+from revenger.domain.common import Common
+
+class SqliteDatastructure(Datastructure):
+    INGEST_COMPLETE: str = 'ingest_complete'
+    SKIP_USES_RELATION: str = 'skip_uses_relation'
+    SCHEMA_VERSION: str = 'schema_version'
+    # Lines the ingestion added to the root saver (they are part of every diagram)
+    INGEST_SAVER_LINES: str = 'ingest_saver_lines'
+    CURRENT_SCHEMA_VERSION: str = '6'
+    MAX_VARIABLES_PER_QUERY: int = 500
+    # Classes are read with their relations only, their members are loaded when a detailed diagram needs them
+    __CLASS_COLUMNS: str = 'fqdn_class_name, filename, filemodule, name_space_list, from_imports, ' + \
+        'is_abstract, is_interface, default_color, relations'
+    __FULL_CLASS_COLUMNS: str = __CLASS_COLUMNS + ', members'
+
+    def __init__(self, language_dependent: LanguageDependent, logger: Logger, \
+            database_file_name: str, cached_class_count: int = 4096):
+        super().__init__(language_dependent, logger)
+        self.database_file_name: str = database_file_name
+        self.connection = sqlite3.connect(database_file_name)
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.execute('PRAGMA synchronous = NORMAL')
+        self.__create_tables()
+        self.pending_sub_datastructures: Dict[str, Datastructure.SubDataStructure] = {}
+        self.cached_sub_datastructures: OrderedDict[str, Datastructure.SubDataStructure] = OrderedDict()
+        self.cached_class_count: int = cached_class_count
+        self.file_order: int = 0
+        self.pending_file_orders: Dict[str, int] = {}
+        self.stored_class_count: int = self.connection.execute('SELECT COUNT(*) FROM classes').fetchone()[0]
+        self.loaded_member_count: int = 0
+
+    def __create_tables(self) -> None:
+        tables: List[str] = [row[0] for row in self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        if 'metadata' in tables and self.get_metadata(SqliteDatastructure.SCHEMA_VERSION) != SqliteDatastructure.CURRENT_SCHEMA_VERSION:
+            self.logger.log_warn(f'Model store {self.database_file_name} was created by another version, it will be created again')
+            self.connection.executescript('DROP TABLE IF EXISTS class_references; DROP TABLE IF EXISTS classes; DROP TABLE IF EXISTS metadata;')
+        self.connection.executescript('''
+            CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS classes (
+                id INTEGER PRIMARY KEY,
+                fqdn_class_name TEXT NOT NULL UNIQUE,
+                namespace TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                filemodule TEXT NOT NULL,
+                name_space_list TEXT NOT NULL,
+                from_imports TEXT NOT NULL,
+                is_abstract INTEGER NOT NULL,
+                is_interface INTEGER NOT NULL,
+                default_color TEXT,
+                relations TEXT NOT NULL,
+                members TEXT NOT NULL,
+                file_order INTEGER NOT NULL DEFAULT 0);
+            CREATE INDEX IF NOT EXISTS classes_namespace ON classes (namespace, id);
+            CREATE INDEX IF NOT EXISTS classes_filename ON classes (filename, id);
+            CREATE TABLE IF NOT EXISTS class_references (class_id INTEGER NOT NULL, referenced_type TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS class_references_referenced_type ON class_references (referenced_type);
+        ''')
+        self.set_metadata(SqliteDatastructure.SCHEMA_VERSION, SqliteDatastructure.CURRENT_SCHEMA_VERSION)
+
+    def get_database_file_name(self) -> str:
+        return self.database_file_name
+
+    def get_metadata(self, key: str) -> str:
+        row = self.connection.execute('SELECT value FROM metadata WHERE key = ?', (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def set_metadata(self, key: str, value: str) -> None:
+        self.connection.execute('INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)', (key, value))
+        self.connection.commit()
+
+    def is_ingest_complete(self, skip_uses_relation: bool) -> bool:
+        return self.get_metadata(SqliteDatastructure.INGEST_COMPLETE) == 'True' and \
+            self.get_metadata(SqliteDatastructure.SKIP_USES_RELATION) == str(skip_uses_relation)
+
+    def set_ingest_complete(self, skip_uses_relation: bool, saver_lines: List[str] = None) -> None:
+        self.flush()
+        self.set_metadata(SqliteDatastructure.SKIP_USES_RELATION, str(skip_uses_relation))
+        self.set_metadata(SqliteDatastructure.INGEST_SAVER_LINES, json.dumps(saver_lines if saver_lines is not None else []))
+        self.set_metadata(SqliteDatastructure.INGEST_COMPLETE, 'True')
+
+    def get_ingest_saver_lines(self) -> List[str]:
+        saver_lines_json: str = self.get_metadata(SqliteDatastructure.INGEST_SAVER_LINES)
+        return json.loads(saver_lines_json) if saver_lines_json is not None else []
+
+    def clear(self) -> None:
+        self.pending_sub_datastructures.clear()
+        self.pending_file_orders.clear()
+        self.cached_sub_datastructures.clear()
+        self.stored_class_count = 0
+        self.connection.executescript('DELETE FROM class_references; DELETE FROM classes; DELETE FROM metadata;')
+        self.connection.commit()
+        self.set_metadata(SqliteDatastructure.SCHEMA_VERSION, SqliteDatastructure.CURRENT_SCHEMA_VERSION)
+
+    def close(self) -> None:
+        self.flush()
+        self.logger.log_info(f'Members of {self.loaded_member_count} classes were loaded from {self.database_file_name} ' + \
+            f'({self.get_class_count()} classes)')
+        self.connection.close()
+
+    def set_cached_class_count(self, cached_class_count: int) -> None:
+        self.cached_class_count = cached_class_count
+
+    def release_cache(self) -> None:
+        # Classes (and their loaded members) are read again from the database when needed
+        self.cached_sub_datastructures.clear()
+        self.connection.execute('PRAGMA shrink_memory')
+
+    def set_file_order(self, file_order: int) -> None:
+        self.file_order = file_order
+
+    def flush(self) -> None:
+        if len(self.pending_sub_datastructures) == 0:
+            return
+        for fqdn_class_name, sub_datastructure in self.pending_sub_datastructures.items():
+            self.__insert_sub_datastructure(sub_datastructure, self.pending_file_orders[fqdn_class_name])
+        self.stored_class_count += len(self.pending_sub_datastructures)
+        self.pending_sub_datastructures.clear()
+        self.pending_file_orders.clear()
+        self.connection.commit()
+
+    def get_sub_datastructures_in_file_order(self) -> Iterator[Tuple[int, int, Datastructure.SubDataStructure]]:
+        self.flush()
+        for row in self.connection.execute(\
+                f'SELECT file_order, id, {SqliteDatastructure.__FULL_CLASS_COLUMNS} FROM classes ORDER BY file_order, id'):
+            yield row[0], row[1], self.__create_sub_datastructure(row[2:])
+
+    @staticmethod
+    def __get_relations(sub_datastructure: Datastructure.SubDataStructure) -> Dict[str, list]:
+        return {
+            'bases': sub_datastructure.get_base_classes(),
+            'inner_classes': sub_datastructure.get_inner_class_name(),
+            'member_types': [[member_type, connection_type.value] for member_type, connection_type in sub_datastructure.get_member_types()]
+        }
+
+    @staticmethod
+    def __get_members(sub_datastructure: Datastructure.SubDataStructure) -> Dict[str, list]:
+        return {
+            'statics': [[static_field.static_name, static_field.static_type] \
+                for static_field in sub_datastructure.get_static_fields()],
+            'variables': [[variable_field.variable_name, variable_field.variable_type, variable_field.is_member] \
+                for variable_field in sub_datastructure.get_variable_fields()],
+            'methods': [[method_field.method_name, \
+                [[parameter.parameter, parameter.user_type] for parameter in method_field.parameters], \
+                    method_field.is_private] for method_field in sub_datastructure.get_method_fields()],
+            'unsupported_members': sub_datastructure.get_unsupported_members()
+        }
+
+    def __insert_class_references(self, class_id: int, sub_datastructure: Datastructure.SubDataStructure) -> None:
+        self.connection.executemany('INSERT INTO class_references (class_id, referenced_type) VALUES (?, ?)', \
+            [(class_id, referenced_type) for referenced_type in set(sub_datastructure.get_referenced_types())])
+
+    def __insert_sub_datastructure(self, sub_datastructure: Datastructure.SubDataStructure, file_order: int) -> None:
+        cursor = self.connection.execute('INSERT INTO classes (fqdn_class_name, namespace, filename, filemodule, ' + \
+            'name_space_list, from_imports, is_abstract, is_interface, default_color, relations, members, file_order) ' + \
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', \
+                (sub_datastructure.get_fqdn_class_name(), '.'.join(sub_datastructure.get_name_space_list()), \
+                    sub_datastructure.get_filename(), sub_datastructure.get_filemodule(), \
+                        json.dumps(sub_datastructure.get_name_space_list()), json.dumps(sub_datastructure.get_from_imports()), \
+                            sub_datastructure.is_abstract(), sub_datastructure.is_interface(), \
+                                sub_datastructure.get_default_color(), \
+                                    json.dumps(SqliteDatastructure.__get_relations(sub_datastructure)), \
+                                        json.dumps(SqliteDatastructure.__get_members(sub_datastructure)), file_order))
+        self.__insert_class_references(cursor.lastrowid, sub_datastructure)
+
+    @staticmethod
+    def __create_members(members_json: str) -> Tuple[List[Datastructure.Static], List[Datastructure.Variable], List[Datastructure.Method], \
+            List[str]]:
+        members: Dict[str, list] = json.loads(members_json)
+        return [Datastructure.Static(static_name, static_type) for static_name, static_type in members['statics']], \
+            [Datastructure.Variable(variable_name, variable_type, is_member) \
+                for variable_name, variable_type, is_member in members['variables']], \
+            [Datastructure.Method(method_name, \
+                [Datastructure.Method.ParameterType(parameter, user_type) for parameter, user_type in parameters], is_private) \
+                    for method_name, parameters, is_private in members['methods']], \
+            members['unsupported_members']
+
+    def __load_members(self, fqdn_class_name: str) -> Tuple[List[Datastructure.Static], List[Datastructure.Variable], List[Datastructure.Method], \
+            List[str]]:
+        self.loaded_member_count += 1
+        row = self.connection.execute('SELECT members FROM classes WHERE fqdn_class_name = ?', (fqdn_class_name,)).fetchone()
+        return SqliteDatastructure.__create_members(row[0])
+
+    def __create_sub_datastructure(self, row: Tuple) -> Datastructure.SubDataStructure:
+        # Rows read with __FULL_CLASS_COLUMNS end with the members, others only hold the relations
+        fqdn_class_name, filename, filemodule, name_space_list, from_imports, \
+            is_abstract, is_interface, default_color, relations_json = row[0: 9]
+        sub_datastructure = Datastructure.SubDataStructure(filename, filemodule, json.loads(from_imports), \
+            fqdn_class_name, json.loads(name_space_list), self.logger)
+        relations: Dict[str, list] = json.loads(relations_json)
+        sub_datastructure.bases = relations['bases']
+        sub_datastructure.inner_classes = relations['inner_classes']
+        if len(row) > 9:
+            sub_datastructure.statics, sub_datastructure.variables, sub_datastructure.methods, sub_datastructure.unsupported_members = \
+                SqliteDatastructure.__create_members(row[9])
+        else:
+            sub_datastructure.set_member_loader([(member_type, Common.ConnectionType(connection_type)) \
+                for member_type, connection_type in relations['member_types']], lambda: self.__load_members(fqdn_class_name))
+        if is_abstract:
+            sub_datastructure.set_abstract()
+        if is_interface:
+            sub_datastructure.set_interface()
+        if default_color is not None:
+            sub_datastructure.color = default_color
+            sub_datastructure.default_color = default_color
+        return sub_datastructure
+
+    def __get_cached_sub_datastructure(self, row: Tuple) -> Datastructure.SubDataStructure:
+        fqdn_class_name: str = row[0]
+        if fqdn_class_name in self.cached_sub_datastructures:
+            self.cached_sub_datastructures.move_to_end(fqdn_class_name)
+            return self.cached_sub_datastructures[fqdn_class_name]
+        sub_datastructure = self.__create_sub_datastructure(row)
+        self.cached_sub_datastructures[fqdn_class_name] = sub_datastructure
+        if len(self.cached_sub_datastructures) > self.cached_class_count:
+            self.cached_sub_datastructures.popitem(last=False)
+        return sub_datastructure
+
+    def replace_types(self, type_mapping: Dict[str, str]) -> None:
+        self.flush()
+        type_names: List[str] = list(type_mapping.keys())
+        class_ids: List[int] = []
+        for index in range(0, len(type_names), SqliteDatastructure.MAX_VARIABLES_PER_QUERY):
+            chunk: List[str] = type_names[index: index + SqliteDatastructure.MAX_VARIABLES_PER_QUERY]
+            class_ids.extend(row[0] for row in self.connection.execute(\
+                f'SELECT DISTINCT class_id FROM class_references WHERE referenced_type IN ({", ".join("?" * len(chunk))})', chunk))
+        for class_id in sorted(set(class_ids)):
+            row = self.connection.execute(f'SELECT {SqliteDatastructure.__FULL_CLASS_COLUMNS} FROM classes WHERE id = ?', (class_id,)).fetchone()
+            sub_datastructure: Datastructure.SubDataStructure = self.__create_sub_datastructure(row)
+            sub_datastructure.replace_types(type_mapping)
+            self.cached_sub_datastructures.pop(sub_datastructure.get_fqdn_class_name(), None)
+            self.connection.execute('UPDATE classes SET relations = ?, members = ? WHERE id = ?', \
+                (json.dumps(SqliteDatastructure.__get_relations(sub_datastructure)), \
+                    json.dumps(SqliteDatastructure.__get_members(sub_datastructure)), class_id))
+            self.connection.execute('DELETE FROM class_references WHERE class_id = ?', (class_id,))
+            self.__insert_class_references(class_id, sub_datastructure)
+        self.connection.commit()
+
+    def clear_color(self) -> None:
+        for sub_datastructure in self.cached_sub_datastructures.values():
+            sub_datastructure.clear_color()
+
+    def append_sub_datastructure(self, sub_datastructure: Datastructure.SubDataStructure) -> None:
+        fqdn_class_name = sub_datastructure.get_fqdn_class_name()
+        if not self.class_exists(fqdn_class_name):
+            self.pending_sub_datastructures[fqdn_class_name] = sub_datastructure
+            self.pending_file_orders[fqdn_class_name] = self.file_order
+        else:
+            self.logger.log_debug(f'WARNING: Class {fqdn_class_name} is being registered a second time \n' + \
+                  f'   -> First time content is from file {self.get_datastructures_from_class_name(fqdn_class_name).get_filename()}: Ignoring.')
+
+    def get_class_count(self) -> int:
+        return self.stored_class_count + len(self.pending_sub_datastructures)
+
+    def get_classname_list(self) -> List[str]:
+        self.flush()
+        return [row[0] for row in self.connection.execute('SELECT fqdn_class_name FROM classes ORDER BY id')]
+
+    def get_datastructures_from_class_name(self, class_name: str) -> Datastructure.SubDataStructure:
+        if class_name in self.pending_sub_datastructures:
+            return self.pending_sub_datastructures[class_name]
+        if class_name in self.cached_sub_datastructures:
+            self.cached_sub_datastructures.move_to_end(class_name)
+            return self.cached_sub_datastructures[class_name]
+        row = self.connection.execute(f'SELECT {SqliteDatastructure.__CLASS_COLUMNS} FROM classes WHERE fqdn_class_name = ?', \
+            (class_name,)).fetchone()
+        if row is not None:
+            return self.__get_cached_sub_datastructure(row)
+        self.logger.log_debug(f"Requested class {class_name} was not found in the datastructure")
+        return None
+
+    def get_sorted_name_spaces(self) -> List[str]:
+        self.flush()
+        return [row[0] for row in self.connection.execute('SELECT DISTINCT namespace FROM classes ORDER BY namespace')]
+
+    def get_datastructures_from_namespace(self, namespace: str) -> List[Datastructure.SubDataStructure]:
+        self.flush()
+        return [self.__get_cached_sub_datastructure(row) for row in self.connection.execute(\
+            f'SELECT {SqliteDatastructure.__CLASS_COLUMNS} FROM classes WHERE namespace = ? ORDER BY id', (namespace,))]
+
+    def get_sorted_filenames(self) -> List[str]:
+        self.flush()
+        return [row[0] for row in self.connection.execute('SELECT DISTINCT filename FROM classes ORDER BY filename')]
+
+    def get_datastructures_from_filename(self, filename: str) -> List[Datastructure.SubDataStructure]:
+        self.flush()
+        return [self.__get_cached_sub_datastructure(row) for row in self.connection.execute(\
+            f'SELECT {SqliteDatastructure.__CLASS_COLUMNS} FROM classes WHERE filename = ? ORDER BY id', (filename,))]
+
+    def filename_exists(self, filename) -> bool:
+        self.flush()
+        return self.connection.execute('SELECT 1 FROM classes WHERE filename = ? LIMIT 1', (filename,)).fetchone() is not None
+
+    def get_classname_list_from_namespace(self, namespace: str) -> List[str]:
+        self.flush()
+        return [row[0] for row in self.connection.execute(\
+            'SELECT fqdn_class_name FROM classes WHERE namespace = ? ORDER BY id', (namespace,))]
+
+    def get_namespace_list_from_namespace_name(self, namespace_name: str) -> List[str]:
+        self.flush()
+        row = self.connection.execute('SELECT name_space_list FROM classes WHERE namespace = ? LIMIT 1', (namespace_name,)).fetchone()
+        return json.loads(row[0])
+
+    def get_referrer_class_names(self, class_name_list: List[str]) -> List[str]:
+        self.flush()
+        referrers: Dict[str, Tuple[str, int]] = {}
+        class_name_list = list(set(class_name_list))
+        for index in range(0, len(class_name_list), SqliteDatastructure.MAX_VARIABLES_PER_QUERY):
+            chunk: List[str] = class_name_list[index: index + SqliteDatastructure.MAX_VARIABLES_PER_QUERY]
+            for fqdn_class_name, namespace, class_id in self.connection.execute(\
+                    'SELECT DISTINCT classes.fqdn_class_name, classes.namespace, classes.id FROM class_references ' + \
+                        'JOIN classes ON classes.id = class_references.class_id ' + \
+                            f'WHERE class_references.referenced_type IN ({", ".join("?" * len(chunk))})', chunk):
+                referrers[fqdn_class_name] = (namespace, class_id)
+        return sorted(referrers.keys(), key=lambda fqdn_class_name: referrers[fqdn_class_name])
+
+    def class_exists(self, class_name) -> bool:
+        if class_name in self.pending_sub_datastructures or class_name in self.cached_sub_datastructures:
+            return True
+        return self.connection.execute('SELECT 1 FROM classes WHERE fqdn_class_name = ?', (class_name,)).fetchone() is not None
@@ -0,0 +1,129 @@
+from __future__ import annotations
+from typing import List, Dict, Set, Tuple, TextIO, Callable
+import hashlib
+import json
+import os
+import shutil
+
+from revenger.infrastructure.generic_classes import GenericOutputStore
+from revenger.infrastructure.generic_classes import GenericLogger
+
+class Checkpoint:
+    # Journal of the slices completed by a run with the md5 of each file they wrote: a resumed run skips the slices
+    # whose files are still as written and creates the other ones again.
+    # A checkpoint without directory does not record anything (runs without --resume).
+    DIRECTORY_NAME: str = '.revenger-checkpoint'
+    JOURNAL_FILE_NAME: str = 'journal.jsonl'
+    MODEL_FILE_NAME: str = 'model.sqlite'
+
+    def __init__(self, directory: str = None, logger: GenericLogger = None, journal: TextIO = None, \
+            completed_slices: Dict[str, List[str]] = None):
+        self.directory: str = directory
+        self.logger = logger
+        self.journal: TextIO = journal
+        self.completed_slices: Dict[str, List[str]] = completed_slices if completed_slices is not None else {}
+        self.written_files: List[Tuple[str, str]] = []
+        self.on_skipped_file: Callable[[str], None] = None
+
+    @staticmethod
+    def get_directory(out_dir: str) -> str:
+        return os.path.join(out_dir, Checkpoint.DIRECTORY_NAME)
+
+    @staticmethod
+    def get_model_file_name(out_dir: str) -> str:
+        return os.path.join(Checkpoint.get_directory(out_dir), Checkpoint.MODEL_FILE_NAME)
+
+    @staticmethod
+    def open(out_dir: str, fingerprint: str, output_store: GenericOutputStore, logger: GenericLogger) -> Checkpoint:
+        directory: str = Checkpoint.get_directory(out_dir)
+        journal_file_name: str = os.path.join(directory, Checkpoint.JOURNAL_FILE_NAME)
+        entries: List[Dict[str, any]] = Checkpoint.__read_journal(journal_file_name)
+        if len(entries) > 0 and entries[0].get('fingerprint') != fingerprint:
+            logger.log_warn(f'Checkpoint {directory} was created with other options or sources: starting again')
+            shutil.rmtree(directory, ignore_errors=True)
+            entries = []
+        os.makedirs(directory, exist_ok=True)
+        completed_slices: Dict[str, List[str]] = Checkpoint.__validate(entries[1:], output_store, logger)
+        if len(completed_slices) > 0:
+            logger.log_warn(f'Resuming from {directory}: {len(completed_slices)} slices are already completed')
+        # The journal is written again with the valid slices only
+        journal: TextIO = open(journal_file_name + '.tmp', 'w')
+        journal.write(json.dumps({'fingerprint': fingerprint}) + '\n')
+        for entry in entries[1:]:
+            if entry['slice'] in completed_slices:
+                journal.write(json.dumps(entry) + '\n')
+        journal.flush()
+        os.fsync(journal.fileno())
+        os.replace(journal_file_name + '.tmp', journal_file_name)
+        return Checkpoint(directory, logger, journal, completed_slices)
+
+    @staticmethod
+    def __read_journal(journal_file_name: str) -> List[Dict[str, any]]:
+        entries: List[Dict[str, any]] = []
+        if not os.path.isfile(journal_file_name):
+            return entries
+        with open(journal_file_name) as journal:
+            for line in journal:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Last line of a killed run
+                    break
+        return entries
+
+    @staticmethod
+    def __validate(entries: List[Dict[str, any]], output_store: GenericOutputStore, logger: GenericLogger) -> Dict[str, List[str]]:
+        # A file written by several slices is checked against the last of them. A slice whose files were not all written
+        # is created again, and so are the slices completed after it writing one of its files: the latest content wins.
+        last_md5s: Dict[str, str] = {}
+        for entry in entries:
+            for name, md5 in entry['files']:
+                last_md5s[name] = md5
+        valid_names: Set[str] = set()
+        for name, md5 in last_md5s.items():
+            if output_store.exists(name) and hashlib.md5(output_store.read(name)).hexdigest() == md5:
+                valid_names.add(name)
+        completed_slices: Dict[str, List[str]] = {}
+        dirty_names: Set[str] = set()
+        for entry in entries:
+            names: List[str] = [name for name, _ in entry['files']]
+            if dirty_names.isdisjoint(names) and all(name in valid_names or last_md5s[name] != md5 for name, md5 in entry['files']):
+                completed_slices[entry['slice']] = names
+                continue
+            logger.log_info(f'Slice {entry["slice"]} was not completely written: creating it again')
+            dirty_names.update(names)
+            completed_slices.pop(entry['slice'], None)
+        return completed_slices
+
+    def set_on_skipped_file(self, on_skipped_file: Callable[[str], None]) -> None:
+        self.on_skipped_file = on_skipped_file
+
+    def record(self, name: str, content: bytes) -> None:
+        if self.journal is not None:
+            self.written_files.append((name, hashlib.md5(content).hexdigest()))
+
+    def skip(self, kind: str, name: str) -> bool:
+        # True when the slice was completed by a previous run: its files are submitted again to on_skipped_file
+        file_names: List[str] = self.completed_slices.get(f'{kind}:{name}')
+        if file_names is None:
+            return False
+        if self.on_skipped_file is not None:
+            for file_name in file_names:
+                self.on_skipped_file(file_name)
+        return True
+
+    def complete(self, kind: str, name: str) -> None:
+        if self.journal is None:
+            return
+        self.journal.write(json.dumps({'slice': f'{kind}:{name}', 'files': self.written_files}) + '\n')
+        self.journal.flush()
+        self.written_files = []
+
+    def close(self, completed: bool) -> None:
+        # A completed run does not need its checkpoint anymore
+        if self.journal is None:
+            return
+        self.journal.close()
+        self.journal = None
+        if completed:
+            shutil.rmtree(self.directory, ignore_errors=True)
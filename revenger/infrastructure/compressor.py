@@ -0,0 +1,88 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Set
+from enum import Enum
+import gzip
+import os
+import threading
+
+from revenger.infrastructure.generic_classes import GenericLogger
+
+class Compression(Enum):
+    NONE = 'none'
+    # file.gz next to each file, for static servers delivering precompressed files (nginx gzip_static, ...)
+    SIDECAR = 'sidecar'
+    # svg files replaced by svgz files (the diagrams link to them) and puml files by puml.gz files once rendered
+    SVGZ = 'svgz'
+
+class Compressor:
+    # gzip compression of the rendered files on worker threads (zlib releases the GIL): a file compressed again
+    # while it is compressed is compressed once more afterwards so that the latest content wins.
+    COMPRESS_LEVEL: int = 6
+
+    def __init__(self, compression: Compression, logger: GenericLogger, worker_count: int = os.cpu_count()):
+        self.compression: Compression = compression
+        self.logger = logger
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix='compress')
+        self.lock = threading.Lock()
+        self.compressing_file_names: Set[str] = set()
+        self.recompressed_file_names: Set[str] = set()
+        self.compressed_count: int = 0
+        self.failed_count: int = 0
+
+    @staticmethod
+    def compress(content: bytes) -> bytes:
+        # Without timestamp: the same content always gives the same file
+        return gzip.compress(content, compresslevel=Compressor.COMPRESS_LEVEL, mtime=0)
+
+    @staticmethod
+    def get_compressed_file_name(file_name: str, compression: Compression) -> str:
+        if compression == Compression.SVGZ and file_name.endswith('.svg'):
+            return file_name + 'z'
+        return file_name + '.gz'
+
+    def submit(self, file_name: str) -> None:
+        with self.lock:
+            if file_name in self.compressing_file_names:
+                self.recompressed_file_names.add(file_name)
+                return
+            self.compressing_file_names.add(file_name)
+        self.executor.submit(self.__compress_file, file_name)
+
+    def submit_directory(self, directory: str, suffixes: List[str]) -> None:
+        for name in sorted(os.listdir(directory)):
+            if any(name.endswith(suffix) for suffix in suffixes):
+                self.submit(os.path.join(directory, name))
+
+    def __compress_file(self, file_name: str) -> None:
+        while True:
+            compressed_file_name: str = Compressor.get_compressed_file_name(file_name, self.compression)
+            try:
+                with open(file_name, 'rb') as file:
+                    content: bytes = Compressor.compress(file.read())
+                with open(compressed_file_name + '.tmp', 'wb') as file:
+                    file.write(content)
+                os.replace(compressed_file_name + '.tmp', compressed_file_name)
+                if self.compression == Compression.SVGZ:
+                    os.remove(file_name)
+                with self.lock:
+                    self.compressed_count += 1
+            except OSError as error:
+                self.logger.log_error(f'Could not compress {file_name}: {error}')
+                with self.lock:
+                    self.failed_count += 1
+            with self.lock:
+                if file_name not in self.recompressed_file_names:
+                    self.compressing_file_names.discard(file_name)
+                    return
+                self.recompressed_file_names.discard(file_name)
+
+    def close(self) -> int:
+        # Waits for all submitted files to be compressed and returns the number of files that could not be compressed
+        self.executor.shutdown()
+        self.logger.log_info(f'{self.compressed_count} files compressed ({self.compression.value})')
+        return self.failed_count
+
+    def abort(self) -> None:
+        # Queued files are not compressed, the ones being compressed are waited for
+        self.executor.shutdown(cancel_futures=True)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+from datetime import datetime, timezone
+from typing import TextIO
+import json
+import os
+import threading
+import time
+
+class EventStream:
+    # Progress of a run as JSON lines (one event per line, flushed immediately) for CI dashboards and wrapper tools.
+    # A stream without file ignores all events.
+    def __init__(self, file: TextIO = None):
+        self.file: TextIO = file
+        self.start_time: float = time.monotonic()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def open(file_name: str = None, file_descriptor: int = None) -> EventStream:
+        if file_descriptor is not None:
+            return EventStream(os.fdopen(file_descriptor, 'w', buffering=1, closefd=False))
+        if file_name is not None:
+            return EventStream(open(file_name, 'w', buffering=1))
+        return EventStream()
+
+    def is_enabled(self) -> bool:
+        return self.file is not None
+
+    def get_elapsed(self) -> float:
+        return time.monotonic() - self.start_time
+
+    def emit(self, event: str, **fields) -> None:
+        if self.file is None:
+            return
+        record: dict = {'time': datetime.now(timezone.utc).isoformat(timespec='milliseconds'), \
+            'elapsed': round(self.get_elapsed(), 3), 'event': event}
+        record.update(fields)
+        with self.lock:
+            self.file.write(json.dumps(record) + '\n')
+            self.file.flush()
+
+    def create_progress(self, event: str, total: int) -> EventStream.Progress:
+        return EventStream.Progress(self, event, total)
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    class Progress:
+        # Emits one event per completed item with the number of remaining seconds estimated from the average item duration
+        def __init__(self, event_stream: EventStream, event: str, total: int):
+            self.event_stream: EventStream = event_stream
+            self.event: str = event
+            self.total: int = total
+            self.done: int = 0
+            self.start_time: float = time.monotonic()
+
+        def advance(self, **fields) -> None:
+            self.done += 1
+            if not self.event_stream.is_enabled():
+                return
+            elapsed: float = time.monotonic() - self.start_time
+            eta: float = elapsed / self.done * (self.total - self.done) if self.total >= self.done else 0
+            self.event_stream.emit(self.event, done=self.done, total=self.total, eta=round(eta, 1), **fields)
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Tuple
+from enum import Enum
+from typing import List, Dict, Tuple, FrozenSet
 
 class GenericSubDataStructure(ABC):
     @abstractmethod
@@ -36,6 +37,11 @@ class GenericSubDataStructure(ABC):
         """
         """
 
+    @abstractmethod
+    def add_unsupported_member(self, member_name: str) -> None:
+        """
+        """
+
 class GenericDatastructure(ABC):
     @abstractmethod
     def append_class(self, filename: str, filemodule: str, \
@@ -45,7 +51,12 @@ class GenericDatastructure(ABC):
         """
 
     @abstractmethod
-    def get_skip_types(self) -> List[str]:
+    def get_skip_types(self) -> FrozenSet[str]:
+        """
+        """
+
+    @abstractmethod
+    def replace_types(self, type_mapping: Dict[str, str]) -> None:
         """
         """
 
@@ -62,4 +73,34 @@ class GenericLogger(ABC):
     @abstractmethod
     def log_trace(self, line: str):
         """
-        """
\ No newline at end of file
+        """
+class BundleType(Enum):
+    DIRECTORY = 'directory'
+    ZIP = 'zip'
+    SQLITE = 'sqlite'
+
+class GenericOutputStore(ABC):
+    @abstractmethod
+    def write(self, name: str, content: bytes) -> None:
+        """
+        """
+    @abstractmethod
+    def read(self, name: str) -> bytes:
+        """
+        """
+    @abstractmethod
+    def exists(self, name: str) -> bool:
+        """
+        """
+    @abstractmethod
+    def get_names(self) -> List[str]:
+        """
+        """
+    @abstractmethod
+    def close(self) -> None:
+        """
+        """
+    @abstractmethod
+    def abort(self) -> None:
+        """
+        """
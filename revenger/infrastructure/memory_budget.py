@@ -0,0 +1,108 @@
+from __future__ import annotations
+from typing import List, Callable
+import gc
+import os
+import re
+import time
+
+from revenger.infrastructure.generic_classes import GenericLogger
+
+class MemoryBudget:
+    # Keeps a run below a memory limit: buffer and cache sizes are derived from the limit and, while diagrams are created,
+    # the resident memory is checked regularly and the registered caches are released when it gets close to the limit.
+    CGROUP_LIMIT_FILE_NAMES: List[str] = ['/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes']
+    AUTO: str = 'auto'
+    # Share of the cgroup limit used by an automatic budget, the rest is kept for plantuml and the system
+    AUTO_RATIO: float = 0.8
+    PRESSURE_RATIO: float = 0.85
+    CHECK_INTERVAL_SECONDS: float = 0.5
+    # Rough sizes used to derive the settings from the budget
+    PLANTUML_PROCESS_BYTES: int = 512 * 1024 * 1024
+    CLASS_FRAGMENT_BYTES: int = 2 * 1024
+    MODEL_CLASS_BYTES: int = 8 * 1024
+    MODEL_BYTES_PER_SOURCE_BYTE: int = 6
+
+    def __init__(self, limit_bytes: int, logger: GenericLogger):
+        self.limit_bytes: int = limit_bytes
+        self.logger = logger
+        self.on_pressure: List[Callable[[], None]] = []
+        self.last_check_time: float = 0
+        self.pressure_count: int = 0
+
+    @staticmethod
+    def get_cgroup_limit() -> int:
+        for file_name in MemoryBudget.CGROUP_LIMIT_FILE_NAMES:
+            try:
+                with open(file_name) as file:
+                    value: str = file.read().strip()
+            except OSError:
+                continue
+            # cgroup v1 reports an unlimited memory as a huge number
+            if value.isdigit() and int(value) < 1 << 60:
+                return int(value)
+        return None
+
+    @staticmethod
+    def parse(value: str) -> int:
+        # Number of bytes with an optional k, m or g suffix, or auto for a share of the cgroup limit
+        if value.lower() == MemoryBudget.AUTO:
+            cgroup_limit: int = MemoryBudget.get_cgroup_limit()
+            if cgroup_limit is None:
+                raise ValueError('No cgroup memory limit found for --memory_budget auto')
+            return int(cgroup_limit * MemoryBudget.AUTO_RATIO)
+        match = re.fullmatch(r'(\d+)([kmg]?)b?', value.lower())
+        if match is None:
+            raise ValueError(f'Invalid memory budget {value} (expected for instance 512m, 4g or auto)')
+        return int(match.group(1)) * {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}[match.group(2)]
+
+    @staticmethod
+    def get_resident_bytes() -> int:
+        try:
+            with open('/proc/self/statm') as file:
+                return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError):
+            import resource
+            # Peak resident memory (kilobytes on linux, bytes on macos) when /proc is not available
+            max_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return max_rss if max_rss > 1 << 32 else max_rss * 1024
+
+    def get_limit(self) -> int:
+        return self.limit_bytes
+
+    def get_share(self, ratio: float) -> int:
+        return int(self.limit_bytes * ratio)
+
+    def get_worker_count(self, requested_count: int, bytes_per_worker: int, ratio: float) -> int:
+        # Workers that fit in their share of the budget, at least one
+        worker_count: int = max(1, min(requested_count, self.get_share(ratio) // bytes_per_worker))
+        if worker_count < requested_count:
+            self.logger.log_warn(f'Memory budget of {self.limit_bytes // (1024 * 1024)} MB: using {worker_count} workers instead of {requested_count}')
+        return worker_count
+
+    def get_cached_count(self, bytes_per_item: int, ratio: float, maximum: int) -> int:
+        return max(64, min(maximum, self.get_share(ratio) // bytes_per_item))
+
+    def is_model_too_large(self, source_bytes: int) -> bool:
+        return source_bytes * MemoryBudget.MODEL_BYTES_PER_SOURCE_BYTE > self.get_share(0.5)
+
+    def add_on_pressure(self, on_pressure: Callable[[], None]) -> None:
+        self.on_pressure.append(on_pressure)
+
+    def clear_on_pressure(self) -> None:
+        self.on_pressure = []
+
+    def check(self) -> None:
+        # Called often (each written file): the resident memory is only read every CHECK_INTERVAL_SECONDS
+        now: float = time.monotonic()
+        if now - self.last_check_time < MemoryBudget.CHECK_INTERVAL_SECONDS:
+            return
+        self.last_check_time = now
+        resident_bytes: int = MemoryBudget.get_resident_bytes()
+        if resident_bytes < self.get_share(MemoryBudget.PRESSURE_RATIO):
+            return
+        self.pressure_count += 1
+        self.logger.log_warn(f'Resident memory {resident_bytes // (1024 * 1024)} MB is close to the memory budget ' + \
+            f'of {self.limit_bytes // (1024 * 1024)} MB: releasing caches')
+        for on_pressure in self.on_pressure:
+            on_pressure()
+        gc.collect()
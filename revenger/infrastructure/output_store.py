@@ -0,0 +1,368 @@
+from __future__ import annotations
+from typing import List, Dict, Set, Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import os
+import sqlite3
+import shutil
+import threading
+import warnings
+import zipfile
+
+from revenger.infrastructure.generic_classes import GenericOutputStore
+from revenger.infrastructure.generic_classes import BundleType
+from revenger.infrastructure.generic_classes import GenericLogger
+from revenger.infrastructure.compressor import Compressor
+from revenger.infrastructure.compressor import Compression
+
+class DirectoryOutputStore(GenericOutputStore):
+    def __init__(self, out_dir: str):
+        self.out_dir: str = out_dir
+
+    def get_directory(self) -> str:
+        return self.out_dir
+
+    def write(self, name: str, content: bytes) -> None:
+        with open(os.path.join(self.out_dir, name), 'wb') as file:
+            file.write(content)
+
+    def read(self, name: str) -> bytes:
+        with open(os.path.join(self.out_dir, name), 'rb') as file:
+            return file.read()
+
+    def exists(self, name: str) -> bool:
+        return os.path.isfile(os.path.join(self.out_dir, name))
+
+    def get_names(self) -> List[str]:
+        return sorted(entry.name for entry in os.scandir(self.out_dir) if entry.is_file())
+
+    def close(self) -> None:
+        pass
+
+    def abort(self) -> None:
+        pass
+
+class ZipOutputStore(GenericOutputStore):
+    # A new bundle is written next to the previous one and replaces it on close, the entries of the previous bundle are
+    # only kept when adding files to it (bundle_tool pack, resumed runs)
+    def __init__(self, bundle_file_name: str, read_only: bool = False, keep_entries: bool = False):
+        self.bundle_file_name: str = bundle_file_name
+        self.written_file_name: str = bundle_file_name if read_only or (keep_entries and os.path.isfile(bundle_file_name)) \
+            else f'{bundle_file_name}.tmp'
+        mode: str = 'r' if read_only else ('a' if self.written_file_name == bundle_file_name else 'w')
+        self.zip_file: zipfile.ZipFile = zipfile.ZipFile(self.written_file_name, mode, zipfile.ZIP_DEFLATED)
+        self.names: Set[str] = set(self.zip_file.namelist())
+        self.has_overwritten_entries: bool = False
+        self.lock = threading.Lock()
+
+    def write(self, name: str, content: bytes) -> None:
+        with self.lock:
+            if name in self.names:
+                # Zip entries cannot be replaced: the latest one wins on read and the archive is compacted on close
+                self.has_overwritten_entries = True
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore')
+                    self.zip_file.writestr(name, content)
+            else:
+                self.zip_file.writestr(name, content)
+                self.names.add(name)
+
+    def read(self, name: str) -> bytes:
+        with self.lock:
+            return self.zip_file.read(name)
+
+    def exists(self, name: str) -> bool:
+        return name in self.names
+
+    def get_names(self) -> List[str]:
+        return sorted(self.names)
+
+    def close(self) -> None:
+        with self.lock:
+            if self.has_overwritten_entries:
+                self.__compact()
+            self.zip_file.close()
+            if self.written_file_name != self.bundle_file_name:
+                os.replace(self.written_file_name, self.bundle_file_name)
+                self.written_file_name = self.bundle_file_name
+
+    def abort(self) -> None:
+        # The previous bundle is kept, entries added to it stay (resumed runs check them against their checkpoint)
+        with self.lock:
+            self.zip_file.close()
+            if self.written_file_name != self.bundle_file_name:
+                os.remove(self.written_file_name)
+
+    def __compact(self) -> None:
+        compacted_file_name: str = f'{self.bundle_file_name}.compacting'
+        with zipfile.ZipFile(compacted_file_name, 'w', zipfile.ZIP_DEFLATED) as compacted_zip_file:
+            for name in sorted(self.names):
+                compacted_zip_file.writestr(name, self.zip_file.read(name))
+        self.zip_file.close()
+        shutil.move(compacted_file_name, self.written_file_name)
+        self.zip_file = zipfile.ZipFile(self.written_file_name, 'r')
+        self.has_overwritten_entries = False
+
+class SqliteOutputStore(GenericOutputStore):
+    # Same life cycle as ZipOutputStore
+    def __init__(self, bundle_file_name: str, read_only: bool = False, keep_entries: bool = False):
+        self.bundle_file_name: str = bundle_file_name
+        self.written_file_name: str = bundle_file_name if read_only or (keep_entries and os.path.isfile(bundle_file_name)) \
+            else f'{bundle_file_name}.tmp'
+        if self.written_file_name != bundle_file_name and os.path.isfile(self.written_file_name):
+            # Left by an interrupted run
+            os.remove(self.written_file_name)
+        # Characters of the file name meaning something in a uri (?, #, %) are escaped
+        uri: str = Path(os.path.abspath(self.written_file_name)).as_uri() + ('?mode=ro' if read_only else '')
+        self.connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self.lock = threading.Lock()
+        if not read_only:
+            self.connection.execute('CREATE TABLE IF NOT EXISTS files (name TEXT PRIMARY KEY, content BLOB NOT NULL)')
+
+    def write(self, name: str, content: bytes) -> None:
+        with self.lock:
+            self.connection.execute('INSERT OR REPLACE INTO files (name, content) VALUES (?, ?)', (name, content))
+
+    def read(self, name: str) -> bytes:
+        with self.lock:
+            row = self.connection.execute('SELECT content FROM files WHERE name = ?', (name,)).fetchone()
+        if row is None:
+            raise KeyError(f'{name} is not stored in {self.bundle_file_name}')
+        return row[0]
+
+    def exists(self, name: str) -> bool:
+        with self.lock:
+            return self.connection.execute('SELECT 1 FROM files WHERE name = ?', (name,)).fetchone() is not None
+
+    def get_names(self) -> List[str]:
+        with self.lock:
+            return [row[0] for row in self.connection.execute('SELECT name FROM files ORDER BY name')]
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.commit()
+            self.connection.close()
+            if self.written_file_name != self.bundle_file_name:
+                os.replace(self.written_file_name, self.bundle_file_name)
+                self.written_file_name = self.bundle_file_name
+
+    def abort(self) -> None:
+        # Same as ZipOutputStore
+        with self.lock:
+            if self.written_file_name == self.bundle_file_name:
+                self.connection.commit()
+            self.connection.close()
+            if self.written_file_name != self.bundle_file_name:
+                os.remove(self.written_file_name)
+
+class OutputStoreError(OSError):
+    pass
+
+class WriteBehindOutputStore(GenericOutputStore):
+    # Writes are queued to worker threads so that the next diagram is created while the previous ones are written.
+    # Queued contents are bounded: write blocks while more than max_pending_bytes are waiting to be written.
+    MAX_PENDING_BYTES: int = 64 * 1024 * 1024
+
+    def __init__(self, output_store: GenericOutputStore, worker_count: int, logger: GenericLogger, \
+            max_pending_bytes: int = MAX_PENDING_BYTES):
+        self.output_store: GenericOutputStore = output_store
+        self.logger = logger
+        self.max_pending_bytes: int = max_pending_bytes
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix='write-behind')
+        self.condition = threading.Condition()
+        self.pending_contents: Dict[str, bytes] = {}
+        self.pending_bytes: int = 0
+        self.failed_writes: List[str] = []
+
+    def get_output_store(self) -> GenericOutputStore:
+        return self.output_store
+
+    def write(self, name: str, content: bytes) -> None:
+        with self.condition:
+            # A file written again must wait for its previous content to be written so that the latest content wins
+            while name in self.pending_contents or \
+                    (self.pending_bytes > 0 and self.pending_bytes + len(content) > self.max_pending_bytes):
+                self.condition.wait()
+            self.pending_contents[name] = content
+            self.pending_bytes += len(content)
+        self.executor.submit(self.__write, name, content)
+
+    def __write(self, name: str, content: bytes) -> None:
+        try:
+            self.output_store.write(name, content)
+        except Exception as error:
+            self.logger.log_error(f'Could not write {name}: {error}')
+            with self.condition:
+                self.failed_writes.append(name)
+        finally:
+            with self.condition:
+                del self.pending_contents[name]
+                self.pending_bytes -= len(content)
+                self.condition.notify_all()
+
+    def read(self, name: str) -> bytes:
+        with self.condition:
+            if name in self.pending_contents:
+                return self.pending_contents[name]
+        return self.output_store.read(name)
+
+    def exists(self, name: str) -> bool:
+        with self.condition:
+            if name in self.pending_contents:
+                return True
+        return self.output_store.exists(name)
+
+    def get_names(self) -> List[str]:
+        self.flush()
+        return self.output_store.get_names()
+
+    def flush(self) -> None:
+        with self.condition:
+            while len(self.pending_contents) > 0:
+                self.condition.wait()
+            failed_writes: List[str] = self.failed_writes
+            self.failed_writes = []
+        if len(failed_writes) > 0:
+            raise OutputStoreError(f'{len(failed_writes)} files could not be written (first ones: {", ".join(failed_writes[0: 5])})')
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self.executor.shutdown()
+            self.output_store.close()
+
+    def abort(self) -> None:
+        # Queued writes are dropped, the ones already started are waited for
+        self.executor.shutdown(cancel_futures=True)
+        self.output_store.abort()
+
+class NotifyingOutputStore(GenericOutputStore):
+    # Calls on_written with the name of each file once its content is written (rendering while diagrams are created)
+    def __init__(self, output_store: GenericOutputStore, on_written: Callable[[str], None]):
+        self.output_store: GenericOutputStore = output_store
+        self.on_written: Callable[[str], None] = on_written
+
+    def write(self, name: str, content: bytes) -> None:
+        self.output_store.write(name, content)
+        self.on_written(name)
+
+    def read(self, name: str) -> bytes:
+        return self.output_store.read(name)
+
+    def exists(self, name: str) -> bool:
+        return self.output_store.exists(name)
+
+    def get_names(self) -> List[str]:
+        return self.output_store.get_names()
+
+    def close(self) -> None:
+        self.output_store.close()
+
+    def abort(self) -> None:
+        self.output_store.abort()
+
+class RecordingOutputStore(GenericOutputStore):
+    # Calls on_written with the name and the content of each file written through it (checkpoint journal)
+    def __init__(self, output_store: GenericOutputStore, on_written: Callable[[str, bytes], None]):
+        self.output_store: GenericOutputStore = output_store
+        self.on_written: Callable[[str, bytes], None] = on_written
+
+    def write(self, name: str, content: bytes) -> None:
+        self.output_store.write(name, content)
+        self.on_written(name, content)
+
+    def read(self, name: str) -> bytes:
+        return self.output_store.read(name)
+
+    def exists(self, name: str) -> bool:
+        return self.output_store.exists(name)
+
+    def get_names(self) -> List[str]:
+        return self.output_store.get_names()
+
+    def close(self) -> None:
+        self.output_store.close()
+
+    def abort(self) -> None:
+        self.output_store.abort()
+
+class SidecarOutputStore(GenericOutputStore):
+    # Writes a gzip sidecar next to each written file: behind a write-behind store, files are compressed by its workers
+    def __init__(self, output_store: GenericOutputStore):
+        self.output_store: GenericOutputStore = output_store
+
+    def write(self, name: str, content: bytes) -> None:
+        self.output_store.write(name, content)
+        self.output_store.write(Compressor.get_compressed_file_name(name, Compression.SIDECAR), Compressor.compress(content))
+
+    def read(self, name: str) -> bytes:
+        return self.output_store.read(name)
+
+    def exists(self, name: str) -> bool:
+        return self.output_store.exists(name)
+
+    def get_names(self) -> List[str]:
+        return self.output_store.get_names()
+
+    def close(self) -> None:
+        self.output_store.close()
+
+    def abort(self) -> None:
+        self.output_store.abort()
+
+class CountingOutputStore(GenericOutputStore):
+    # Counts the files and bytes written through it (progress events)
+    def __init__(self, output_store: GenericOutputStore):
+        self.output_store: GenericOutputStore = output_store
+        self.written_file_count: int = 0
+        self.written_bytes: int = 0
+
+    def get_written_file_count(self) -> int:
+        return self.written_file_count
+
+    def get_written_bytes(self) -> int:
+        return self.written_bytes
+
+    def write(self, name: str, content: bytes) -> None:
+        self.output_store.write(name, content)
+        self.written_file_count += 1
+        self.written_bytes += len(content)
+
+    def read(self, name: str) -> bytes:
+        return self.output_store.read(name)
+
+    def exists(self, name: str) -> bool:
+        return self.output_store.exists(name)
+
+    def get_names(self) -> List[str]:
+        return self.output_store.get_names()
+
+    def close(self) -> None:
+        self.output_store.close()
+
+    def abort(self) -> None:
+        self.output_store.abort()
+
+class OutputStoreFactory:
+    BUNDLE_BASENAME: str = 'diagrams'
+
+    @staticmethod
+    def get_bundle_file_name(out_dir: str, bundle_type: BundleType) -> str:
+        return os.path.join(out_dir, f'{OutputStoreFactory.BUNDLE_BASENAME}.{bundle_type.value}')
+
+    @staticmethod
+    def create(out_dir: str, bundle_type: BundleType = BundleType.DIRECTORY, keep_entries: bool = False) -> GenericOutputStore:
+        if bundle_type == BundleType.ZIP:
+            return ZipOutputStore(OutputStoreFactory.get_bundle_file_name(out_dir, bundle_type), keep_entries=keep_entries)
+        if bundle_type == BundleType.SQLITE:
+            return SqliteOutputStore(OutputStoreFactory.get_bundle_file_name(out_dir, bundle_type), keep_entries=keep_entries)
+        return DirectoryOutputStore(out_dir)
+
+    @staticmethod
+    def open_bundle(bundle_file_name: str) -> GenericOutputStore:
+        if os.path.isdir(bundle_file_name):
+            return DirectoryOutputStore(bundle_file_name)
+        if zipfile.is_zipfile(bundle_file_name):
+            return ZipOutputStore(bundle_file_name, True)
+        return SqliteOutputStore(bundle_file_name, True)
@@ -0,0 +1,44 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Tuple
+import ast
+import os
+
+class ParseCache:
+    # Parsed python files kept for the next runs of a process (batch mode), least recently used trees are dropped first.
+    # Trees are keyed by the real path, modification time and size of the files: runs reading the same sources
+    # (with other options, or symbolic links) parse them once.
+    # Rough size of a syntax tree, measured on the standard library
+    TREE_BYTES_PER_SOURCE_BYTE: int = 32
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes: int = max_bytes
+        self.trees: OrderedDict[Tuple[str, int, int], Tuple[ast.Module, int]] = OrderedDict()
+        self.cached_bytes: int = 0
+
+    @staticmethod
+    def get_key(filename: str) -> Tuple[str, int, int]:
+        status: os.stat_result = os.stat(filename)
+        return os.path.realpath(filename), status.st_mtime_ns, status.st_size
+
+    def contains(self, key: Tuple[str, int, int]) -> bool:
+        return key in self.trees
+
+    def get(self, key: Tuple[str, int, int]) -> ast.Module:
+        self.trees.move_to_end(key)
+        return self.trees[key][0]
+
+    def put(self, key: Tuple[str, int, int], tree: ast.Module) -> None:
+        # Files without class are cached as None, they only cost their key
+        tree_bytes: int = key[2] * ParseCache.TREE_BYTES_PER_SOURCE_BYTE if tree is not None else 0
+        if tree_bytes > self.max_bytes:
+            return
+        self.trees[key] = (tree, tree_bytes)
+        self.cached_bytes += tree_bytes
+        while self.cached_bytes > self.max_bytes:
+            _, (_, dropped_bytes) = self.trees.popitem(last=False)
+            self.cached_bytes -= dropped_bytes
+
+    def clear(self) -> None:
+        self.trees.clear()
+        self.cached_bytes = 0
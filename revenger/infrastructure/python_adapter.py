@@ -1,148 +1,247 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, FrozenSet
 import ast
+import mmap
+import os
 import re
-from infrastructure.generic_classes import GenericSubDataStructure
-from infrastructure.generic_classes import GenericDatastructure
-from infrastructure.generic_classes import GenericSaver
-from infrastructure.generic_classes import GenericLogger
-from infrastructure.common import CommonInfrastructure
+from revenger.infrastructure.generic_classes import GenericSubDataStructure
+from revenger.infrastructure.generic_classes import GenericDatastructure
+from revenger.infrastructure.generic_classes import GenericSaver
+from revenger.infrastructure.generic_classes import GenericLogger
+from revenger.infrastructure.common import CommonInfrastructure
+from revenger.infrastructure.python_symbol_table import PythonSymbolTable
+from revenger.infrastructure.parse_cache import ParseCache
 
 class PythonAdapter:
-    def __init__(self, saver: GenericSaver, logger: GenericLogger):
+    CLASS_STATEMENT: re.Pattern = re.compile(rb'^[ \t]*class[ \t]', re.MULTILINE)
+    INIT_FILE_NAME: str = '__init__.py'
+
+    def __init__(self, saver: GenericSaver, logger: GenericLogger, parse_cache: ParseCache = None):
         self.saver = saver
         self.logger = logger
+        self.parse_cache: ParseCache = parse_cache
+        self.symbol_table: PythonSymbolTable = None
+
+    def get_symbol_table(self) -> PythonSymbolTable:
+        return self.symbol_table
 
-    def get_type(self, skip_types: List[str], initial_type: str, type_dict: Dict[str, str], filemodule: str) -> str:
-        member_sub_type = initial_type
-        if member_sub_type in type_dict.keys():
-            member_sub_type = type_dict[member_sub_type]
-            self.logger.log_debug(f'  Type {member_sub_type} *** found *** in {type_dict.keys()} saving as type from module {member_sub_type}')
-        elif member_sub_type not in skip_types:
-            member_sub_type = f'{filemodule}.{member_sub_type}'
-            self.logger.log_debug(f'  Created sub type {member_sub_type} from filemodule: >{filemodule}<')
-            self.logger.log_debug(f'  Type {member_sub_type} not found in {type_dict.keys()} saving as type from module {member_sub_type}')
+    def get_type(self, initial_type: str, filemodule: str) -> str:
+        member_sub_type: str = self.symbol_table.resolve(filemodule, initial_type)
+        self.logger.log_debug(f'  Resolved type {initial_type} from filemodule >{filemodule}< as {member_sub_type}')
         return member_sub_type
-    
+
+    def finalize(self, datastructure: GenericDatastructure) -> None:
+        if self.symbol_table is None:
+            return
+        type_mapping: Dict[str, str] = self.symbol_table.get_re_exported_types()
+        if len(type_mapping) > 0:
+            self.logger.log_debug(f'Replacing re-exported types by their definition: {type_mapping}')
+            datastructure.replace_types(type_mapping)
+
     @staticmethod
     def __get_namespace_name_from_filename(filename: str, from_dir: str) -> str:
         if from_dir is not None:
             filename = filename.replace(from_dir, '')
         return re.sub('^\.', '', re.sub('\.py$', '', filename.replace('/', '.')))
 
+    @staticmethod
+    def has_class_statement(filename: str) -> bool:
+        with open(filename, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                return PythonAdapter.CLASS_STATEMENT.search(content) is not None
+
+    @staticmethod
+    def parse_file(filename: str, parse_cache: ParseCache = None) -> ast.Module:
+        # None for the files that do not define any class
+        cache_key: Tuple[str, int, int] = None
+        if parse_cache is not None:
+            cache_key = ParseCache.get_key(filename)
+            if parse_cache.contains(cache_key):
+                return parse_cache.get(cache_key)
+        tree: ast.Module = None
+        # Package init files are always read: they often only re-export classes of their modules
+        if filename.endswith(PythonAdapter.INIT_FILE_NAME) or PythonAdapter.has_class_statement(filename):
+            with open(filename, 'rb') as file:
+                tree = ast.parse(file.read(), filename)
+        if cache_key is not None:
+            parse_cache.put(cache_key, tree)
+        return tree
+
     def read_python_ast(self, datastructure: GenericDatastructure, filename: str, from_dir: str) -> any:
-        with open(filename, encoding="utf-8") as file:
-            tree: any = ast.parse(file.read())
-            self.logger.log_trace(f"Filename: {filename}")
-            self.logger.log_trace(ast.dump(tree, indent=4))
-            self.logger.log_trace("\n\n\n\n")
+        if self.symbol_table is None:
+            self.symbol_table = PythonSymbolTable(datastructure.get_skip_types())
+        tree: ast.Module = PythonAdapter.parse_file(filename, self.parse_cache)
+        if tree is None:
+            self.logger.log_debug(f'Skipping file {filename}: it does not define any class')
+            return
+        self.logger.log_trace(f"Filename: {filename}")
+        self.logger.log_trace(ast.dump(tree, indent=4))
+        self.logger.log_trace("\n\n\n\n")
         filemodule: str = PythonAdapter.__get_namespace_name_from_filename(filename, from_dir)
-        from_import: Dict[str, str] = {}
         self.logger.log_debug(f'Analyzing file: {filename}')
-        for node in tree.body:
-            if isinstance(node, ast.ImportFrom):
-                module_path = node.module
-                for module_name in node.names:
-                    from_import[module_name.name] = module_path + '.' + module_name.name
-
-        for node in tree.body:    
-            if isinstance(node, ast.ClassDef):
-                self.analyze_class_def(node, datastructure, filename, from_import, filemodule)
-
-    def analyze_class_def(self, \
-        node: ast.ClassDef, datastructure: GenericDatastructure, \
-            filename: str, from_import: Dict[str, str], filemodule: str, parent_class_name: str = None):
+        PythonAstVisitor(self, datastructure, filename, filemodule).visit_module(tree)
+
+class PythonAstVisitor:
+    COMPOUND_STATEMENTS: Tuple[type] = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.With, ast.AsyncWith, ast.Try)
+
+    def __init__(self, adapter: PythonAdapter, datastructure: GenericDatastructure, filename: str, filemodule: str):
+        self.adapter = adapter
+        self.symbol_table: PythonSymbolTable = adapter.get_symbol_table()
+        self.logger = adapter.logger
+        self.datastructure = datastructure
+        self.skip_types: FrozenSet[str] = datastructure.get_skip_types()
+        self.filename: str = filename
+        self.filemodule: str = filemodule
+        self.from_import: Dict[str, str] = {}
+        self.class_nodes: List[ast.ClassDef] = []
+
+    def get_type(self, initial_type: str) -> str:
+        return self.adapter.get_type(initial_type, self.filemodule)
+
+    @staticmethod
+    def get_annotation_name(node: ast.expr) -> str:
+        return node.id if type(node) is ast.Name else None
+
+    @staticmethod
+    def get_nested_bodies(node: ast.stmt) -> List[List[ast.stmt]]:
+        bodies: List[List[ast.stmt]] = [node.body, getattr(node, 'orelse', []), getattr(node, 'finalbody', [])]
+        bodies.extend(handler.body for handler in getattr(node, 'handlers', []))
+        return bodies
+
+    def visit_module(self, node: ast.Module) -> None:
+        # Imports and classes are collected in one walk, classes are analyzed once all module imports are known
+        self.__collect_module_statements(node.body)
+        for class_node in self.class_nodes:
+            self.visit_class(class_node, None)
+
+    def __collect_module_statements(self, body: List[ast.stmt], is_top_level: bool = True) -> None:
+        # Imports of nested blocks (try, if TYPE_CHECKING) bind names, only top-level classes are part of the model
+        for node in body:
+            node_type: type = type(node)
+            if node_type is ast.ImportFrom:
+                self.visit_import_from(node)
+            elif node_type is ast.Import:
+                self.visit_import(node)
+            elif node_type is ast.ClassDef and is_top_level:
+                self.symbol_table.add_class(self.filemodule, node.name)
+                self.class_nodes.append(node)
+            elif node_type in PythonAstVisitor.COMPOUND_STATEMENTS:
+                for nested_body in PythonAstVisitor.get_nested_bodies(node):
+                    self.__collect_module_statements(nested_body, False)
+
+    def visit_import(self, node: ast.Import) -> None:
+        for module_name in node.names:
+            self.symbol_table.add_import(self.filemodule, module_name.name, module_name.asname)
+
+    def visit_import_from(self, node: ast.ImportFrom) -> None:
+        for module_name in node.names:
+            if module_name.name != '*':
+                self.from_import[module_name.asname if module_name.asname is not None else module_name.name] = \
+                    self.symbol_table.add_from_import(self.filemodule, node.module, node.level, module_name.name, module_name.asname)
+
+    def visit_class(self, node: ast.ClassDef, parent_class_name: str) -> None:
         if parent_class_name is None:
-            class_name: str = f'{filemodule}.{node.name}'
-            self.logger.log_debug(f'Created class_name {class_name} from filemodule: >{filemodule}< and >{node.name}<')
+            class_name: str = f'{self.filemodule}.{node.name}'
+            self.logger.log_debug(f'Created class_name {class_name} from filemodule: >{self.filemodule}< and >{node.name}<')
         else:
-            class_name: str = f'{filemodule}.{parent_class_name}.{node.name}'
-            self.logger.log_debug(f'Created class_name {class_name} from filemodule: >{filemodule}<, parent_class_name: >{parent_class_name}< and >{node.name}<')
+            class_name: str = f'{self.filemodule}.{parent_class_name}.{node.name}'
+            self.logger.log_debug(f'Created class_name {class_name} from filemodule: >{self.filemodule}<, parent_class_name: >{parent_class_name}< and >{node.name}<')
 
         class_datastructure: GenericSubDataStructure = \
-            datastructure.append_class(filename, filemodule, from_import, class_name, filemodule.split('.'))
-        self.logger.log_debug(f' Creating class {class_name} from file {filename}, filemodule: {filemodule}, from_import: {from_import}')
+            self.datastructure.append_class(self.filename, self.filemodule, self.from_import, class_name, self.filemodule.split('.'))
+        self.logger.log_debug(f' Creating class {class_name} from file {self.filename}, filemodule: {self.filemodule}, from_import: {self.from_import}')
         for base in node.bases:
-            if isinstance(base, ast.Name):
-                base_class = base.id
-                if base_class == 'ABC':
+            base_name: str = PythonAstVisitor.get_annotation_name(base)
+            if base_name is not None:
+                base_class: str = self.get_type(base_name)
+                if base_name == 'ABC' or base_class == 'abc.ABC':
                     class_datastructure.set_abstract()
                 else:
-                    class_datastructure.add_base_class(base_class)
+                    class_datastructure.add_base_class(base_class, True)
         for class_body in node.body:
-            if isinstance(class_body, ast.ClassDef):
-                inner_class_name: str = f'{class_name}.{class_body.name}'  
-                self.logger.log_debug(f'  Created inner class name {inner_class_name} from filemodule: >{filemodule}< and >{node.name}<')
+            class_body_type: type = type(class_body)
+            if class_body_type is ast.ClassDef:
+                inner_class_name: str = f'{class_name}.{class_body.name}'
+                self.logger.log_debug(f'  Created inner class name {inner_class_name} from filemodule: >{self.filemodule}< and >{node.name}<')
                 from_parent: str = f'{parent_class_name}.{node.name}' if parent_class_name is not None \
                     else node.name
                 self.logger.log_debug(f'  Created from_parent name {from_parent}')
                 class_datastructure.add_inner_class(inner_class_name)
-                self.analyze_class_def(class_body, datastructure, filename, from_import, filemodule, from_parent)
-
-            if isinstance(class_body, ast.AnnAssign):
-                static_name: str = class_body.target.id
-                static_type: str = CommonInfrastructure.NOT_EXTRACTED
-                if isinstance(class_body.annotation, ast.Name):
-                    static_type = self.get_type(datastructure.get_skip_types(),\
-                        class_body.annotation.id, from_import, filemodule)
-                    self.logger.log_debug(f' Analyzing ast.Name static type {static_type} from file {filename}')
-                elif isinstance(class_body.annotation, ast.Subscript):
-                    if isinstance(class_body.annotation.value, ast.Name) and \
-                        isinstance(class_body.annotation.slice, ast.Name):
-                        member_sub_type = self.get_type(datastructure.get_skip_types(),\
-                            class_body.annotation.slice.id, from_import, filemodule)
-                        static_type = class_body.annotation.value.id + '[' + \
-                                member_sub_type + ']'
-                        self.logger.log_debug(f' Analyzing ast.Subscript static type {static_type} from file {filename}')
-                self.logger.log_debug(f'   Static type from file {filename} found static_name: {static_name}, static_type: {static_type}')
-                class_datastructure.add_static(static_name, static_type)
-
-            if isinstance(class_body, ast.FunctionDef):
-                method_name: str = class_body.name
-                arguments: List[Tuple[str, str]] = []
-                for argument in class_body.args.args:
-                    if argument.arg != 'self':
-                        user_type: str = self.get_type(datastructure.get_skip_types(),\
-                            argument.annotation.id, from_import, filemodule) \
-                                if hasattr(argument, 'annotation') and isinstance(argument.annotation, ast.Name)\
-                                    else CommonInfrastructure.NOT_PROVIDED_TYPE
-                        arguments.append((argument.arg, user_type))
-                if method_name != '':
-                    is_private: bool = method_name.startswith('_')
-                    class_datastructure.add_method(method_name,\
-                        [ (argument_name, argument_type) for argument_name, argument_type in arguments],
-                        is_private)
-                for fun_body in class_body.body:
-                    if isinstance(fun_body, ast.AnnAssign):
-                        target = fun_body.target
-                        if isinstance(target, ast.Attribute) or isinstance(target, ast.Name):
-                            is_member: bool = False
-                            if isinstance(target, ast.Attribute):
-                                member_name: str = 'self.'+target.attr
-                                member_type: str = ""
-                                annotation = fun_body.annotation
-                                is_member = True
-                            else:
-                                member_name: str = f'{method_name}.{target.id}'
-                                self.logger.log_debug(f'  Created member_name {member_name} from method_name: >{method_name}> and >{target.id}<')
-                                member_type: str = ""
-                                annotation = fun_body.annotation
-                            if isinstance(annotation, ast.Subscript):
-                                if isinstance(annotation.value, ast.Name) and \
-                                    isinstance(annotation.slice, ast.Name) and \
-                                        hasattr(annotation, 'slice'):
-                                    self.logger.log_debug(f' Subscript function type from file {filename}')
-                                    member_sub_type = self.get_type(datastructure.get_skip_types(), \
-                                        annotation.slice.id, from_import, filemodule)                                                    
-
-                                    member_type = annotation.value.id + '[' + member_sub_type + ']'
-                            elif isinstance(annotation, ast.Name):
-                                self.logger.log_debug(f' Name function type from file {filename}')
-                                member_type = self.get_type(datastructure.get_skip_types(), \
-                                    annotation.id, from_import, filemodule)                                                
-                            else:
-                                self.saver.append(f'\'WARNING: Will not import member named {member_name}')
-                            if len(member_type) > 0 and (is_member or member_type not in datastructure.get_skip_types()):
-                                self.logger.log_debug(f'   Function type from file {filename} method {method_name}, member_type: {member_type}, is_member: {is_member}')
-                                class_datastructure.add_variable(member_name, member_type, is_member)
+                self.visit_class(class_body, from_parent)
+            elif class_body_type is ast.AnnAssign:
+                self.visit_class_annotation(class_body, class_datastructure)
+            elif class_body_type is ast.FunctionDef or class_body_type is ast.AsyncFunctionDef:
+                self.visit_method(class_body, class_datastructure)
+
+    def visit_class_annotation(self, node: ast.AnnAssign, class_datastructure: GenericSubDataStructure) -> None:
+        if type(node.target) is not ast.Name:
+            return
+        static_name: str = node.target.id
+        static_type: str = CommonInfrastructure.NOT_EXTRACTED
+        annotation: ast.expr = node.annotation
+        annotation_name: str = PythonAstVisitor.get_annotation_name(annotation)
+        if annotation_name is not None:
+            static_type = self.get_type(annotation_name)
+            self.logger.log_debug(f' Analyzing ast.Name static type {static_type} from file {self.filename}')
+        elif type(annotation) is ast.Subscript:
+            slice_name: str = PythonAstVisitor.get_annotation_name(annotation.slice)
+            if type(annotation.value) is ast.Name and slice_name is not None:
+                static_type = annotation.value.id + '[' + self.get_type(slice_name) + ']'
+                self.logger.log_debug(f' Analyzing ast.Subscript static type {static_type} from file {self.filename}')
+        self.logger.log_debug(f'   Static type from file {self.filename} found static_name: {static_name}, static_type: {static_type}')
+        class_datastructure.add_static(static_name, static_type)
+
+    def visit_method(self, node: ast.FunctionDef, class_datastructure: GenericSubDataStructure) -> None:
+        method_name: str = node.name
+        arguments: List[Tuple[str, str]] = []
+        for argument in node.args.args:
+            if argument.arg != 'self':
+                annotation_name: str = PythonAstVisitor.get_annotation_name(argument.annotation)
+                user_type: str = self.get_type(annotation_name) \
+                    if annotation_name is not None else CommonInfrastructure.NOT_PROVIDED_TYPE
+                arguments.append((argument.arg, user_type))
+        if method_name != '':
+            class_datastructure.add_method(method_name, arguments, method_name.startswith('_'))
+        self.visit_method_body(node.body, method_name, class_datastructure)
+
+    def visit_method_body(self, body: List[ast.stmt], method_name: str, class_datastructure: GenericSubDataStructure) -> None:
+        # Nested functions are part of the method, classes defined in a method are not part of the model
+        for fun_body in body:
+            fun_body_type: type = type(fun_body)
+            if fun_body_type is ast.AnnAssign:
+                self.visit_method_annotation(fun_body, method_name, class_datastructure)
+            elif fun_body_type is ast.FunctionDef or fun_body_type is ast.AsyncFunctionDef:
+                self.visit_method_body(fun_body.body, f'{method_name}.{fun_body.name}', class_datastructure)
+
+    def visit_method_annotation(self, node: ast.AnnAssign, method_name: str, class_datastructure: GenericSubDataStructure) -> None:
+        target = node.target
+        target_type: type = type(target)
+        if target_type is ast.Attribute:
+            member_name: str = 'self.' + target.attr
+            is_member: bool = True
+        elif target_type is ast.Name:
+            member_name: str = f'{method_name}.{target.id}'
+            self.logger.log_debug(f'  Created member_name {member_name} from method_name: >{method_name}> and >{target.id}<')
+            is_member: bool = False
+        else:
+            return
+        member_type: str = ""
+        annotation: ast.expr = node.annotation
+        annotation_name: str = PythonAstVisitor.get_annotation_name(annotation)
+        if type(annotation) is ast.Subscript:
+            slice_name: str = PythonAstVisitor.get_annotation_name(annotation.slice)
+            if type(annotation.value) is ast.Name and slice_name is not None:
+                self.logger.log_debug(f' Subscript function type from file {self.filename}')
+                member_type = annotation.value.id + '[' + self.get_type(slice_name) + ']'
+        elif annotation_name is not None:
+            self.logger.log_debug(f' Name function type from file {self.filename}')
+            member_type = self.get_type(annotation_name)
+        else:
+            # Reported with the class in its detailed diagrams
+            class_datastructure.add_unsupported_member(member_name)
+        if len(member_type) > 0 and (is_member or member_type not in self.skip_types):
+            self.logger.log_debug(f'   Function type from file {self.filename} method {method_name}, member_type: {member_type}, is_member: {is_member}')
+            class_datastructure.add_variable(member_name, member_type, is_member)
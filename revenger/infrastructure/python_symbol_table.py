@@ -0,0 +1,128 @@
+from __future__ import annotations
+from typing import List, Dict, Set, FrozenSet
+import sys
+
+class PythonSymbolTable:
+    INIT_MODULE_SUFFIX: str = '.__init__'
+
+    def __init__(self, skip_types: FrozenSet[str]):
+        # frozenset of the shared skip-type table is the table itself
+        self.skip_types: FrozenSet[str] = frozenset(skip_types)
+        self.module_bindings: Dict[str, Dict[str, str]] = {}
+        self.module_classes: Dict[str, Set[str]] = {}
+        # Memo of resolve per module and type name, the memo of a module is dropped when its bindings or classes change
+        self.resolved_types: Dict[str, Dict[str, str]] = {}
+        self.canonical_types: Dict[str, str] = {}
+
+    @staticmethod
+    def get_package_name(module: str) -> str:
+        if module.endswith(PythonSymbolTable.INIT_MODULE_SUFFIX):
+            return module[0: -len(PythonSymbolTable.INIT_MODULE_SUFFIX)]
+        return module.rpartition('.')[0]
+
+    def get_absolute_module_name(self, module: str, imported_module: str, level: int) -> str:
+        if level == 0:
+            return imported_module
+        package_name: str = PythonSymbolTable.get_package_name(module)
+        for _ in range(1, level):
+            package_name = package_name.rpartition('.')[0]
+        if imported_module is None:
+            return package_name
+        return f'{package_name}.{imported_module}' if len(package_name) > 0 else imported_module
+
+    def __get_bindings(self, module: str) -> Dict[str, str]:
+        self.resolved_types.pop(module, None)
+        if module not in self.module_bindings:
+            self.module_bindings[module] = {}
+        return self.module_bindings[module]
+
+    def add_import(self, module: str, imported_module: str, alias: str) -> None:
+        if alias is not None:
+            self.__get_bindings(module)[alias] = sys.intern(imported_module)
+        else:
+            head: str = imported_module.partition('.')[0]
+            self.__get_bindings(module)[head] = sys.intern(head)
+
+    def add_from_import(self, module: str, imported_module: str, level: int, name: str, alias: str) -> str:
+        absolute_module: str = self.get_absolute_module_name(module, imported_module, level)
+        qualified_name: str = sys.intern(f'{absolute_module}.{name}' if len(absolute_module) > 0 else name)
+        self.__get_bindings(module)[alias if alias is not None else name] = qualified_name
+        return qualified_name
+
+    def add_class(self, module: str, class_name: str) -> None:
+        self.resolved_types.pop(module, None)
+        if module not in self.module_classes:
+            self.module_classes[module] = set()
+        self.module_classes[module].add(class_name)
+
+    def resolve(self, module: str, type_name: str) -> str:
+        module_resolved_types: Dict[str, str] = self.resolved_types.get(module)
+        if module_resolved_types is None:
+            module_resolved_types = {}
+            self.resolved_types[module] = module_resolved_types
+        resolved_type: str = module_resolved_types.get(type_name)
+        if resolved_type is None:
+            head, separator, tail = type_name.partition('.')
+            bindings: Dict[str, str] = self.module_bindings.get(module, {})
+            if head in bindings:
+                resolved_type = bindings[head] + separator + tail
+            elif head in self.module_classes.get(module, ()):
+                # Classes of the module shadow the builtin names
+                resolved_type = f'{module}.{type_name}'
+            elif type_name in self.skip_types:
+                resolved_type = type_name
+            else:
+                resolved_type = f'{module}.{type_name}'
+            resolved_type = sys.intern(resolved_type)
+            module_resolved_types[type_name] = resolved_type
+        return resolved_type
+
+    def canonicalize(self, fqdn_type: str) -> str:
+        canonical_type: str = self.canonical_types.get(fqdn_type)
+        if canonical_type is not None:
+            return canonical_type
+        # Guard against import cycles while following re-exports
+        self.canonical_types[fqdn_type] = fqdn_type
+        canonical_type = fqdn_type
+        module, _, name = fqdn_type.rpartition('.')
+        if len(module) > 0 and name not in self.module_classes.get(module, set()):
+            init_module: str = f'{module}{PythonSymbolTable.INIT_MODULE_SUFFIX}'
+            if name in self.module_classes.get(init_module, set()):
+                canonical_type = f'{init_module}.{name}'
+            else:
+                for bindings_module in [module, init_module]:
+                    re_exported_type: str = self.module_bindings.get(bindings_module, {}).get(name)
+                    if re_exported_type is not None and re_exported_type != fqdn_type:
+                        canonical_type = self.canonicalize(re_exported_type)
+                        break
+        canonical_type = sys.intern(canonical_type)
+        self.canonical_types[fqdn_type] = canonical_type
+        return canonical_type
+
+    def to_dict(self) -> Dict[str, list]:
+        return {
+            'module_bindings': self.module_bindings,
+            'module_classes': {module: sorted(class_names) for module, class_names in self.module_classes.items()},
+            'resolved_types': self.resolved_types
+        }
+
+    def merge_dict(self, symbol_table_dict: Dict[str, list]) -> None:
+        for module, bindings in symbol_table_dict['module_bindings'].items():
+            self.__get_bindings(module).update(bindings)
+        for module, class_names in symbol_table_dict['module_classes'].items():
+            for class_name in class_names:
+                self.add_class(module, class_name)
+        # A module is read by one shard, its memo was built with the bindings merged above
+        for module, module_resolved_types in symbol_table_dict['resolved_types'].items():
+            self.resolved_types.setdefault(module, {}).update((type_name, sys.intern(resolved_type)) \
+                for type_name, resolved_type in module_resolved_types.items())
+        self.canonical_types.clear()
+
+    def get_re_exported_types(self) -> Dict[str, str]:
+        type_mapping: Dict[str, str] = {}
+        for resolved_type in set(resolved_type for module_resolved_types in self.resolved_types.values() \
+                for resolved_type in module_resolved_types.values()):
+            canonical_type: str = self.canonicalize(resolved_type)
+            if canonical_type != resolved_type:
+                type_mapping[resolved_type] = canonical_type
+        return type_mapping
@@ -0,0 +1,127 @@
+from __future__ import annotations
+from typing import List, Set
+import os
+import queue
+import threading
+
+from revenger.infrastructure.generic_classes import GenericLogger
+from revenger.infrastructure.svg_renderer import PlantUmlRenderer
+from revenger.infrastructure.compressor import Compressor
+from revenger.infrastructure.compressor import Compression
+
+class RenderPipeline:
+    # Renders the puml files as soon as they are written, while the next diagrams are created.
+    # Files are grouped in batches so that plantuml is not started for each of them, and the queue is bounded:
+    # diagram creation waits when rendering falls behind.
+    LINGER_SECONDS: float = 0.5
+    MAX_QUEUED_FILES: int = 2000
+
+    def __init__(self, renderer: PlantUmlRenderer, render_dir: str, logger: GenericLogger, worker_count: int = 1, \
+            max_queued_files: int = MAX_QUEUED_FILES, batch_size: int = 200, compressor: Compressor = None):
+        self.renderer: PlantUmlRenderer = renderer
+        self.render_dir: str = render_dir
+        self.logger = logger
+        self.batch_size: int = batch_size
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queued_files)
+        self.lock = threading.Lock()
+        self.failed_count: int = 0
+        # Rendered svg files are compressed right away, svgz sources once nothing can render them again
+        self.compressor: Compressor = compressor
+        self.rendered_names: Set[str] = set()
+        # A file written again while it is rendered is rendered once more, a file written again while it is queued
+        # is only rendered once (its latest content is read by plantuml)
+        self.queued_names: Set[str] = set()
+        self.rendering_names: Set[str] = set()
+        self.rewritten_names: Set[str] = set()
+        # Detected once before the workers start
+        renderer.get_version()
+        self.workers: List[threading.Thread] = [threading.Thread(target=self.__render, name=f'render-{index}', daemon=True) \
+            for index in range(0, worker_count)]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, puml_file_name: str) -> None:
+        with self.lock:
+            if puml_file_name in self.rendering_names:
+                self.rewritten_names.add(puml_file_name)
+                return
+            if puml_file_name in self.queued_names:
+                return
+            self.queued_names.add(puml_file_name)
+        self.queue.put(puml_file_name)
+
+    def __render(self) -> None:
+        while True:
+            puml_file_name: str = self.queue.get()
+            if puml_file_name is None:
+                return
+            batch: List[str] = [puml_file_name]
+            while len(batch) < self.batch_size:
+                try:
+                    puml_file_name = self.queue.get(timeout=RenderPipeline.LINGER_SECONDS)
+                except queue.Empty:
+                    break
+                if puml_file_name is None:
+                    self.__render_batch(batch)
+                    return
+                batch.append(puml_file_name)
+            self.__render_batch(batch)
+
+    def __render_batch(self, batch: List[str]) -> None:
+        with self.lock:
+            self.queued_names.difference_update(batch)
+            self.rendering_names.update(batch)
+        while len(batch) > 0:
+            try:
+                failed_count: int = self.renderer.render_files(self.render_dir, batch)
+            except Exception as error:
+                self.logger.log_error(f'Could not render {len(batch)} puml files: {error}')
+                failed_count = len(batch)
+            self.__compress(batch)
+            with self.lock:
+                self.failed_count += failed_count
+                self.rendering_names.difference_update(batch)
+                batch = [puml_file_name for puml_file_name in batch if puml_file_name in self.rewritten_names]
+                self.rewritten_names.difference_update(batch)
+                self.rendering_names.update(batch)
+
+    def __compress(self, batch: List[str]) -> None:
+        if self.compressor is None:
+            return
+        for puml_file_name in batch:
+            svg_file_name: str = os.path.join(self.render_dir, self.renderer.get_svg_file_name(puml_file_name))
+            if os.path.isfile(svg_file_name):
+                self.compressor.submit(svg_file_name)
+        with self.lock:
+            self.rendered_names.update(batch)
+
+    def close(self) -> int:
+        # Waits for all submitted files to be rendered and returns the number of files that could not be rendered
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        if self.renderer.get_render_cache() is not None:
+            self.renderer.get_render_cache().evict()
+        self.logger.log_warn(self.renderer.get_summary())
+        if self.compressor is not None:
+            if self.compressor.compression == Compression.SVGZ:
+                for puml_file_name in sorted(self.rendered_names):
+                    self.compressor.submit(os.path.join(self.render_dir, puml_file_name))
+            self.failed_count += self.compressor.close()
+        return self.failed_count
+
+    def abort(self) -> None:
+        # Stops the workers without rendering the queued files, the running plantuml processes are killed
+        self.renderer.cancel()
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        if self.compressor is not None:
+            self.compressor.abort()
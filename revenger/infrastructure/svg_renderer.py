@@ -0,0 +1,305 @@
+from __future__ import annotations
+from typing import List, Dict, Tuple, Set
+import hashlib
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
+
+from revenger.infrastructure.generic_classes import GenericLogger
+
+class RenderCache:
+    # Rendered svg files stored by a hash of the puml content, the plantuml version and its options:
+    # identical diagrams of any run or branch are rendered once.
+    def __init__(self, cache_dir: str, max_size_bytes: int, logger: GenericLogger):
+        self.cache_dir: str = cache_dir
+        self.max_size_bytes: int = max_size_bytes
+        self.logger = logger
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def get_key(puml_content: bytes, renderer_version: str, render_options: List[str]) -> str:
+        digest = hashlib.sha256()
+        digest.update(renderer_version.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(' '.join(render_options).encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(puml_content)
+        return digest.hexdigest()
+
+    def __get_file_name(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[0: 2], f'{key}.svg')
+
+    def __get_version_file_name(self, command_fingerprint: str) -> str:
+        return os.path.join(self.cache_dir, 'versions', hashlib.sha256(command_fingerprint.encode('utf-8')).hexdigest())
+
+    def get_renderer_version(self, command_fingerprint: str) -> str:
+        try:
+            with open(self.__get_version_file_name(command_fingerprint), 'r') as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def set_renderer_version(self, command_fingerprint: str, version: str) -> None:
+        version_file_name: str = self.__get_version_file_name(command_fingerprint)
+        os.makedirs(os.path.dirname(version_file_name), exist_ok=True)
+        with open(version_file_name, 'w') as file:
+            file.write(version)
+
+    def fetch(self, key: str, svg_file_name: str) -> bool:
+        cached_file_name: str = self.__get_file_name(key)
+        try:
+            # Hard links are preferred, copies are used across file systems
+            try:
+                os.link(cached_file_name, svg_file_name)
+            except OSError:
+                if not os.path.isfile(cached_file_name):
+                    return False
+                shutil.copyfile(cached_file_name, svg_file_name)
+            # The modification time gives the least recently used files
+            os.utime(cached_file_name)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def store(self, key: str, svg_file_name: str) -> None:
+        cached_file_name: str = self.__get_file_name(key)
+        os.makedirs(os.path.dirname(cached_file_name), exist_ok=True)
+        # Written aside and renamed so that concurrent runs never read a partial file
+        file_descriptor, temporary_file_name = tempfile.mkstemp(dir=os.path.dirname(cached_file_name), suffix='.tmp')
+        os.close(file_descriptor)
+        try:
+            shutil.copyfile(svg_file_name, temporary_file_name)
+            os.replace(temporary_file_name, cached_file_name)
+        except OSError as error:
+            self.logger.log_warn(f'Could not store {svg_file_name} in the render cache: {error}')
+            if os.path.isfile(temporary_file_name):
+                os.remove(temporary_file_name)
+
+    def evict(self) -> None:
+        cached_files: List[Tuple[float, int, str]] = []
+        cache_size: int = 0
+        for directory, _, file_names in os.walk(self.cache_dir):
+            for file_name in file_names:
+                if not file_name.endswith('.svg'):
+                    continue
+                cached_file_name: str = os.path.join(directory, file_name)
+                try:
+                    file_stat = os.stat(cached_file_name)
+                except FileNotFoundError:
+                    continue
+                cached_files.append((file_stat.st_mtime, file_stat.st_size, cached_file_name))
+                cache_size += file_stat.st_size
+        if cache_size <= self.max_size_bytes:
+            return
+        evicted_count: int = 0
+        for _, file_size, cached_file_name in sorted(cached_files):
+            if cache_size <= self.max_size_bytes:
+                break
+            try:
+                os.remove(cached_file_name)
+            except FileNotFoundError:
+                pass
+            cache_size -= file_size
+            evicted_count += 1
+        self.logger.log_info(f'Evicted {evicted_count} least recently used files from the render cache {self.cache_dir}')
+
+class PlantUmlRenderer:
+    SOURCE_SUFFIX: str = '.puml'
+    RENDER_OPTIONS: List[str] = ['-tsvg']
+    VERSION_OPTIONS: List[str] = ['-version']
+    BATCH_SIZE: int = 200
+
+    def __init__(self, plantuml_command: str, render_cache: RenderCache, logger: GenericLogger, version: str = None, \
+            render_timeout: int = None):
+        self.plantuml_command: List[str] = shlex.split(plantuml_command)
+        self.render_cache: RenderCache = render_cache
+        self.logger = logger
+        self.version: str = version
+        self.render_timeout: int = render_timeout
+        self.lock = threading.Lock()
+        self.cached_count: int = 0
+        self.rendered_count: int = 0
+        # Running plantuml processes, killed when the rendering is cancelled
+        self.processes: Set[subprocess.Popen] = set()
+        self.cancelled: bool = False
+
+    def __get_command_fingerprint(self) -> str:
+        # The version is detected again when the command or one of its files (executable, jar) changes
+        fingerprint: List[str] = []
+        for index, argument in enumerate(self.plantuml_command):
+            file_name: str = shutil.which(argument) if index == 0 else argument
+            if file_name is not None and os.path.isfile(file_name):
+                file_stat = os.stat(file_name)
+                argument = f'{os.path.abspath(file_name)}:{file_stat.st_size}:{file_stat.st_mtime_ns}'
+            fingerprint.append(argument)
+        return ' '.join(fingerprint)
+
+    def get_version(self) -> str:
+        if self.version is None and self.render_cache is not None:
+            self.version = self.render_cache.get_renderer_version(self.__get_command_fingerprint())
+        if self.version is None:
+            try:
+                result = subprocess.run(self.plantuml_command + self.VERSION_OPTIONS, capture_output=True, text=True, timeout=300)
+                self.version = (result.stdout if len(result.stdout.strip()) > 0 else result.stderr).strip().split('\n')[0]
+            except (OSError, subprocess.SubprocessError) as error:
+                self.logger.log_warn(f'Could not get the version of {" ".join(self.plantuml_command)}: {error}')
+            if self.version is None or len(self.version) == 0:
+                self.version = ' '.join(self.plantuml_command)
+            elif self.render_cache is not None:
+                self.render_cache.set_renderer_version(self.__get_command_fingerprint(), self.version)
+            self.logger.log_info(f'Rendering with {self.version}')
+        return self.version
+
+    def get_svg_file_name(self, puml_file_name: str) -> str:
+        return f'{puml_file_name[0: -len(self.SOURCE_SUFFIX)]}.svg'
+
+    @staticmethod
+    def is_complete_svg(svg_file_name: str) -> bool:
+        # A batch interrupted by the timeout may leave its last svg file partially written
+        try:
+            with open(svg_file_name, 'rb') as file:
+                file.seek(0, os.SEEK_END)
+                file.seek(max(0, file.tell() - 64))
+                return file.read().rstrip().endswith(b'</svg>')
+        except OSError:
+            return False
+
+    def __create_placeholder(self, puml_file_name: str, svg_file_name: str) -> None:
+        self.logger.log_warn(f'{puml_file_name} could not be rendered within {self.render_timeout} s, creating a placeholder')
+        with open(svg_file_name, 'w') as file:
+            file.write('<svg xmlns="http://www.w3.org/2000/svg" width="640" height="40">' + \
+                f'<text x="10" y="25">{puml_file_name} could not be rendered within {self.render_timeout} s</text></svg>\n')
+
+    def get_render_cache(self) -> RenderCache:
+        return self.render_cache
+
+    def cancel(self) -> None:
+        # Called by another thread: the running plantuml processes are killed and no other file is rendered
+        with self.lock:
+            self.cancelled = True
+            for process in self.processes:
+                process.kill()
+
+    def get_summary(self) -> str:
+        return f'{self.cached_count + self.rendered_count} svg files created ({self.cached_count} from the render cache)'
+
+    def render_directory(self, render_dir: str) -> int:
+        puml_file_names: List[str] = sorted(name for name in os.listdir(render_dir) if name.endswith(self.SOURCE_SUFFIX))
+        failed_count: int = self.render_files(render_dir, puml_file_names)
+        if self.render_cache is not None:
+            self.render_cache.evict()
+        self.logger.log_warn(self.get_summary())
+        return failed_count
+
+    def render_files(self, render_dir: str, puml_file_names: List[str]) -> int:
+        # Renders the puml files of render_dir (may be called by several threads) and returns the number of failures
+        for puml_file_name in puml_file_names:
+            # Rendered files may be hard links to the cache: they are removed instead of being overwritten
+            svg_file_name: str = os.path.join(render_dir, self.get_svg_file_name(puml_file_name))
+            if os.path.lexists(svg_file_name):
+                os.remove(svg_file_name)
+
+        missing_keys: Dict[str, str] = {}
+        for puml_file_name in puml_file_names:
+            with open(os.path.join(render_dir, puml_file_name), 'rb') as file:
+                key: str = RenderCache.get_key(file.read(), self.get_version(), self.RENDER_OPTIONS) \
+                    if self.render_cache is not None else None
+            svg_file_name: str = os.path.join(render_dir, self.get_svg_file_name(puml_file_name))
+            if key is None or not self.render_cache.fetch(key, svg_file_name):
+                missing_keys[puml_file_name] = key
+        self.logger.log_info(f'{len(puml_file_names) - len(missing_keys)}/{len(puml_file_names)} svg files found in the render cache, ' + \
+            f'rendering {len(missing_keys)} puml files')
+        with self.lock:
+            self.cached_count += len(puml_file_names) - len(missing_keys)
+
+        missing_file_names: List[str] = list(missing_keys.keys())
+        failed_count: int = 0
+        for batch_start in range(0, len(missing_file_names), self.BATCH_SIZE):
+            if self.cancelled:
+                break
+            batch: List[str] = missing_file_names[batch_start: batch_start + self.BATCH_SIZE]
+            # One call renders many files: the plantuml start up time is paid once per batch
+            placeholder_file_names: Set[str] = set()
+            if not self.__run_plantuml(batch, render_dir):
+                placeholder_file_names = self.__render_one_by_one(batch, render_dir)
+            if self.cancelled:
+                break
+            for puml_file_name in batch:
+                svg_file_name: str = os.path.join(render_dir, self.get_svg_file_name(puml_file_name))
+                if puml_file_name in placeholder_file_names:
+                    failed_count += 1
+                elif not os.path.isfile(svg_file_name):
+                    self.logger.log_warn(f'{puml_file_name} could not be rendered')
+                    failed_count += 1
+                else:
+                    with self.lock:
+                        self.rendered_count += 1
+                    if self.render_cache is not None:
+                        self.render_cache.store(missing_keys[puml_file_name], svg_file_name)
+            self.logger.log_info(f' - Rendered {min(batch_start + len(batch), len(missing_file_names))}/{len(missing_file_names)} puml files')
+        return failed_count
+
+    def __render_one_by_one(self, batch: List[str], render_dir: str) -> Set[str]:
+        # Files of a timed out batch not completely rendered are retried alone: a single huge diagram
+        # does not prevent the others from being rendered and is replaced by a placeholder.
+        self.logger.log_warn(f'Rendering {len(batch)} puml files took more than {self.get_timeout(len(batch))} s, ' + \
+            'rendering the remaining ones one by one')
+        placeholder_file_names: Set[str] = set()
+        for puml_file_name in batch:
+            if self.cancelled:
+                break
+            svg_file_name: str = os.path.join(render_dir, self.get_svg_file_name(puml_file_name))
+            if PlantUmlRenderer.is_complete_svg(svg_file_name):
+                continue
+            if os.path.lexists(svg_file_name):
+                os.remove(svg_file_name)
+            if not self.__run_plantuml([puml_file_name], render_dir) or not PlantUmlRenderer.is_complete_svg(svg_file_name):
+                self.__create_placeholder(puml_file_name, svg_file_name)
+                placeholder_file_names.add(puml_file_name)
+        return placeholder_file_names
+
+    def create_command(self, puml_file_names: List[str]) -> List[str]:
+        return self.plantuml_command + self.RENDER_OPTIONS + puml_file_names
+
+    def get_timeout(self, file_count: int) -> int:
+        # The render timeout is given per diagram, a batch gets the time of all its diagrams
+        return self.render_timeout * file_count if self.render_timeout is not None else None
+
+    def __run_plantuml(self, puml_file_names: List[str], render_dir: str) -> bool:
+        # Returns False when the render timeout expired
+        command: List[str] = self.create_command(puml_file_names)
+        self.logger.log_debug(f'Running {" ".join(command)} in {render_dir}')
+        try:
+            process = subprocess.Popen(command, cwd=render_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        except OSError as error:
+            self.logger.log_error(f'Could not run {" ".join(self.plantuml_command)}: {error}')
+            return True
+        with self.lock:
+            self.processes.add(process)
+            if self.cancelled:
+                process.kill()
+        try:
+            _, stderr = process.communicate(timeout=self.get_timeout(len(puml_file_names)))
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            return False
+        finally:
+            with self.lock:
+                self.processes.discard(process)
+        if process.returncode != 0 and not self.cancelled:
+            self.logger.log_warn(f'{" ".join(self.plantuml_command)} returned {process.returncode}: {stderr.strip()}')
+        return True
+
+class GraphvizRenderer(PlantUmlRenderer):
+    # Renders the dot files of the Graphviz output format: dot starts in a few milliseconds, files are rendered one by one
+    SOURCE_SUFFIX: str = '.dot'
+    RENDER_OPTIONS: List[str] = ['-Tsvg']
+    VERSION_OPTIONS: List[str] = ['-V']
+    BATCH_SIZE: int = 1
+
+    def create_command(self, puml_file_names: List[str]) -> List[str]:
+        return self.plantuml_command + self.RENDER_OPTIONS + puml_file_names + ['-o', self.get_svg_file_name(puml_file_names[0])]
@@ -4,11 +4,11 @@ from typing import List, Dict, Tuple
 import ast
 import yaml
 import pprint
-from infrastructure.generic_classes import GenericSubDataStructure
-from infrastructure.generic_classes import GenericDatastructure
-from infrastructure.generic_classes import GenericSaver
-from infrastructure.generic_classes import GenericLogger
-from infrastructure.common import CommonInfrastructure
+from revenger.infrastructure.generic_classes import GenericSubDataStructure
+from revenger.infrastructure.generic_classes import GenericDatastructure
+from revenger.infrastructure.generic_classes import GenericSaver
+from revenger.infrastructure.generic_classes import GenericLogger
+from revenger.infrastructure.common import CommonInfrastructure
  # pip install pyyaml
 class YAMLAdapter:
     def __init__(self, saver: GenericSaver, logger: GenericLogger):
@@ -0,0 +1,83 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+import os
+import sys
+import argparse
+
+from revenger.domain.logger import Logger
+from revenger.infrastructure.memory_budget import MemoryBudget
+from revenger.infrastructure.compressor import Compressor
+from revenger.infrastructure.compressor import Compression
+
+if TYPE_CHECKING:
+    from revenger.infrastructure.svg_renderer import PlantUmlRenderer
+
+DEFAULT_CACHE_DIR: str = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')), 'revenger', 'svg')
+
+def add_render_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--renderer', type=str, choices=['plantuml', 'graphviz'], default='plantuml', \
+                        help='Render puml files with plantuml (default) or dot files with Graphviz')
+    parser.add_argument('--plantuml', type=str, default='plantuml', help='Command running plantuml (for instance "java -jar plantuml.jar")')
+    parser.add_argument('--dot', type=str, default='dot', help='Command running Graphviz dot')
+    parser.add_argument('--plantuml_version', type=str, help='Version of plantuml or dot used in the render cache keys (detected and remembered by default)')
+    parser.add_argument('--render_cache', type=str, default=DEFAULT_CACHE_DIR, help='Directory of the svg cache shared by all runs')
+    parser.add_argument('--render_cache_size_mb', type=int, default=1024, help='Size of the svg cache, least recently used files are evicted above it')
+    parser.add_argument('--no_render_cache', action="store_true", help='Render all puml files without using the svg cache')
+    parser.add_argument('--render_timeout', type=int, help='Seconds allowed per diagram (a batch of files gets the time of all its files), ' + \
+                        'a diagram not rendered within it on its own is replaced by a placeholder')
+    parser.add_argument('--render_workers', type=int, default=1, help='Number of plantuml processes rendering at the same time')
+    parser.add_argument('--compress', type=str, choices=[compression.value for compression in Compression], default=Compression.NONE.value, \
+                        help='Write a .gz sidecar next to each file (sidecar) or replace svg files by svgz files and puml files by puml.gz files (svgz)')
+
+def create_renderer(args: argparse.Namespace, parser: argparse.ArgumentParser, logger: Logger) -> PlantUmlRenderer:
+    # Imported here: runs without rendering do not load the renderers
+    from revenger.infrastructure.svg_renderer import RenderCache
+    from revenger.infrastructure.svg_renderer import PlantUmlRenderer
+    from revenger.infrastructure.svg_renderer import GraphvizRenderer
+    if args.render_timeout is not None and args.render_timeout <= 0:
+        parser.error('--render_timeout must be strictly positive')
+    if args.render_workers <= 0:
+        parser.error('--render_workers must be strictly positive')
+    render_cache: RenderCache = None if args.no_render_cache else \
+        RenderCache(args.render_cache, args.render_cache_size_mb * 1024 * 1024, logger)
+    if args.renderer == 'graphviz':
+        return GraphvizRenderer(args.dot, render_cache, logger, args.plantuml_version, args.render_timeout)
+    return PlantUmlRenderer(args.plantuml, render_cache, logger, args.plantuml_version, args.render_timeout)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog=os.path.basename(sys.argv[0]), description='Render all puml files of a directory into svg files')
+    parser.add_argument('render_dir', type=str, help='Directory containing the puml files, svg files are created next to them')
+    add_render_arguments(parser)
+    parser.add_argument('--info', action="store_true", help='Set logging to info')
+    parser.add_argument('--memory_budget', type=str, help='Memory available for rendering (for instance 4g, or auto for the cgroup limit): fewer plantuml processes are started')
+    parser.add_argument('--debug', action="store_true", help='Set logging to debug')
+    args = parser.parse_args()
+
+    from revenger.infrastructure.render_pipeline import RenderPipeline
+    logger: Logger = Logger(args.info, args.debug)
+    renderer: PlantUmlRenderer = create_renderer(args, parser, logger)
+    if args.memory_budget is not None:
+        try:
+            args.render_workers = MemoryBudget(MemoryBudget.parse(args.memory_budget), logger)\
+                .get_worker_count(args.render_workers, MemoryBudget.PLANTUML_PROCESS_BYTES, 1.0)
+        except ValueError as error:
+            parser.error(str(error))
+    compression: Compression = Compression(args.compress)
+    compressor: Compressor = Compressor(compression, logger) if compression != Compression.NONE else None
+    failed_count: int = 0
+    if args.render_workers > 1:
+        render_pipeline: RenderPipeline = RenderPipeline(renderer, args.render_dir, logger, args.render_workers, compressor=compressor)
+        for puml_file_name in sorted(name for name in os.listdir(args.render_dir) if name.endswith(renderer.SOURCE_SUFFIX)):
+            render_pipeline.submit(puml_file_name)
+        failed_count = render_pipeline.close()
+    else:
+        failed_count = renderer.render_directory(args.render_dir)
+        if compressor is not None:
+            compressor.submit_directory(args.render_dir, ['.svg'] + ([renderer.SOURCE_SUFFIX] if compression == Compression.SVGZ else []))
+            failed_count += compressor.close()
+    if failed_count > 0:
+        logger.log_error(f'{failed_count} puml files could not be rendered')
+        exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,66 @@
 from __future__ import annotations
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Set, Callable, TYPE_CHECKING
 import os
-from enum import Enum
+import shutil
+import tempfile
+from dataclasses import replace
 from pathlib import Path
 
-from domain.saver import Saver
-from domain.logger import Logger
+from revenger.domain.saver import Saver
+from revenger.domain.logger import Logger
 
-from domain.datastructure import Datastructure
-from domain.datastructure import DatastructureHandler
-from domain.datastructure import LanguageDependent
-from domain.diagram_creation import DiagramCreation                        
+from revenger.domain.datastructure import Datastructure
+from revenger.domain.datastructure import DatastructureHandler
+from revenger.domain.datastructure import LanguageDependent
+from revenger.domain.sqlite_datastructure import SqliteDatastructure
+from revenger.domain.dependency_graph import DependencyGraph
+from revenger.domain.edge_table import EdgeTable
+from revenger.domain.class_fragment_cache import ClassFragmentCache
+from revenger.domain.hub_classes import HubClasses
+from revenger.domain.slice_engine import SliceEngine
+from revenger.services.shard_service import ShardService
+from revenger.services.run_options import SourceType
+from revenger.services.run_options import OutputFormat
+from revenger.services.run_options import DiagramGranularity
+from revenger.services.run_options import RunOptions
+from revenger.domain.diagram_creation import DiagramCreation                        
+from revenger.domain.dot_diagram_creation import DotDiagramCreation
+from revenger.domain.navigation_index import NavigationIndex
 
-from infrastructure.python_adapter import PythonAdapter
-from infrastructure.yaml_adapter import YAMLAdapter
- 
-class SourceType(Enum):
-    PYTHON_SOURCE = 1,
-    YAML_SOURCE = 2
+from revenger.infrastructure.output_store import OutputStoreFactory
+from revenger.infrastructure.output_store import DirectoryOutputStore
+from revenger.infrastructure.output_store import WriteBehindOutputStore
+from revenger.infrastructure.output_store import CountingOutputStore
+from revenger.infrastructure.output_store import RecordingOutputStore
+from revenger.infrastructure.output_store import NotifyingOutputStore
+from revenger.infrastructure.output_store import SidecarOutputStore
+from revenger.infrastructure.compressor import Compressor
+from revenger.infrastructure.compressor import Compression
+from revenger.infrastructure.event_stream import EventStream
+from revenger.infrastructure.checkpoint import Checkpoint
+from revenger.infrastructure.memory_budget import MemoryBudget
+from revenger.infrastructure.generic_classes import GenericOutputStore
 
+if TYPE_CHECKING:
+    # Adapters and renderers are imported by the runs using them: short runs do not pay for the other ones
+    from revenger.infrastructure.python_adapter import PythonAdapter
+    from revenger.infrastructure.parse_cache import ParseCache
+    from revenger.infrastructure.render_pipeline import RenderPipeline
+ 
 class ApplicationService:
+    GRAPH_REPORT_FILE_NAME: str = 'dependency-graph-report.txt'
+
+    @staticmethod
+    def get_diagram_creation_type(run_options: RunOptions) -> type:
+        return DotDiagramCreation if run_options.output_format == OutputFormat.DOT else DiagramCreation
 
     @staticmethod
-    def fill_datastructure_with_all_source_files(from_dir: str, diagram_creation: DiagramCreation, logger: Logger, saver: Saver, source_type: SourceType):
+    def get_link_suffix(run_options: RunOptions) -> str:
+        # Diagrams link to the files they will be compressed into
+        return 'svgz' if run_options.compression == Compression.SVGZ else DiagramCreation.LINK_SUFFIX
+
+    @staticmethod
+    def get_source_file_names(from_dir: str, logger: Logger, source_type: SourceType) -> List[str]:
         file_types: Tuple[str]
         if source_type == SourceType.PYTHON_SOURCE:
             file_types = ["*.py"]
@@ -33,46 +71,444 @@ class ApplicationService:
         file_list = []
         for exentions in file_types:
             file_list.extend(list(Path(from_dir).rglob(exentions)))
-        for file in file_list:
-            file_name: str = os.path.join(from_dir, file)
+        # Sorted so that every run (and every shard) sees the files in the same order
+        return sorted(os.path.join(from_dir, file) for file in file_list)
+
+    @staticmethod
+    def get_source_bytes(from_dir: str, logger: Logger, source_type: SourceType) -> int:
+        return sum(os.path.getsize(file_name) for file_name in ApplicationService.get_source_file_names(from_dir, logger, source_type))
+
+    @staticmethod
+    def fill_datastructure_with_all_source_files(from_dir: str, diagram_creation: DiagramCreation, logger: Logger, saver: Saver, \
+            source_type: SourceType, ingest_shard: Tuple[int, int] = None, event_stream: EventStream = None, \
+                parse_cache: ParseCache = None) -> Tuple[PythonAdapter, Dict[int, List[str]]]:
+        python_adapter: PythonAdapter = None
+        if source_type == SourceType.PYTHON_SOURCE:
+            from revenger.infrastructure.python_adapter import PythonAdapter
+            python_adapter = PythonAdapter(saver, logger, parse_cache)
+        elif source_type == SourceType.YAML_SOURCE:
+            from revenger.infrastructure.yaml_adapter import YAMLAdapter
+        saver_lines: Dict[int, List[str]] = {}
+        event_stream = event_stream if event_stream is not None else EventStream()
+        source_file_names: List[Tuple[int, str]] = \
+            [(file_order, file_name) for file_order, file_name in enumerate(ApplicationService.get_source_file_names(from_dir, logger, source_type)) \
+                if ShardService.is_in_shard(os.path.relpath(file_name, from_dir), ingest_shard)]
+        event_stream.emit('files_discovered', count=len(source_file_names))
+        file_progress: EventStream.Progress = event_stream.create_progress('file_parsed', len(source_file_names))
+        for file_order, file_name in source_file_names:
+            class_count: int = diagram_creation.get_data_structure().get_class_count()
+            saver_line_count: int = saver.get_line_count()
+            diagram_creation.get_data_structure().set_file_order(file_order)
             if source_type == SourceType.PYTHON_SOURCE:
-                PythonAdapter(saver, logger).read_python_ast(\
+                python_adapter.read_python_ast(\
                     diagram_creation.get_data_structure(), file_name, from_dir)
             elif source_type == SourceType.YAML_SOURCE:
                 YAMLAdapter(saver, logger).read(\
                     diagram_creation.get_data_structure(), file_name, from_dir)
+            diagram_creation.get_data_structure().flush()
+            if saver.get_line_count() > saver_line_count:
+                saver_lines[file_order] = saver.get_lines_from(saver_line_count)
+            file_progress.advance(file=os.path.relpath(file_name, from_dir), \
+                classes_added=diagram_creation.get_data_structure().get_class_count() - class_count)
+        return python_adapter, saver_lines
+
+    @staticmethod
+    def ingest_shard(from_dir: str, logger: Logger, language_dependent: LanguageDependent, saver: Saver, run_options: RunOptions, \
+            event_stream: EventStream = None) -> None:
+        shard_file_name: str = ShardService.get_shard_file_name(run_options.shard_dir, run_options.ingest_shard)
+        logger.log_info(f'Reading shard {run_options.ingest_shard} of the source files into {shard_file_name}')
+        shard_datastructure: SqliteDatastructure = SqliteDatastructure(language_dependent, logger, shard_file_name)
+        shard_datastructure.clear()
+        python_adapter, saver_lines = ApplicationService.fill_datastructure_with_all_source_files(from_dir, \
+            DiagramCreation(shard_datastructure, saver, logger), logger, saver, run_options.source_type, run_options.ingest_shard, event_stream, \
+                run_options.parse_cache)
+        ShardService.save_shard_metadata(shard_datastructure, \
+            python_adapter.get_symbol_table() if run_options.source_type == SourceType.PYTHON_SOURCE else None, saver_lines)
+        shard_datastructure.set_ingest_complete(run_options.skip_uses_relation)
+        shard_datastructure.close()
+
+    @staticmethod
+    def create_datastructure(language_dependent: LanguageDependent, logger: Logger, run_options: RunOptions, \
+            memory_budget: MemoryBudget = None) -> Datastructure:
+        if run_options.model_store_file_name is not None:
+            logger.log_info(f'Storing the model in {run_options.model_store_file_name}')
+            datastructure: SqliteDatastructure = SqliteDatastructure(language_dependent, logger, run_options.model_store_file_name)
+            if memory_budget is not None:
+                datastructure.set_cached_class_count(memory_budget.get_cached_count(MemoryBudget.MODEL_CLASS_BYTES, 0.1, \
+                    datastructure.cached_class_count))
+            return datastructure
+        return Datastructure(language_dependent, logger)
+
+    @staticmethod
+    def fill_datastructure(from_dir: str, diagram_creation: DiagramCreation, logger: Logger, saver: Saver, run_options: RunOptions, \
+            event_stream: EventStream = None):
+        datastructure: Datastructure = diagram_creation.get_data_structure()
+        saver_line_count: int = saver.get_line_count()
+        if isinstance(datastructure, SqliteDatastructure):
+            if run_options.reuse_model_store and datastructure.is_ingest_complete(run_options.skip_uses_relation):
+                logger.log_info(f'Reusing the model stored in {datastructure.get_database_file_name()}')
+                saver.append_lines(datastructure.get_ingest_saver_lines())
+                return
+            if run_options.reuse_model_store:
+                logger.log_warn(f'The model stored in {datastructure.get_database_file_name()} is incomplete ' + \
+                    'or was created with another skip_uses_relation option: reading all source files again.')
+            datastructure.clear()
+
+        if run_options.merge_shards:
+            ShardService.merge_shards(run_options.shard_dir, datastructure, datastructure.get_language_dependent(), saver, logger)
+        else:
+            python_adapter, _ = ApplicationService.fill_datastructure_with_all_source_files(\
+                from_dir, diagram_creation, logger, saver, run_options.source_type, None, event_stream, run_options.parse_cache)
+            if run_options.source_type == SourceType.PYTHON_SOURCE:
+                python_adapter.finalize(datastructure)
+                datastructure.flush()
+        diagram_creation.create_referenced_but_inexistent_classes(run_options.skip_uses_relation)
+        if isinstance(datastructure, SqliteDatastructure):
+            datastructure.set_ingest_complete(run_options.skip_uses_relation, saver.get_lines_from(saver_line_count))
+
+    @staticmethod
+    def create_graph_report(dependency_graph: DependencyGraph, logger: Logger, saver: Saver, run_options: RunOptions) -> None:
+        report_saver: Saver = Saver(saver.out_dir, logger, None, saver.get_output_store())
+        for line in dependency_graph.create_report(run_options.graph_report_top, run_options.graph_report_hops):
+            report_saver.append(line)
+        report_saver.save(ApplicationService.GRAPH_REPORT_FILE_NAME)
+
+    @staticmethod
+    def get_module_class_names(datastructure: Datastructure) -> Dict[str, List[str]]:
+        # Classes of each source file, the module name being the one of the classes it defines
+        module_class_names: Dict[str, List[str]] = {}
+        for filename in datastructure.get_sorted_filenames():
+            sub_datastructures: List[Datastructure.SubDataStructure] = datastructure.get_datastructures_from_filename(filename)
+            module_name: str = sub_datastructures[0].get_filemodule()
+            if len(module_name) > 0:
+                module_class_names.setdefault(module_name, []).extend(\
+                    sub_datastructure.get_fqdn_class_name() for sub_datastructure in sub_datastructures)
+        return module_class_names
+
+    @staticmethod
+    def get_slices(datastructure: Datastructure, hub_classes: HubClasses, link_per_module: bool, logger: Logger) -> \
+            Tuple[List[str], Dict[str, List[str]], Dict[str, List[str]]]:
+        # Class, namespace and module diagrams to create with the classes of each of them
+        class_list: List[str] = list(datastructure.get_classname_list())
+        class_name_list_grouped_by_namespaces: Dict[str, List[str]] = \
+            DatastructureHandler(datastructure, logger).get_class_name_list_grouped_by_namespaces()
+        module_class_names: Dict[str, List[str]] = {}
+        if link_per_module:
+            # One diagram per source file replaces the class diagrams and the namespace diagrams of modules and classes,
+            # hub classes keep their paged diagrams
+            module_class_names = ApplicationService.get_module_class_names(datastructure)
+            class_list = [class_name for class_name in class_list if hub_classes is not None and hub_classes.is_hub(class_name)]
+            class_name_list_grouped_by_namespaces = {namespace_name: class_name_list for namespace_name, class_name_list in \
+                class_name_list_grouped_by_namespaces.items() if namespace_name not in module_class_names and \
+                    not datastructure.class_exists(namespace_name)}
+        return class_list, class_name_list_grouped_by_namespaces, module_class_names
+
+    @staticmethod
+    def create_navigation_index(class_list: List[str], class_name_list_grouped_by_namespaces: Dict[str, List[str]], \
+            module_class_names: Dict[str, List[str]], hub_classes: HubClasses, logger: Logger, saver: Saver, link_suffix: str) -> None:
+        navigation_index: NavigationIndex = NavigationIndex(logger, link_suffix)
+        navigation_index.add_diagrams(list(class_name_list_grouped_by_namespaces.keys()), NavigationIndex.NAMESPACE)
+        navigation_index.add_diagrams([class_name for class_name in class_list \
+            if hub_classes is None or not hub_classes.is_hub(class_name)], NavigationIndex.CLASS)
+        navigation_index.add_diagrams([class_name for class_name in class_list \
+            if hub_classes is not None and hub_classes.is_hub(class_name)], NavigationIndex.HUB_CLASS)
+        navigation_index.add_diagrams(list(module_class_names.keys()), NavigationIndex.MODULE)
+        for module_name, class_name_list in module_class_names.items():
+            for class_name in class_name_list:
+                navigation_index.add_shown_in(class_name, NavigationIndex.CLASS, module_name)
+        for file_name, lines in [(NavigationIndex.JSON_FILE_NAME, [navigation_index.create_json()]), \
+                (NavigationIndex.SCRIPT_FILE_NAME, navigation_index.create_script()), (NavigationIndex.PAGE_FILE_NAME, NavigationIndex.create_page())]:
+            Saver(saver.out_dir, logger, None, saver.get_output_store()).append_lines(lines).save(file_name)
+
+    @staticmethod
+    def create_slice(datastructure: Datastructure, class_name_list: List[str], hub_class_names: Set[str], \
+            slice_engine: SliceEngine, logger: Logger) -> Datastructure:
+        if slice_engine is not None:
+            return slice_engine.create_reduced_class_list_from_class_name_list(datastructure, class_name_list)
+        return DatastructureHandler(datastructure, logger).create_reduced_class_list_from_class_name_list(class_name_list, hub_class_names)
+
+    @staticmethod
+    def create_hub_class_diagrams(class_name: str, hub_classes: HubClasses, datastructure: Datastructure, from_dir: str, \
+            logger: Logger, saver: Saver, edge_table: EdgeTable, fragment_cache: ClassFragmentCache, run_options: RunOptions) -> None:
+        # The classes referencing a hub class are spread over several pages of a bounded size
+        referrer_class_names: List[str] = datastructure.get_referrer_class_names([class_name])
+        page_names: List[str] = hub_classes.get_page_names(class_name, len(referrer_class_names))
+        referrers_per_page: int = hub_classes.referrers_per_page
+        other_hub_class_names: Set[str] = hub_classes.get_class_names().difference([class_name])
+        diagram_creation_type: type = ApplicationService.get_diagram_creation_type(run_options)
+        logger.log_info(f'Hub class {class_name} is referenced by {len(referrer_class_names)} classes: creating {len(page_names)} pages')
+        for page_index, page_name in enumerate(page_names):
+            reduced_class_list_datastructure: Datastructure = DatastructureHandler(datastructure, logger)\
+                .create_reduced_class_list_from_class_name_list([class_name], hub_classes.get_class_names(), \
+                    referrer_class_names[page_index * referrers_per_page: (page_index + 1) * referrers_per_page])
+            page_diagram_creation: DiagramCreation = diagram_creation_type(reduced_class_list_datastructure, saver, logger, \
+                edge_table, fragment_cache, run_options.diagram_budget, other_hub_class_names, \
+                    run_options.diagram_granularity == DiagramGranularity.MODULE, ApplicationService.get_link_suffix(run_options))
+            page_diagram_creation.create_puml_files(from_dir, run_options.skip_uses_relation, page_name, page_names)
 
     @staticmethod
     def read_all_source_files(from_dir: str, out_dir: str, \
-            logger: Logger, language_dependent: LanguageDependent, \
-                skip_uses_relation: bool, source_type: SourceType) -> Dict[str, List[str]]:
-        saver: Saver = Saver(out_dir, logger)
-        diagram_creation: DiagramCreation = DiagramCreation(Datastructure(language_dependent, logger), saver, logger)
-        saver.append('@startuml')
-
-        ApplicationService.fill_datastructure_with_all_source_files(from_dir, diagram_creation, logger, saver, source_type)
-        diagram_creation.create_referenced_but_inexistent_classes(skip_uses_relation)
-        # Create full diagrams
-        diagram_creation.create_puml_files(from_dir, skip_uses_relation, None)
-
-        # Create diagrams filtered out by class name
-        class_list: List[str] = diagram_creation.get_data_structure().get_classname_list()
-        for class_name in class_list:
-             reduced_class_list_datastructure = \
-                DatastructureHandler(diagram_creation.get_data_structure(), logger)\
-                    .create_reduced_class_list_from_class_name_list([class_name])
-             class_based_diagram_creation: DiagramCreation = \
-                DiagramCreation(reduced_class_list_datastructure, saver, logger)
-             class_based_diagram_creation.create_puml_files(from_dir, skip_uses_relation, class_name)
-
-        # Create diagrams filtered out by namespace
-        class_name_list_grouped_by_namespaces: Dict[List[str]] = \
-            DatastructureHandler(diagram_creation.get_data_structure(), logger)\
-                .get_class_name_list_grouped_by_namespaces()
-        for namespace_name, class_name_list in class_name_list_grouped_by_namespaces.items():
-             reduced_namespace_list = \
-                DatastructureHandler(diagram_creation.get_data_structure(), logger).\
-                    create_reduced_class_list_from_class_name_list(class_name_list)
-             namespace_based_diagram_creation: DiagramCreation = \
-                DiagramCreation(reduced_namespace_list, saver, logger)
-             namespace_based_diagram_creation.create_puml_files(from_dir, skip_uses_relation, namespace_name)
\ No newline at end of file
+            logger: Logger, language_dependent: LanguageDependent, run_options: RunOptions) -> Dict[str, List[str]]:
+        skip_uses_relation: bool = run_options.skip_uses_relation
+        event_stream: EventStream = EventStream.open(run_options.events_file_name, run_options.events_file_descriptor)
+        try:
+            event_stream.emit('run_started', from_dir=from_dir, out_dir=out_dir, source_type=run_options.source_type.name)
+            ApplicationService.create_all_diagrams(from_dir, out_dir, logger, language_dependent, run_options, event_stream)
+        except Exception as error:
+            event_stream.emit('run_failed', error=str(error))
+            raise
+        finally:
+            event_stream.close()
+
+    @staticmethod
+    def get_run_fingerprint(from_dir: str, run_options: RunOptions) -> str:
+        # Options changing the model or the diagrams: a checkpoint created with other ones cannot be resumed
+        return repr((from_dir, run_options.skip_uses_relation, run_options.source_type, run_options.bundle_type, \
+            run_options.model_store_file_name, run_options.emit_shard, run_options.merge_shards, run_options.graph_report, \
+                run_options.graph_report_top, run_options.graph_report_hops, run_options.diagram_budget, run_options.hub_policy, \
+                    run_options.output_format, run_options.slice_policy, run_options.diagram_granularity, run_options.compression))
+
+    @staticmethod
+    def open_output_store(out_dir: str, run_options: RunOptions) -> GenericOutputStore:
+        output_store: GenericOutputStore = OutputStoreFactory.create(out_dir, run_options.bundle_type, run_options.resume)
+        if run_options.compression == Compression.SIDECAR:
+            # Sidecars are compressed by the write-behind workers
+            output_store = SidecarOutputStore(output_store)
+        return output_store
+
+    @staticmethod
+    def open_checkpoint(from_dir: str, out_dir: str, output_store: GenericOutputStore, logger: Logger, run_options: RunOptions) -> \
+            Tuple[Checkpoint, RunOptions]:
+        # Runs that are not resumed get a checkpoint recording nothing
+        if not run_options.resume:
+            return Checkpoint(), run_options
+        # The model is kept with the journal of the completed slices unless another model store is given, the lines its
+        # ingestion added to the root saver are stored with it so that resumed diagrams are identical
+        checkpoint: Checkpoint = Checkpoint.open(out_dir, ApplicationService.get_run_fingerprint(from_dir, run_options), output_store, logger)
+        if run_options.model_store_file_name is None:
+            run_options = replace(run_options, model_store_file_name=Checkpoint.get_model_file_name(out_dir))
+        return checkpoint, replace(run_options, reuse_model_store=os.path.isfile(run_options.model_store_file_name))
+
+    @staticmethod
+    def create_memory_budget(from_dir: str, logger: Logger, run_options: RunOptions) -> Tuple[MemoryBudget, str, RunOptions]:
+        # Returns the budget of the run and the temporary directory of its model when it is spilled (removed at the end of the run)
+        if run_options.memory_budget is None:
+            return None, None, run_options
+        memory_budget: MemoryBudget = MemoryBudget(run_options.memory_budget, logger)
+        if run_options.model_store_file_name is not None or \
+                not memory_budget.is_model_too_large(ApplicationService.get_source_bytes(from_dir, logger, run_options.source_type)):
+            return memory_budget, None, run_options
+        # The model would not fit in memory: it is spilled to a temporary model store
+        spill_dir: str = tempfile.mkdtemp(prefix='revenger-model-')
+        logger.log_warn(f'The model of {from_dir} does not fit in the memory budget: it is stored in {spill_dir}')
+        return memory_budget, spill_dir, replace(run_options, model_store_file_name=os.path.join(spill_dir, 'model.sqlite'))
+
+    @staticmethod
+    def create_diagram_caches(datastructure: Datastructure, logger: Logger, run_options: RunOptions, memory_budget: MemoryBudget = None) -> \
+            Tuple[EdgeTable, ClassFragmentCache]:
+        # Relations and classes are formatted once for the whole model and shared by all diagrams,
+        # the skip types are known once the model is filled (types of other code bases)
+        edge_table: EdgeTable = EdgeTable(datastructure.get_skip_types(), run_options.skip_uses_relation, logger)
+        if memory_budget is None:
+            return edge_table, ClassFragmentCache(logger)
+        fragment_cache: ClassFragmentCache = \
+            ClassFragmentCache(logger, memory_budget.get_cached_count(MemoryBudget.CLASS_FRAGMENT_BYTES, 0.1, 16384))
+        memory_budget.add_on_pressure(fragment_cache.clear)
+        memory_budget.add_on_pressure(edge_table.clear)
+        return edge_table, fragment_cache
+
+    @staticmethod
+    def create_render_pipeline(out_dir: str, logger: Logger, run_options: RunOptions, memory_budget: MemoryBudget = None) -> RenderPipeline:
+        # svg files are rendered from the written puml files while the next diagrams are created
+        if run_options.renderer is None:
+            return None
+        from revenger.infrastructure.render_pipeline import RenderPipeline
+        render_worker_count: int = run_options.render_worker_count
+        if memory_budget is not None:
+            # Each plantuml process is a jvm, half of the budget is kept for them
+            render_worker_count = memory_budget.get_worker_count(render_worker_count, MemoryBudget.PLANTUML_PROCESS_BYTES, 0.5)
+        return RenderPipeline(run_options.renderer, out_dir, logger, render_worker_count, \
+            compressor=Compressor(run_options.compression, logger) if run_options.compression != Compression.NONE else None)
+
+    @staticmethod
+    def create_output_store_chain(output_store: GenericOutputStore, logger: Logger, run_options: RunOptions, checkpoint: Checkpoint, \
+            render_pipeline: RenderPipeline = None, memory_budget: MemoryBudget = None) -> Tuple[GenericOutputStore, CountingOutputStore]:
+        # Returns the store the saver writes to, through all the other ones down to output_store, and the store counting the written files
+        if render_pipeline is not None:
+            submit: Callable[[str], None] = \
+                lambda name: render_pipeline.submit(name) if name.endswith(run_options.renderer.SOURCE_SUFFIX) else None
+            output_store = NotifyingOutputStore(output_store, submit)
+            # Files of the slices completed by a previous run are rendered again (from the svg cache)
+            checkpoint.set_on_skipped_file(submit)
+        write_behind_output_store: WriteBehindOutputStore = None
+        if run_options.write_worker_count > 0:
+            max_pending_bytes: int = WriteBehindOutputStore.MAX_PENDING_BYTES if memory_budget is None else \
+                min(WriteBehindOutputStore.MAX_PENDING_BYTES, memory_budget.get_share(0.1))
+            write_behind_output_store = WriteBehindOutputStore(output_store, run_options.write_worker_count, logger, max_pending_bytes)
+            output_store = write_behind_output_store
+        if memory_budget is not None:
+            # Resident memory is checked while the diagrams are written, queued writes are flushed when it gets close to the budget
+            output_store = NotifyingOutputStore(output_store, lambda name: memory_budget.check())
+            if write_behind_output_store is not None:
+                memory_budget.add_on_pressure(write_behind_output_store.flush)
+        counting_output_store: CountingOutputStore = CountingOutputStore(output_store)
+        return RecordingOutputStore(counting_output_store, checkpoint.record) if run_options.resume else counting_output_store, \
+            counting_output_store
+
+    @staticmethod
+    def create_all_diagrams(from_dir: str, out_dir: str, logger: Logger, language_dependent: LanguageDependent, \
+            run_options: RunOptions, event_stream: EventStream) -> None:
+        skip_uses_relation: bool = run_options.skip_uses_relation
+        if run_options.ingest_shard is not None:
+            ApplicationService.ingest_shard(from_dir, logger, language_dependent, Saver(out_dir, logger, None, DirectoryOutputStore(out_dir)), \
+                run_options, event_stream)
+            event_stream.emit('run_completed')
+            return
+        output_store: GenericOutputStore = ApplicationService.open_output_store(out_dir, run_options)
+        checkpoint, run_options = ApplicationService.open_checkpoint(from_dir, out_dir, output_store, logger, run_options)
+        memory_budget, spill_dir, run_options = ApplicationService.create_memory_budget(from_dir, logger, run_options)
+        render_pipeline: RenderPipeline = None
+        datastructure: Datastructure = None
+        closing: bool = False
+        completed: bool = False
+        try:
+            render_pipeline = ApplicationService.create_render_pipeline(out_dir, logger, run_options, memory_budget)
+            output_store, counting_output_store = ApplicationService.create_output_store_chain(output_store, logger, run_options, \
+                checkpoint, render_pipeline, memory_budget)
+            saver: Saver = Saver(out_dir, logger, None, output_store)
+            datastructure = ApplicationService.create_datastructure(language_dependent, logger, run_options, memory_budget)
+            if memory_budget is not None:
+                # Released when the resident memory gets close to the budget: they are all filled again when needed
+                if isinstance(datastructure, SqliteDatastructure):
+                    memory_budget.add_on_pressure(datastructure.release_cache)
+                if run_options.parse_cache is not None:
+                    memory_budget.add_on_pressure(run_options.parse_cache.clear)
+            saver.append('@startuml')
+
+            ApplicationService.fill_datastructure(from_dir, DiagramCreation(datastructure, saver, logger), logger, saver, run_options, event_stream)
+            edge_table, fragment_cache = ApplicationService.create_diagram_caches(datastructure, logger, run_options, memory_budget)
+            diagram_creation_type: type = ApplicationService.get_diagram_creation_type(run_options)
+            link_per_module: bool = run_options.diagram_granularity == DiagramGranularity.MODULE
+            link_suffix: str = ApplicationService.get_link_suffix(run_options)
+            diagram_creation: DiagramCreation = diagram_creation_type(datastructure, saver, logger, edge_table, fragment_cache, \
+                run_options.diagram_budget, None, link_per_module, link_suffix)
+            event_stream.emit('model_completed', class_count=diagram_creation.get_data_structure().get_class_count())
+            detect_hub_classes: bool = run_options.hub_policy is not None and run_options.hub_policy.is_enabled()
+            create_slice_engine: bool = run_options.slice_policy is not None and not run_options.slice_policy.is_default()
+            # The dependency graph is built once for the hub classes, the slices and the graph report
+            dependency_graph: DependencyGraph = None
+            if (detect_hub_classes and run_options.hub_policy.min_fan_in is not None) or create_slice_engine or run_options.graph_report:
+                dependency_graph = DependencyGraph.from_datastructure(diagram_creation.get_data_structure(), skip_uses_relation, logger)
+            hub_classes: HubClasses = None
+            hub_class_names: Set[str] = None
+            if detect_hub_classes:
+                hub_classes = HubClasses.detect(diagram_creation.get_data_structure(), run_options.hub_policy, dependency_graph, logger)
+                hub_class_names = hub_classes.get_class_names()
+                diagram_creation.set_hub_class_names(hub_class_names)
+            slice_engine: SliceEngine = None
+            if create_slice_engine:
+                slice_engine = SliceEngine(dependency_graph, run_options.slice_policy, hub_class_names, logger)
+            emit_shard: Tuple[int, int] = run_options.emit_shard
+            create_full_diagrams: bool = emit_shard is None or emit_shard[0] == 0
+            # The navigation index lists the diagrams of all shards
+            all_class_list, all_class_name_list_grouped_by_namespaces, all_module_class_names = \
+                ApplicationService.get_slices(diagram_creation.get_data_structure(), hub_classes, link_per_module, logger)
+            class_list: List[str] = [class_name for class_name in all_class_list if ShardService.is_in_shard(class_name, emit_shard)]
+            class_name_list_grouped_by_namespaces: Dict[List[str]] = {namespace_name: class_name_list for namespace_name, class_name_list in \
+                all_class_name_list_grouped_by_namespaces.items() if ShardService.is_in_shard(namespace_name, emit_shard)}
+            module_class_names: Dict[str, List[str]] = {module_name: class_name_list for module_name, class_name_list in \
+                all_module_class_names.items() if ShardService.is_in_shard(module_name, emit_shard)}
+            slice_count: int = (1 if create_full_diagrams else 0) + len(class_list) + len(class_name_list_grouped_by_namespaces) + \
+                len(module_class_names)
+            event_stream.emit('slices_planned', full=1 if create_full_diagrams else 0, classes=len(class_list), \
+                namespaces=len(class_name_list_grouped_by_namespaces), modules=len(module_class_names), total=slice_count)
+            slice_progress: EventStream.Progress = event_stream.create_progress('slice_completed', slice_count)
+
+            # Create full diagrams
+            if create_full_diagrams and checkpoint.skip('full', 'full'):
+                slice_progress.advance(kind='full', name='full', bytes_written=counting_output_store.get_written_bytes(), resumed=True)
+            elif create_full_diagrams:
+                diagram_creation.create_puml_files(from_dir, skip_uses_relation, None)
+                if run_options.graph_report:
+                    ApplicationService.create_graph_report(dependency_graph, logger, saver, run_options)
+                ApplicationService.create_navigation_index(all_class_list, all_class_name_list_grouped_by_namespaces, all_module_class_names, \
+                    hub_classes, logger, saver, link_suffix)
+                checkpoint.complete('full', 'full')
+                slice_progress.advance(kind='full', name='full', bytes_written=counting_output_store.get_written_bytes())
+
+            # Create diagrams filtered out by class name
+            for class_name in class_list:
+                 if checkpoint.skip('class', class_name):
+                     slice_progress.advance(kind='class', name=class_name, bytes_written=counting_output_store.get_written_bytes(), resumed=True)
+                     continue
+                 if hub_classes is not None and hub_classes.is_hub(class_name):
+                     ApplicationService.create_hub_class_diagrams(class_name, hub_classes, diagram_creation.get_data_structure(), from_dir, \
+                        logger, saver, edge_table, fragment_cache, run_options)
+                     checkpoint.complete('class', class_name)
+                     slice_progress.advance(kind='class', name=class_name, bytes_written=counting_output_store.get_written_bytes())
+                     continue
+                 reduced_class_list_datastructure = ApplicationService.create_slice(diagram_creation.get_data_structure(), \
+                    [class_name], hub_class_names, slice_engine, logger)
+                 class_based_diagram_creation: DiagramCreation = \
+                    diagram_creation_type(reduced_class_list_datastructure, saver, logger, edge_table, fragment_cache, run_options.diagram_budget, \
+                        hub_class_names, link_per_module, link_suffix)
+                 class_based_diagram_creation.create_puml_files(from_dir, skip_uses_relation, class_name)
+                 checkpoint.complete('class', class_name)
+                 slice_progress.advance(kind='class', name=class_name, bytes_written=counting_output_store.get_written_bytes())
+
+            # Create diagrams filtered out by namespace
+            for namespace_name, class_name_list in class_name_list_grouped_by_namespaces.items():
+                 if checkpoint.skip('namespace', namespace_name):
+                     slice_progress.advance(kind='namespace', name=namespace_name, bytes_written=counting_output_store.get_written_bytes(), resumed=True)
+                     continue
+                 reduced_namespace_list = ApplicationService.create_slice(diagram_creation.get_data_structure(), \
+                    class_name_list, hub_class_names, slice_engine, logger)
+                 namespace_based_diagram_creation: DiagramCreation = \
+                    diagram_creation_type(reduced_namespace_list, saver, logger, edge_table, fragment_cache, run_options.diagram_budget, \
+                        hub_class_names.difference(class_name_list) if hub_class_names else None, link_per_module, \
+                            link_suffix)
+                 namespace_based_diagram_creation.create_puml_files(from_dir, skip_uses_relation, namespace_name)
+                 checkpoint.complete('namespace', namespace_name)
+                 slice_progress.advance(kind='namespace', name=namespace_name, bytes_written=counting_output_store.get_written_bytes())
+
+            # Create diagrams filtered out by module
+            for module_name, class_name_list in module_class_names.items():
+                 if checkpoint.skip('module', module_name):
+                     slice_progress.advance(kind='module', name=module_name, bytes_written=counting_output_store.get_written_bytes(), resumed=True)
+                     continue
+                 reduced_module_list = ApplicationService.create_slice(diagram_creation.get_data_structure(), \
+                    class_name_list, hub_class_names, slice_engine, logger)
+                 module_based_diagram_creation: DiagramCreation = \
+                    diagram_creation_type(reduced_module_list, saver, logger, edge_table, fragment_cache, run_options.diagram_budget, \
+                        hub_class_names.difference(class_name_list) if hub_class_names else None, link_per_module, \
+                            link_suffix)
+                 module_based_diagram_creation.create_puml_files(from_dir, skip_uses_relation, module_name)
+                 checkpoint.complete('module', module_name)
+                 slice_progress.advance(kind='module', name=module_name, bytes_written=counting_output_store.get_written_bytes())
+
+            # Waits for the queued writes and reports the files that could not be written, a failed close releases the chain itself
+            closing = True
+            output_store.close()
+            completed = True
+        finally:
+            if not closing:
+                # Stops the write-behind workers and removes the bundle being written, the previous one is kept
+                output_store.abort()
+            if isinstance(datastructure, SqliteDatastructure):
+                datastructure.close()
+            # Kept by a failed run with the slices it completed (the model is closed first, it may be stored in the checkpoint)
+            checkpoint.close(completed)
+            if render_pipeline is not None and not completed:
+                render_pipeline.abort()
+            elif render_pipeline is not None:
+                failed_count: int = render_pipeline.close()
+                if failed_count > 0:
+                    logger.log_warn(f'{failed_count} puml files could not be rendered')
+            if spill_dir is not None:
+                shutil.rmtree(spill_dir, ignore_errors=True)
+            if memory_budget is not None:
+                # The released caches belong to this run, they are not kept alive by the budget
+                memory_budget.clear_on_pressure()
+                logger.log_info(f'Memory budget: caches were released {memory_budget.pressure_count} times')
+        event_stream.emit('run_completed', files_written=counting_output_store.get_written_file_count(), \
+            bytes_written=counting_output_store.get_written_bytes())
@@ -0,0 +1,57 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from enum import Enum
+from typing import Tuple, TYPE_CHECKING
+
+from revenger.infrastructure.generic_classes import BundleType
+from revenger.infrastructure.compressor import Compression
+
+if TYPE_CHECKING:
+    # Only the options are needed to parse the command line: the services are imported once it is parsed
+    from revenger.domain.diagram_budget import DiagramBudget
+    from revenger.domain.hub_classes import HubPolicy
+    from revenger.domain.slice_engine import SlicePolicy
+    from revenger.infrastructure.parse_cache import ParseCache
+    from revenger.infrastructure.svg_renderer import PlantUmlRenderer
+
+class SourceType(Enum):
+    PYTHON_SOURCE = 1,
+    YAML_SOURCE = 2
+
+class OutputFormat(Enum):
+    PUML = 'puml'
+    DOT = 'dot'
+
+class DiagramGranularity(Enum):
+    CLASS = 'class'
+    MODULE = 'module'
+
+@dataclass
+class RunOptions:
+    skip_uses_relation: bool = False
+    source_type: SourceType = SourceType.PYTHON_SOURCE
+    bundle_type: BundleType = BundleType.DIRECTORY
+    model_store_file_name: str = None
+    reuse_model_store: bool = False
+    ingest_shard: Tuple[int, int] = None
+    emit_shard: Tuple[int, int] = None
+    merge_shards: bool = False
+    shard_dir: str = None
+    graph_report: bool = False
+    graph_report_top: int = 20
+    graph_report_hops: int = 2
+    write_worker_count: int = 4
+    diagram_budget: DiagramBudget = None
+    hub_policy: HubPolicy = None
+    events_file_name: str = None
+    events_file_descriptor: int = None
+    renderer: PlantUmlRenderer = None
+    render_worker_count: int = 1
+    output_format: OutputFormat = OutputFormat.PUML
+    slice_policy: SlicePolicy = None
+    diagram_granularity: DiagramGranularity = DiagramGranularity.CLASS
+    resume: bool = False
+    memory_budget: int = None
+    compression: Compression = Compression.NONE
+    # Parsed files shared by the runs of a batch worker
+    parse_cache: ParseCache = None
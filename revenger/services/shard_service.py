@@ -0,0 +1,98 @@
+from __future__ import annotations
+from typing import List, Dict, Tuple, Iterator
+import heapq
+import json
+import os
+import re
+import zlib
+
+from revenger.domain.saver import Saver
+from revenger.domain.logger import Logger
+from revenger.domain.datastructure import Datastructure
+from revenger.domain.datastructure import LanguageDependent
+from revenger.domain.sqlite_datastructure import SqliteDatastructure
+from revenger.infrastructure.python_symbol_table import PythonSymbolTable
+
+class ShardService:
+    SYMBOL_TABLE: str = 'symbol_table'
+    SAVER_LINES: str = 'saver_lines'
+
+    @staticmethod
+    def parse_shard(shard: str) -> Tuple[int, int]:
+        match = re.match(r'^(\d+)/(\d+)$', shard)
+        if match is None or int(match.group(1)) >= int(match.group(2)):
+            raise ValueError(f'Shard {shard} is invalid, expected index/count with 0 <= index < count (for instance 0/4)')
+        return int(match.group(1)), int(match.group(2))
+
+    @staticmethod
+    def is_in_shard(name: str, shard: Tuple[int, int]) -> bool:
+        if shard is None:
+            return True
+        shard_index, shard_count = shard
+        return zlib.crc32(name.encode('utf-8')) % shard_count == shard_index
+
+    @staticmethod
+    def get_shard_file_name(shard_dir: str, shard: Tuple[int, int]) -> str:
+        shard_index, shard_count = shard
+        return os.path.join(shard_dir, f'model-shard-{shard_index}-of-{shard_count}.sqlite')
+
+    @staticmethod
+    def get_shard_file_names(shard_dir: str) -> List[str]:
+        shard_counts: Dict[int, List[int]] = {}
+        for file_name in os.listdir(shard_dir):
+            match = re.match(r'^model-shard-(\d+)-of-(\d+)\.sqlite$', file_name)
+            if match is not None:
+                shard_counts.setdefault(int(match.group(2)), []).append(int(match.group(1)))
+        if len(shard_counts) != 1:
+            raise ValueError(f'{shard_dir} must contain the model shards of exactly one run, found shard counts {sorted(shard_counts.keys())}')
+        shard_count, shard_indexes = shard_counts.popitem()
+        missing_shards: List[int] = sorted(set(range(0, shard_count)) - set(shard_indexes))
+        if len(missing_shards) > 0:
+            raise ValueError(f'{shard_dir} misses the model shards {missing_shards} of {shard_count}')
+        return [ShardService.get_shard_file_name(shard_dir, (shard_index, shard_count)) for shard_index in range(0, shard_count)]
+
+    @staticmethod
+    def save_shard_metadata(shard_datastructure: SqliteDatastructure, symbol_table: PythonSymbolTable, \
+            saver_lines: Dict[int, List[str]]) -> None:
+        if symbol_table is not None:
+            shard_datastructure.set_metadata(ShardService.SYMBOL_TABLE, json.dumps(symbol_table.to_dict()))
+        shard_datastructure.set_metadata(ShardService.SAVER_LINES, json.dumps(saver_lines))
+
+    @staticmethod
+    def merge_shards(shard_dir: str, datastructure: Datastructure, language_dependent: LanguageDependent, \
+            saver: Saver, logger: Logger) -> None:
+        shard_datastructures: List[SqliteDatastructure] = []
+        for shard_file_name in ShardService.get_shard_file_names(shard_dir):
+            shard_datastructure = SqliteDatastructure(language_dependent, logger, shard_file_name)
+            if shard_datastructure.get_metadata(SqliteDatastructure.INGEST_COMPLETE) != 'True':
+                raise ValueError(f'Model shard {shard_file_name} is incomplete, run its ingestion again')
+            shard_datastructures.append(shard_datastructure)
+        logger.log_info(f'Merging {len(shard_datastructures)} model shards from {shard_dir}')
+
+        # Classes are appended in the order a single run reads the files so that duplicates are resolved identically
+        sub_datastructures: Iterator[Tuple[int, int, Datastructure.SubDataStructure]] = heapq.merge(\
+            *[shard_datastructure.get_sub_datastructures_in_file_order() for shard_datastructure in shard_datastructures], \
+                key=lambda row: (row[0], row[1]))
+        for file_order, _, sub_datastructure in sub_datastructures:
+            datastructure.set_file_order(file_order)
+            datastructure.append_sub_datastructure(sub_datastructure)
+        datastructure.flush()
+
+        saver_lines: Dict[int, List[str]] = {}
+        symbol_table: PythonSymbolTable = None
+        for shard_datastructure in shard_datastructures:
+            saver_lines.update({int(file_order): lines for file_order, lines in \
+                json.loads(shard_datastructure.get_metadata(ShardService.SAVER_LINES)).items()})
+            symbol_table_json: str = shard_datastructure.get_metadata(ShardService.SYMBOL_TABLE)
+            if symbol_table_json is not None:
+                if symbol_table is None:
+                    symbol_table = PythonSymbolTable(datastructure.get_skip_types())
+                symbol_table.merge_dict(json.loads(symbol_table_json))
+            shard_datastructure.close()
+        for file_order in sorted(saver_lines.keys()):
+            for line in saver_lines[file_order]:
+                saver.append(line)
+        if symbol_table is not None:
+            type_mapping: Dict[str, str] = symbol_table.get_re_exported_types()
+            if len(type_mapping) > 0:
+                datastructure.replace_types(type_mapping)
@@ -1,13 +0,0 @@
-#!/usr/bin/env python
-
-from distutils.core import setup
-
-setup(name='Py2PlantUML',
-      version='0.1',
-      description='Python Distribution Utilities',
-      author='Jean-Philippe Ulpiano',
-      contributor='Sarfraz Siddiqui',
-      author_email='jpulpiano3@gmail.com',
-      url='https://github.com/2BlackCoffees',
-      python_requires=">=3.10",
-     )
\ No newline at end of file
@@ -0,0 +1,97 @@
+from typing import Callable, Dict, List
+import os
+
+import pytest
+
+from revenger.cli import main
+
+# A small code base with inheritance, uses relations, packages, re-exports and members that cannot be imported
+SAMPLE_SOURCES: Dict[str, str] = {
+    'shapes/__init__.py': 'from shapes.square import Square\n',
+    'shapes/shape.py': '''from abc import ABC
+
+class Shape(ABC):
+    def __init__(self, name: str):
+        self.name: 'str' = name
+        self.sides: int = 0
+
+    def area(self) -> float:
+        return 0.0
+''',
+    'shapes/square.py': '''from shapes.shape import Shape
+
+class Square(Shape):
+    def __init__(self, side: int):
+        super().__init__('square')
+        self.side: int = side
+
+    def area(self) -> float:
+        result: float | None = self.side * self.side
+        return result
+''',
+    'shapes/circle.py': '''from shapes.shape import Shape
+
+class Circle(Shape):
+    class Center:
+        x: int
+        y: int
+
+    def __init__(self, radius: int):
+        super().__init__('circle')
+        self.center: Circle.Center = Circle.Center()
+''',
+    'drawing/canvas.py': '''from shapes import Square
+from shapes.circle import Circle
+from shapes.shape import Shape
+from drawing.pen import Pen
+
+class Canvas:
+    def __init__(self):
+        self.pen: Pen = Pen()
+        self.square: Square = Square(1)
+
+    def draw(self, shape: Shape, circle: Circle) -> None:
+        pass
+''',
+    'drawing/pen.py': '''class Pen:
+    def __init__(self):
+        self.width: int = 1
+
+class Ink:
+    def fill(self, pen: Pen) -> None:
+        pass
+''',
+}
+
+def write_sources(source_dir: str, sources: Dict[str, str]) -> str:
+    for file_name, content in sources.items():
+        os.makedirs(os.path.dirname(os.path.join(source_dir, file_name)), exist_ok=True)
+        with open(os.path.join(source_dir, file_name), 'w') as file:
+            file.write(content)
+    return source_dir
+
+def read_outputs(out_dir: str) -> Dict[str, bytes]:
+    # Diagrams and pages of an output directory, without the model stores and checkpoints
+    outputs: Dict[str, bytes] = {}
+    for directory, directory_names, file_names in os.walk(out_dir):
+        directory_names[:] = [directory_name for directory_name in directory_names if not directory_name.startswith('.')]
+        for file_name in file_names:
+            if not file_name.endswith(('.sqlite', '.sqlite-wal', '.sqlite-shm')):
+                with open(os.path.join(directory, file_name), 'rb') as file:
+                    outputs[os.path.relpath(os.path.join(directory, file_name), out_dir)] = file.read()
+    return outputs
+
+@pytest.fixture
+def source_dir(tmp_path) -> str:
+    return write_sources(str(tmp_path / 'sources'), SAMPLE_SOURCES)
+
+@pytest.fixture
+def run_revenger(tmp_path) -> Callable[..., str]:
+    # Runs the CLI on from_dir into a new output directory named out_name and returns the output directory
+    def run(from_dir: str, out_name: str, *options: str) -> str:
+        out_dir: str = str(tmp_path / out_name)
+        os.makedirs(out_dir, exist_ok=True)
+        argv: List[str] = ['--from_dir', from_dir, '--out_dir', out_dir, '--write_workers', '0'] + list(options)
+        main(argv=argv)
+        return out_dir
+    return run
@@ -0,0 +1,44 @@
+from typing import List
+import json
+import os
+
+from conftest import read_outputs, write_sources
+from revenger.batch_tool import Project, ProjectResult, read_manifest, run_projects
+from revenger.domain.logger import Logger
+
+def write_stale_file(out_dir: str) -> str:
+    stale_file_name: str = os.path.join(out_dir, 'sub', 'removed.Class-diagram-detailed.puml')
+    os.makedirs(os.path.dirname(stale_file_name))
+    with open(stale_file_name, 'w') as file:
+        file.write('@startuml\n@enduml\n')
+    return stale_file_name
+
+def test_manifest_directories_are_relative_to_the_manifest(tmp_path):
+    manifest_file_name: str = str(tmp_path / 'manifest.jsonl')
+    with open(manifest_file_name, 'w') as file:
+        file.write('# projects\n\n' + json.dumps({'from_dir': 'sources', 'out_dir': 'out', 'options': ['--skip_uses_relation']}) + '\n')
+    assert read_manifest(manifest_file_name) == [Project(str(tmp_path / 'sources'), str(tmp_path / 'out'), ['--skip_uses_relation'])]
+
+def test_batch_creates_the_diagrams_of_a_single_run(source_dir, run_revenger, tmp_path):
+    expected = read_outputs(run_revenger(source_dir, 'single'))
+    skip_expected = read_outputs(run_revenger(source_dir, 'single_skip', '--skip_uses_relation'))
+    other_dir: str = write_sources(str(tmp_path / 'other'), {'other/model.py': 'class Model:\n    pass\n'})
+    projects: List[Project] = [Project(source_dir, str(tmp_path / 'batch'), ['--write_workers', '0']), \
+        Project(source_dir, str(tmp_path / 'batch_skip'), ['--skip_uses_relation']), \
+        Project(other_dir, str(tmp_path / 'batch_other'), [])]
+    results: List[ProjectResult] = run_projects(projects, 2, 1024 * 1024, None, Logger())
+    assert [result.exit_code for result in results] == [0, 0, 0]
+    assert read_outputs(str(tmp_path / 'batch')) == expected
+    assert read_outputs(str(tmp_path / 'batch_skip')) == skip_expected
+    assert 'other.model.Model-diagram-detailed.puml' in read_outputs(str(tmp_path / 'batch_other'))
+
+def test_output_directories_are_cleaned_unless_resumed(source_dir, tmp_path):
+    projects: List[Project] = [Project(source_dir, str(tmp_path / 'cleaned'), []), \
+        Project(source_dir, str(tmp_path / 'resumed'), ['--resume'])]
+    stale_file_names: List[str] = [write_stale_file(project.out_dir) for project in projects]
+    results: List[ProjectResult] = run_projects(projects, 1, 0, None, Logger())
+    assert [result.exit_code for result in results] == [0, 0]
+    assert not os.path.exists(stale_file_names[0])
+    # Directories are kept, like revenger.sh does
+    assert os.path.isdir(os.path.dirname(stale_file_names[0]))
+    assert os.path.exists(stale_file_names[1])
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from conftest import read_outputs
+from revenger.domain.diagram_creation import DiagramCreation
+from revenger.infrastructure.checkpoint import Checkpoint
+
+class Interrupted(Exception):
+    pass
+
+def interrupt_run(run_revenger, monkeypatch, source_dir: str, out_name: str, call_index: int, *options: str) -> str:
+    # Stops the run at its call_index-th diagram creation as if it was killed, and returns its output directory
+    create_puml_files = DiagramCreation.create_puml_files
+    call_count: list = [0]
+    def create_puml_files_until_interrupted(self, *args, **kwargs):
+        call_count[0] += 1
+        if call_count[0] == call_index:
+            raise Interrupted()
+        create_puml_files(self, *args, **kwargs)
+    monkeypatch.setattr(DiagramCreation, 'create_puml_files', create_puml_files_until_interrupted)
+    with pytest.raises(Interrupted):
+        run_revenger(source_dir, out_name, '--resume', *options)
+    monkeypatch.undo()
+    return os.path.join(os.path.dirname(source_dir), out_name)
+
+@pytest.mark.parametrize('options', [[], ['--skip_uses_relation'], ['--granularity', 'module']])
+def test_resumed_run_writes_the_diagrams_of_an_uninterrupted_run(source_dir, run_revenger, monkeypatch, options):
+    fresh_outputs = read_outputs(run_revenger(source_dir, 'fresh', *options))
+    out_dir: str = interrupt_run(run_revenger, monkeypatch, source_dir, 'resumed', 4, *options)
+    assert os.path.isfile(Checkpoint.get_model_file_name(out_dir))
+    run_revenger(source_dir, 'resumed', '--resume', *options)
+    assert read_outputs(out_dir) == fresh_outputs
+    # A completed run removes its checkpoint
+    assert not os.path.isdir(Checkpoint.get_directory(out_dir))
+
+def test_failed_run_closes_and_keeps_its_checkpoint(source_dir, run_revenger, monkeypatch):
+    close = Checkpoint.close
+    closed: list = []
+    def close_recorded(self, completed: bool) -> None:
+        closed.append(completed)
+        close(self, completed)
+    monkeypatch.setattr(Checkpoint, 'close', close_recorded)
+    out_dir: str = interrupt_run(run_revenger, monkeypatch, source_dir, 'resumed', 4)
+    assert closed == [False]
+    assert os.path.isfile(os.path.join(Checkpoint.get_directory(out_dir), Checkpoint.JOURNAL_FILE_NAME))
+
+def test_resumed_run_creates_modified_diagrams_again(source_dir, run_revenger, monkeypatch):
+    fresh_outputs = read_outputs(run_revenger(source_dir, 'fresh'))
+    out_dir: str = interrupt_run(run_revenger, monkeypatch, source_dir, 'resumed', 6)
+    with open(os.path.join(out_dir, 'full-diagram-detailed.puml'), 'w') as file:
+        file.write('modified')
+    run_revenger(source_dir, 'resumed', '--resume')
+    assert read_outputs(out_dir) == fresh_outputs
+
+def test_checkpoint_of_other_options_is_discarded(source_dir, run_revenger, monkeypatch):
+    fresh_outputs = read_outputs(run_revenger(source_dir, 'fresh', '--skip_uses_relation'))
+    out_dir: str = interrupt_run(run_revenger, monkeypatch, source_dir, 'resumed', 4)
+    run_revenger(source_dir, 'resumed', '--resume', '--skip_uses_relation')
+    # Diagrams of the interrupted run are overwritten, none of them is specific to the uses relations
+    assert read_outputs(out_dir) == fresh_outputs
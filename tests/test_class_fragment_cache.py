@@ -0,0 +1,33 @@
+from typing import List, Tuple
+
+from revenger.domain.class_fragment_cache import ClassFragmentCache
+from revenger.domain.datastructure import Datastructure
+from revenger.domain.logger import Logger
+from test_python_adapter import read_sources
+
+def test_fragments_are_created_once_per_variant(source_dir):
+    datastructure: Datastructure = read_sources(source_dir)
+    pen: Datastructure.SubDataStructure = datastructure.get_datastructures_from_class_name('drawing.pen.Pen')
+    fragment_cache: ClassFragmentCache = ClassFragmentCache(Logger())
+    links: List[str] = []
+    def get_class_link() -> str:
+        links.append('pen.svg')
+        return 'pen.svg'
+    fragment: Tuple[str, List[str]] = fragment_cache.get_fragment(pen, True, False, '  ', get_class_link)
+    assert fragment == ('  class drawing.pen.Pen [[pen.svg]] ', ['    - self.width: int', '    - __init__()', '  }'])
+    assert fragment_cache.get_fragment(pen, True, False, '  ', get_class_link) is fragment
+    assert fragment_cache.get_fragment(pen, False, False, '  ', get_class_link) == ('  class drawing.pen.Pen [[pen.svg]] ', ['  }'])
+    assert len(links) == 2
+
+def test_least_recently_used_fragments_are_evicted(source_dir):
+    datastructure: Datastructure = read_sources(source_dir)
+    pen, ink, canvas = [datastructure.get_datastructures_from_class_name(class_name) \
+        for class_name in ['drawing.pen.Pen', 'drawing.pen.Ink', 'drawing.canvas.Canvas']]
+    fragment_cache: ClassFragmentCache = ClassFragmentCache(Logger(), 2)
+    fragments: List[Tuple[str, List[str]]] = [fragment_cache.get_fragment(sub_datastructure, True, False, '', lambda: 'link.svg') \
+        for sub_datastructure in [pen, ink]]
+    assert fragment_cache.get_fragment(pen, True, False, '', lambda: 'link.svg') is fragments[0]
+    fragment_cache.get_fragment(canvas, True, False, '', lambda: 'link.svg')
+    # Ink was the least recently used fragment
+    assert fragment_cache.get_fragment(pen, True, False, '', lambda: 'link.svg') is fragments[0]
+    assert fragment_cache.get_fragment(ink, True, False, '', lambda: 'link.svg') is not fragments[1]
@@ -0,0 +1,31 @@
+from typing import Dict
+import gzip
+import json
+
+from conftest import read_outputs, write_sources
+from revenger.domain.navigation_index import NavigationIndex
+
+def test_svgz_links_do_not_leak_into_the_next_run(source_dir, run_revenger):
+    expected: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'plain'))
+    compressed: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'svgz', '--compress', 'svgz'))
+    assert b'-diagram-detailed.svgz]]' in compressed['full-diagram-detailed.puml']
+    assert ['detailed', '-diagram-detailed.svgz'] in json.loads(compressed['index.json'])['variants']
+    assert ('detailed', '-diagram-detailed.svg') in NavigationIndex.get_variants()
+    # Same process, as in the workers of the batch tool
+    assert read_outputs(run_revenger(source_dir, 'plain_again')) == expected
+    assert b'.svgz' not in expected['full-diagram-detailed.puml']
+
+def test_sidecars_hold_the_compressed_diagrams(source_dir, run_revenger):
+    expected: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'plain'))
+    outputs: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'sidecar', '--compress', 'sidecar'))
+    assert {name: content for name, content in outputs.items() if not name.endswith('.gz')} == expected
+    for name, content in expected.items():
+        assert gzip.decompress(outputs[name + '.gz']) == content
+
+def test_sheets_link_the_compressed_diagrams(run_revenger, tmp_path):
+    source_dir: str = write_sources(str(tmp_path / 'sources'), {f'{package}/model.py': 'class First:\n    pass\n\nclass Second:\n    pass\n' \
+        for package in ['first', 'second', 'third']})
+    outputs: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'svgz', '--compress', 'svgz', '--max_diagram_classes', '2'))
+    sheet: bytes = outputs['full-diagram-detailed-grouped-per-namespace-sheet-1.puml']
+    assert b'namespace first [[first-diagram-detailed-grouped-per-namespace.svgz]]' in sheet
+    assert b'.svg]]' not in sheet
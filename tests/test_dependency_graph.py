@@ -0,0 +1,64 @@
+from typing import Dict, List
+
+import pytest
+
+from conftest import read_outputs
+from revenger.domain import dependency_graph
+from revenger.domain.common import Common
+from revenger.domain.dependency_graph import DependencyGraph
+from revenger.domain.logger import Logger
+from test_python_adapter import read_sources
+
+USES: int = Common.ConnectionType.USES.value
+IS_BASE: int = Common.ConnectionType.IS_BASE.value
+
+def create_graph() -> DependencyGraph:
+    # a -> b -> c -> a is a cycle, d depends on a, e depends on itself
+    edges: List[tuple] = [(0, 1, USES), (1, 2, USES), (2, 0, IS_BASE), (3, 0, IS_BASE), (4, 4, USES)]
+    return DependencyGraph(['a', 'b', 'c', 'd', 'e'], [edge[0] for edge in edges], [edge[1] for edge in edges], \
+        [edge[2] for edge in edges], Logger())
+
+def test_graph_edges_are_stored_per_class():
+    graph: DependencyGraph = create_graph()
+    assert (graph.get_class_count(), graph.get_edge_count()) == (5, 5)
+    assert graph.get_successors(graph.get_class_id('a')) == [(1, Common.ConnectionType.USES)]
+    assert graph.get_predecessors(graph.get_class_id('a')) == [(2, Common.ConnectionType.IS_BASE), (3, Common.ConnectionType.IS_BASE)]
+    assert graph.get_fan_in() == [2, 1, 1, 0, 1]
+    assert graph.get_fan_out() == [1, 1, 1, 1, 1]
+    assert graph.rank_by_fan_in(2) == [(0, 2), (1, 1)]
+
+def test_graph_cycles_and_neighbourhoods():
+    graph: DependencyGraph = create_graph()
+    assert graph.get_cycles() == [[0, 1, 2], [4]]
+    assert graph.get_neighbourhood(graph.get_class_id('d'), 2) == {3: 0, 0: 1, 1: 2, 2: 2}
+    assert graph.get_neighbourhood(graph.get_class_id('d'), 2, incoming=False) == {3: 0, 0: 1, 1: 2}
+
+def test_numpy_storage_gives_the_graph_of_the_array_storage(source_dir, monkeypatch):
+    pytest.importorskip('numpy')
+    numpy_graph: DependencyGraph = DependencyGraph.from_datastructure(read_sources(source_dir), False, Logger())
+    assert dependency_graph.numpy is not None
+    monkeypatch.setattr(dependency_graph, 'numpy', None)
+    array_graph: DependencyGraph = DependencyGraph.from_datastructure(read_sources(source_dir), False, Logger())
+    assert numpy_graph.get_fan_in() == array_graph.get_fan_in()
+    assert numpy_graph.get_fan_out() == array_graph.get_fan_out()
+    assert numpy_graph.get_edge_count_per_type() == array_graph.get_edge_count_per_type()
+    for class_id in range(0, array_graph.get_class_count()):
+        assert numpy_graph.get_successors(class_id) == array_graph.get_successors(class_id)
+        assert numpy_graph.get_predecessors(class_id) == array_graph.get_predecessors(class_id)
+    assert numpy_graph.create_report(5, 2) == array_graph.create_report(5, 2)
+
+def test_graph_edges_are_the_relations_of_the_diagrams(source_dir):
+    graph: DependencyGraph = DependencyGraph.from_datastructure(read_sources(source_dir), False, Logger())
+    canvas_id: int = graph.get_class_id('drawing.canvas.Canvas')
+    assert {(graph.get_class_name(target_id), connection_type) for target_id, connection_type in graph.get_successors(canvas_id)} == \
+        {('drawing.pen.Pen', Common.ConnectionType.IS_MEMBER), ('shapes.square.Square', Common.ConnectionType.IS_MEMBER), \
+            ('shapes.shape.Shape', Common.ConnectionType.USES), ('shapes.circle.Circle', Common.ConnectionType.USES)}
+    skip_graph: DependencyGraph = DependencyGraph.from_datastructure(read_sources(source_dir), True, Logger())
+    assert skip_graph.get_edge_count() == graph.get_edge_count() - graph.get_edge_count_per_type()[Common.ConnectionType.USES]
+
+def test_graph_report_is_written_with_the_diagrams(source_dir, run_revenger):
+    expected: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'plain'))
+    outputs: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'report', '--graph_report', '--graph_report_top', '1'))
+    report: str = outputs.pop('dependency-graph-report.txt').decode('utf-8')
+    assert outputs == expected
+    assert 'Top 1 classes by fan-in (number of classes depending on them):\n       3 shapes.shape.Shape\n' in report
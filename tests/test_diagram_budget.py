@@ -0,0 +1,52 @@
+from typing import Dict, List, Set
+import re
+
+from conftest import read_outputs, write_sources
+
+# Three top level packages of two classes each
+PACKAGE_SOURCES: Dict[str, str] = {f'{package}/model.py': f'''class First:
+    def __init__(self):
+        self.count: int = 0
+
+class Second:
+    def __init__(self):
+        self.first: First = First()
+''' for package in ['first', 'second', 'third']}
+
+def get_classes(puml: bytes) -> Set[str]:
+    return set(re.findall(r'^ *class (\S+) ', puml.decode('utf-8'), re.MULTILINE))
+
+def test_diagrams_within_the_budget_are_unchanged(source_dir, run_revenger):
+    expected: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'unlimited'))
+    assert read_outputs(run_revenger(source_dir, 'limited', '--max_diagram_classes', '100', '--max_diagram_relations', '100', \
+        '--max_diagram_members', '100')) == expected
+
+def test_detailed_diagrams_over_the_member_budget_are_simplified(run_revenger, tmp_path):
+    outputs: Dict[str, bytes] = read_outputs(run_revenger(write_sources(str(tmp_path / 'sources'), PACKAGE_SOURCES), 'members', \
+        '--max_diagram_members', '4'))
+    full: str = outputs['full-diagram-detailed.puml'].decode('utf-8')
+    assert 'members are not shown.' in full
+    assert get_classes(outputs['full-diagram-detailed.puml']) == get_classes(outputs['full-diagram-simplified.puml'])
+    assert 'self.count: int' not in full
+    # The diagram of a class and its related class is within the budget
+    assert 'self.count: int' in outputs['first.model.First-diagram-detailed.puml'].decode('utf-8')
+
+def test_diagrams_over_the_class_budget_show_their_namespaces(run_revenger, tmp_path):
+    outputs: Dict[str, bytes] = read_outputs(run_revenger(write_sources(str(tmp_path / 'sources'), PACKAGE_SOURCES), 'overview', \
+        '--max_diagram_classes', '3'))
+    full: str = outputs['full-diagram-detailed.puml'].decode('utf-8')
+    # The deepest namespace level fitting the budget is shown
+    assert 'classes are grouped per namespace (level 2)' in full
+    assert 'package "first.model (2 classes)" as namespace_0 [[first.model-diagram-detailed.svg]]' in full
+    assert get_classes(outputs['full-diagram-detailed.puml']) == set()
+
+def test_diagrams_over_the_namespace_budget_are_split_in_sheets(run_revenger, tmp_path):
+    outputs: Dict[str, bytes] = read_outputs(run_revenger(write_sources(str(tmp_path / 'sources'), PACKAGE_SOURCES), 'sheets', \
+        '--max_diagram_classes', '2'))
+    full: str = outputs['full-diagram-detailed.puml'].decode('utf-8')
+    assert 'classes are shown on 3 sheets' in full
+    sheets: List[bytes] = [outputs[f'full-diagram-detailed-sheet-{index}.puml'] for index in range(1, 4)]
+    assert [len(get_classes(sheet)) for sheet in sheets] == [2, 2, 2]
+    assert set().union(*[get_classes(sheet) for sheet in sheets]) == \
+        {f'{package}.model.{class_name}' for package in ['first', 'second', 'third'] for class_name in ['First', 'Second']}
+    assert b'[[full-diagram-detailed-sheet-2.svg]]' in sheets[0]
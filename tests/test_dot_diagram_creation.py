@@ -0,0 +1,26 @@
+from typing import Dict, Set, Tuple
+import re
+
+from conftest import read_outputs
+
+def get_links(content: bytes) -> Set[str]:
+    return set(re.findall(r'[\w.\-]+\.svg', content.decode('utf-8')))
+
+def test_dot_diagrams_have_the_file_names_and_links_of_the_puml_diagrams(source_dir, run_revenger):
+    pumls: Dict[str, bytes] = {name: content for name, content in read_outputs(run_revenger(source_dir, 'puml')).items() \
+        if name.endswith('.puml')}
+    dots: Dict[str, bytes] = {name: content for name, content in read_outputs(run_revenger(source_dir, 'dot', '--output_format', 'dot')).items() \
+        if name.endswith('.dot')}
+    assert {re.sub('\\.puml$', '.dot', name) for name in pumls} == set(dots)
+    for name, content in pumls.items():
+        dot: bytes = dots[re.sub('\\.puml$', '.dot', name)]
+        assert dot.startswith(b'digraph ')
+        assert get_links(dot) == get_links(content), name
+
+def test_dot_diagrams_draw_the_relations_of_the_puml_diagrams(source_dir, run_revenger):
+    puml: str = read_outputs(run_revenger(source_dir, 'puml'))['drawing.canvas.Canvas-diagram-detailed.puml'].decode('utf-8')
+    dot: str = read_outputs(run_revenger(source_dir, 'dot', '--output_format', 'dot'))['drawing.canvas.Canvas-diagram-detailed.dot'].decode('utf-8')
+    puml_relations: Set[Tuple[str, str]] = {tuple(sorted(relation)) for relation in re.findall(r'^(\S+) (?:<\|--|\*--|-->) (\S+)', puml, re.MULTILINE)}
+    dot_relations: Set[Tuple[str, str]] = {tuple(sorted(relation)) for relation in re.findall(r'^  "(\S+)" -> "(\S+)"', dot, re.MULTILINE)}
+    assert len(puml_relations) > 0
+    assert dot_relations == puml_relations
@@ -0,0 +1,34 @@
+from typing import List, Set, Tuple
+
+from revenger.domain.common import Common
+from revenger.domain.datastructure import Datastructure
+from revenger.domain.edge_table import EdgeTable
+from revenger.domain.logger import Logger
+from test_python_adapter import read_sources
+
+def get_relations(edge_table: EdgeTable, datastructure: Datastructure, class_name: str) -> Set[Tuple[str, Common.ConnectionType]]:
+    return {(target_class_name, connection_type) \
+        for target_class_name, _, connection_type, _ in edge_table.get_edges(datastructure.get_datastructures_from_class_name(class_name))}
+
+def test_edges_are_the_relations_of_the_class(source_dir):
+    datastructure: Datastructure = read_sources(source_dir)
+    edge_table: EdgeTable = EdgeTable(datastructure.get_skip_types(), False, Logger())
+    assert get_relations(edge_table, datastructure, 'drawing.canvas.Canvas') == \
+        {('drawing.pen.Pen', Common.ConnectionType.IS_MEMBER), ('shapes.square.Square', Common.ConnectionType.IS_MEMBER), \
+            ('shapes.shape.Shape', Common.ConnectionType.USES), ('shapes.circle.Circle', Common.ConnectionType.USES)}
+    assert get_relations(edge_table, datastructure, 'shapes.circle.Circle') == \
+        {('shapes.shape.Shape', Common.ConnectionType.IS_BASE), ('shapes.circle.Circle.Center', Common.ConnectionType.IS_INNER_CLASS)}
+    skip_edge_table: EdgeTable = EdgeTable(datastructure.get_skip_types(), True, Logger())
+    assert get_relations(skip_edge_table, datastructure, 'drawing.canvas.Canvas') == \
+        {('drawing.pen.Pen', Common.ConnectionType.IS_MEMBER), ('shapes.square.Square', Common.ConnectionType.IS_MEMBER)}
+
+def test_edges_are_computed_once_per_class(source_dir):
+    datastructure: Datastructure = read_sources(source_dir)
+    edge_table: EdgeTable = EdgeTable(datastructure.get_skip_types(), False, Logger())
+    canvas: Datastructure.SubDataStructure = datastructure.get_datastructures_from_class_name('drawing.canvas.Canvas')
+    edges: List[Tuple[str, str, Common.ConnectionType, str]] = edge_table.get_edges(canvas)
+    assert edge_table.get_edges(canvas) is edges
+    # Released edges are computed again
+    edge_table.clear()
+    assert edge_table.get_edges(canvas) is not edges
+    assert edge_table.get_edges(canvas) == edges
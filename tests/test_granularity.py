@@ -0,0 +1,23 @@
+from typing import Dict, Set
+import re
+
+from conftest import read_outputs
+
+def get_class_links(puml: bytes) -> Dict[str, str]:
+    return dict(re.findall(r'^ *(?:abstract )?class (\S+) \[\[(\S+)\]\]', puml.decode('utf-8'), re.MULTILINE))
+
+def test_module_diagrams_replace_the_class_diagrams(source_dir, run_revenger):
+    outputs: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'module', '--granularity', 'module'))
+    diagram_names: Set[str] = {name[0: -len('-diagram-detailed.puml')] for name in outputs if name.endswith('-diagram-detailed.puml')}
+    assert diagram_names == {'full', 'drawing', 'drawing.canvas', 'drawing.pen', 'shapes', 'shapes.circle', 'shapes.shape', 'shapes.square'}
+    # The classes of the module and their related classes, each linked to the diagram of its module
+    assert get_class_links(outputs['drawing.pen-diagram-detailed.puml']) == {'drawing.canvas.Canvas': 'drawing.canvas-diagram-detailed.svg', \
+        'drawing.pen.Pen': 'drawing.pen-diagram-detailed.svg', 'drawing.pen.Ink': 'drawing.pen-diagram-detailed.svg'}
+    assert b'drawing.pen.Ink [[drawing.pen-diagram-detailed.svg]] #yellow' in outputs['drawing.pen-diagram-detailed.puml']
+    assert set(get_class_links(outputs['full-diagram-simplified.puml']).values()) == \
+        {f'{module}-diagram-simplified.svg' for module in diagram_names - {'full', 'drawing', 'shapes'}}
+
+def test_module_diagrams_of_a_model_store_run(source_dir, run_revenger, tmp_path):
+    expected: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'module', '--granularity', 'module'))
+    assert read_outputs(run_revenger(source_dir, 'module_store', '--granularity', 'module', \
+        '--model_store', str(tmp_path / 'model.sqlite'))) == expected
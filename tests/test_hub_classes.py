@@ -0,0 +1,43 @@
+from typing import Dict, List, Set
+import re
+
+from conftest import read_outputs, write_sources
+
+REFERRER_NAMES: List[str] = ['Parser', 'Printer', 'Reader', 'Sorter', 'Writer']
+
+# A logger referenced by five classes
+HUB_SOURCES: Dict[str, str] = {'app/logger.py': 'class Logger:\n    pass\n', **{f'app/{name.lower()}.py': f'''from app.logger import Logger
+
+class {name}:
+    def __init__(self, logger: Logger):
+        self.logger: Logger = logger
+''' for name in REFERRER_NAMES}}
+
+def get_classes(puml: bytes) -> Set[str]:
+    return set(re.findall(r'^ *class (\S+) ', puml.decode('utf-8'), re.MULTILINE))
+
+def test_hub_classes_are_summarized_in_the_diagrams_of_other_classes(run_revenger, tmp_path):
+    outputs: Dict[str, bytes] = read_outputs(run_revenger(write_sources(str(tmp_path / 'sources'), HUB_SOURCES), 'hubs', \
+        '--hub_min_fan_in', '3'))
+    reader: bytes = outputs['app.reader.Reader-diagram-detailed.puml']
+    assert get_classes(reader) == {'app.reader.Reader'}
+    assert b'* app.logger.Logger (used by 1 classes):\\n   [[app.logger.Logger-diagram-simplified.svg]]' in reader
+    assert b'app.reader.Reader *-- app.logger.Logger' not in reader
+
+def test_classes_referencing_a_hub_class_are_paged(run_revenger, tmp_path):
+    outputs: Dict[str, bytes] = read_outputs(run_revenger(write_sources(str(tmp_path / 'sources'), HUB_SOURCES), 'pages', \
+        '--hub_min_fan_in', '3', '--hub_referrers_per_page', '2'))
+    page_names: List[str] = ['app.logger.Logger', 'app.logger.Logger-page-2', 'app.logger.Logger-page-3']
+    pages: List[bytes] = [outputs[f'{page_name}-diagram-detailed.puml'] for page_name in page_names]
+    assert [get_classes(page) - {'app.logger.Logger'} for page in pages] == \
+        [{f'app.{name.lower()}.{name}' for name in names} for names in [REFERRER_NAMES[0: 2], REFERRER_NAMES[2: 4], REFERRER_NAMES[4:]]]
+    assert b'Page 2/3\\n* Previous page: [[app.logger.Logger-diagram-detailed.svg]]\\n' + \
+        b'* Next page: [[app.logger.Logger-page-3-diagram-detailed.svg]]' in pages[1]
+    assert 'app.logger.Logger-page-4-diagram-detailed.puml' not in outputs
+
+def test_listed_hub_classes_are_detected_hub_classes(run_revenger, tmp_path):
+    source_dir: str = write_sources(str(tmp_path / 'sources'), HUB_SOURCES)
+    expected: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'detected', '--hub_min_fan_in', '5'))
+    # Classes that are not part of the model are ignored
+    assert read_outputs(run_revenger(source_dir, 'listed', '--hub_classes', 'app.logger.Logger, app.missing.Missing')) == expected
+    assert read_outputs(run_revenger(source_dir, 'not_reached', '--hub_min_fan_in', '6')) == read_outputs(run_revenger(source_dir, 'none'))
@@ -0,0 +1,42 @@
+from typing import List, Tuple
+
+from conftest import read_outputs
+from revenger.domain.datastructure import Datastructure
+from revenger.domain.logger import Logger
+from test_python_adapter import read_sources
+
+def test_model_store_writes_the_diagrams_of_a_memory_run(source_dir, run_revenger, tmp_path):
+    memory_outputs = read_outputs(run_revenger(source_dir, 'memory'))
+    store_outputs = read_outputs(run_revenger(source_dir, 'store', '--model_store', str(tmp_path / 'model.sqlite')))
+    assert store_outputs == memory_outputs
+
+def test_reused_model_store_writes_the_diagrams_of_the_run_creating_it(source_dir, run_revenger, tmp_path):
+    model_store: str = str(tmp_path / 'model.sqlite')
+    fresh_outputs = read_outputs(run_revenger(source_dir, 'fresh', '--model_store', model_store))
+    assert any(b"'WARNING: Will not import member" in content for content in fresh_outputs.values())
+    reused_outputs = read_outputs(run_revenger(source_dir, 'reused', '--model_store', model_store, '--reuse_model_store'))
+    assert reused_outputs == fresh_outputs
+
+def test_model_store_created_with_another_option_is_read_again(source_dir, run_revenger, tmp_path):
+    model_store: str = str(tmp_path / 'model.sqlite')
+    run_revenger(source_dir, 'uses', '--model_store', model_store)
+    fresh_outputs = read_outputs(run_revenger(source_dir, 'fresh', '--skip_uses_relation'))
+    reused_outputs = read_outputs(run_revenger(source_dir, 'reused', '--model_store', model_store, '--reuse_model_store', '--skip_uses_relation'))
+    assert reused_outputs == fresh_outputs
+
+def test_members_are_loaded_when_a_diagram_shows_them(source_dir):
+    canvas: Datastructure.SubDataStructure = read_sources(source_dir).get_datastructures_from_class_name('drawing.canvas.Canvas')
+    loaded_count: List[int] = [0]
+    def load_members() -> Tuple[List[Datastructure.Static], List[Datastructure.Variable], List[Datastructure.Method], List[str]]:
+        loaded_count[0] += 1
+        return canvas.get_static_fields(), canvas.get_variable_fields(), canvas.get_method_fields(), canvas.get_unsupported_members()
+    lazy_canvas: Datastructure.SubDataStructure = Datastructure.SubDataStructure(canvas.filename, canvas.filemodule, {}, \
+        canvas.get_fqdn_class_name(), [], Logger())
+    lazy_canvas.set_member_loader(canvas.get_member_types(), load_members)
+    # Relations and slices only need the member types
+    assert lazy_canvas.get_member_types() == canvas.get_member_types()
+    assert loaded_count[0] == 0
+    assert [variable.variable_name for variable in lazy_canvas.get_variable_fields()] == ['self.pen', 'self.square']
+    assert lazy_canvas.get_method_fields() == canvas.get_method_fields()
+    assert lazy_canvas.get_member_types() == canvas.get_member_types()
+    assert loaded_count[0] == 1
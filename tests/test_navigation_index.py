@@ -0,0 +1,22 @@
+from typing import Dict, List
+import json
+
+import pytest
+
+from conftest import read_outputs
+
+@pytest.mark.parametrize('options, pen_entry', [([], ['drawing.pen.Pen', 'c']), \
+    (['--granularity', 'module'], ['drawing.pen.Pen', 'c', 'drawing.pen']), (['--hub_min_fan_in', '2'], ['drawing.pen.Pen', 'h'])])
+def test_index_entries_link_to_existing_diagrams(source_dir, run_revenger, options, pen_entry):
+    outputs: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'index', *options))
+    index: dict = json.loads(outputs['index.json'])
+    assert outputs['index.js'].decode('utf-8').strip() == f'window.REVENGER_INDEX = {outputs["index.json"].decode("utf-8").strip()};'
+    assert [name for name, _ in index['variants']] == ['detailed', 'detailed per namespace', 'simplified', 'simplified per namespace']
+    for entry in [['full', 'n']] + index['entries']:
+        # Names without diagram of their own link to the diagram showing them
+        diagram_name: str = entry[2] if len(entry) > 2 else entry[0]
+        for _, suffix in index['variants']:
+            assert diagram_name + suffix.replace('.svg', '.puml') in outputs, entry
+    names: List[str] = [entry[0] for entry in index['entries']]
+    assert names == sorted(names)
+    assert pen_entry in index['entries']
@@ -0,0 +1,69 @@
+from typing import Dict
+import os
+import threading
+
+import pytest
+
+from conftest import read_outputs, write_sources
+from revenger.bundle_tool import pack_directory
+from revenger.domain.diagram_creation import DiagramCreation
+from revenger.domain.logger import Logger
+from revenger.infrastructure.generic_classes import GenericOutputStore
+from revenger.infrastructure.output_store import OutputStoreFactory
+
+def read_bundle(bundle_file_name: str) -> Dict[str, bytes]:
+    store: GenericOutputStore = OutputStoreFactory.open_bundle(bundle_file_name)
+    contents: Dict[str, bytes] = {name: store.read(name) for name in store.get_names()}
+    store.close()
+    return contents
+
+@pytest.mark.parametrize('bundle', ['zip', 'sqlite'])
+def test_bundles_hold_the_diagrams_of_a_directory_run(source_dir, run_revenger, bundle):
+    expected: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'directory'))
+    out_dir: str = run_revenger(source_dir, 'bundle', '--bundle', bundle)
+    assert os.listdir(out_dir) == [f'diagrams.{bundle}']
+    assert read_bundle(os.path.join(out_dir, f'diagrams.{bundle}')) == expected
+
+def test_sqlite_bundles_are_written_into_any_directory(source_dir, run_revenger):
+    expected: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'directory'))
+    # ?, # and % have a meaning in the uri of the database
+    out_dir: str = run_revenger(source_dir, 'bundle #1?mode=ro%20', '--bundle', 'sqlite')
+    assert os.listdir(out_dir) == ['diagrams.sqlite']
+    assert read_bundle(os.path.join(out_dir, 'diagrams.sqlite')) == expected
+
+@pytest.mark.parametrize('bundle', ['zip', 'sqlite'])
+def test_bundles_do_not_keep_the_diagrams_of_the_previous_run(source_dir, run_revenger, tmp_path, bundle):
+    other_dir: str = write_sources(str(tmp_path / 'other'), {'other/model.py': 'class Model:\n    pass\n'})
+    expected: Dict[str, bytes] = read_outputs(run_revenger(other_dir, 'directory'))
+    run_revenger(source_dir, 'bundle', '--bundle', bundle)
+    out_dir: str = run_revenger(other_dir, 'bundle', '--bundle', bundle)
+    assert os.listdir(out_dir) == [f'diagrams.{bundle}']
+    assert read_bundle(os.path.join(out_dir, f'diagrams.{bundle}')) == expected
+
+@pytest.mark.parametrize('bundle', ['zip', 'sqlite'])
+def test_failed_runs_keep_the_previous_bundle(source_dir, run_revenger, monkeypatch, bundle):
+    out_dir: str = run_revenger(source_dir, 'bundle', '--bundle', bundle)
+    expected: Dict[str, bytes] = read_bundle(os.path.join(out_dir, f'diagrams.{bundle}'))
+    create_puml_files = DiagramCreation.create_puml_files
+    call_count: list = [0]
+    def create_puml_files_until_failed(self, *args):
+        call_count[0] += 1
+        if call_count[0] == 3:
+            raise RuntimeError('failed')
+        create_puml_files(self, *args)
+    monkeypatch.setattr(DiagramCreation, 'create_puml_files', create_puml_files_until_failed)
+    with pytest.raises(RuntimeError):
+        run_revenger(source_dir, 'bundle', '--bundle', bundle, '--write_workers', '4')
+    # The bundle being written is removed and the write-behind workers are stopped
+    assert os.listdir(out_dir) == [f'diagrams.{bundle}']
+    assert read_bundle(os.path.join(out_dir, f'diagrams.{bundle}')) == expected
+    assert not any(thread.name.startswith('write-behind') for thread in threading.enumerate())
+
+@pytest.mark.parametrize('bundle', ['zip', 'sqlite'])
+def test_pack_adds_files_to_a_bundle(source_dir, run_revenger, tmp_path, bundle):
+    bundle_file_name: str = os.path.join(run_revenger(source_dir, 'bundle', '--bundle', bundle), f'diagrams.{bundle}')
+    expected: Dict[str, bytes] = read_bundle(bundle_file_name)
+    svg_dir: str = write_sources(str(tmp_path / 'svg'), {'full-diagram-detailed.svg': '<svg/>', 'notes.txt': 'not packed'})
+    pack_directory(bundle_file_name, svg_dir, '*.svg', Logger())
+    expected['full-diagram-detailed.svg'] = b'<svg/>'
+    assert read_bundle(bundle_file_name) == expected
@@ -0,0 +1,40 @@
+from typing import Dict
+import ast
+import os
+
+from conftest import read_outputs, write_sources
+from revenger.cli import main
+from revenger.infrastructure.parse_cache import ParseCache
+from revenger.infrastructure.python_adapter import PythonAdapter
+
+def test_cache_is_bounded_by_tree_bytes(tmp_path):
+    source_dir: str = write_sources(str(tmp_path / 'sources'), {f'module_{index}.py': f'class Class{index}:\n    pass\n' for index in range(0, 3)})
+    file_names = [os.path.join(source_dir, f'module_{index}.py') for index in range(0, 3)]
+    parse_cache: ParseCache = ParseCache(2 * os.path.getsize(file_names[0]) * ParseCache.TREE_BYTES_PER_SOURCE_BYTE)
+    for file_name in file_names:
+        PythonAdapter.parse_file(file_name, parse_cache)
+    # Least recently used tree is dropped first
+    assert [key[0] for key in parse_cache.trees] == [os.path.realpath(file_name) for file_name in file_names[1:]]
+    assert parse_cache.cached_bytes <= parse_cache.max_bytes
+    tree: ast.Module = PythonAdapter.parse_file(file_names[1], parse_cache)
+    assert tree is parse_cache.get(ParseCache.get_key(file_names[1]))
+
+def test_modified_files_are_parsed_again(tmp_path):
+    source_dir: str = write_sources(str(tmp_path / 'sources'), {'module.py': 'class First:\n    pass\n'})
+    file_name: str = os.path.join(source_dir, 'module.py')
+    parse_cache: ParseCache = ParseCache(1024 * 1024)
+    PythonAdapter.parse_file(file_name, parse_cache)
+    with open(file_name, 'w') as file:
+        file.write('class Second:\n    pass\n')
+    assert PythonAdapter.parse_file(file_name, parse_cache).body[0].name == 'Second'
+
+def test_runs_sharing_a_cache_create_the_same_diagrams(source_dir, tmp_path):
+    parse_cache: ParseCache = ParseCache(1024 * 1024)
+    outputs: Dict[str, Dict[str, bytes]] = {}
+    for out_name, cache in [('uncached', None), ('first', parse_cache), ('second', parse_cache)]:
+        os.makedirs(str(tmp_path / out_name))
+        main(argv=['--from_dir', source_dir, '--out_dir', str(tmp_path / out_name), '--write_workers', '0'], parse_cache=cache)
+        outputs[out_name] = read_outputs(str(tmp_path / out_name))
+    assert len(parse_cache.trees) > 0
+    assert outputs['first'] == outputs['uncached']
+    assert outputs['second'] == outputs['uncached']
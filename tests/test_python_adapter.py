@@ -0,0 +1,99 @@
+from typing import Dict, List
+import os
+
+from conftest import read_outputs, write_sources
+from revenger.domain.datastructure import Datastructure
+from revenger.domain.datastructure import PythonLanguage
+from revenger.domain.diagram_creation import DiagramCreation
+from revenger.domain.logger import Logger
+from revenger.domain.saver import Saver
+from revenger.infrastructure.python_adapter import PythonAdapter
+
+NESTED_SOURCES: Dict[str, str] = {
+    'app/model.py': '''class Item:
+    pass
+
+class format:
+    pass
+''',
+    'app/reader.py': '''import ast
+from app.model import Item, format
+
+class Reader:
+    def read(self, file_name: str) -> None:
+        with open(file_name) as file:
+            tree: any = ast.parse(file.read())
+            if tree is not None:
+                items: dict = {}
+                self.item: Item = Item()
+        def parse(line: str) -> None:
+            parsed: Item = Item()
+        class Local:
+            value: Item
+        self.output: format = format()
+''',
+}
+
+def read_sources(source_dir: str) -> Datastructure:
+    logger: Logger = Logger()
+    datastructure: Datastructure = Datastructure(PythonLanguage(logger), logger)
+    source_file_names: List[str] = [os.path.join(directory, file_name) \
+        for directory, _, file_names in sorted(os.walk(source_dir)) for file_name in sorted(file_names)]
+    python_adapter: PythonAdapter = PythonAdapter(Saver(source_dir, logger), logger)
+    for file_name in source_file_names:
+        python_adapter.read_python_ast(datastructure, file_name, source_dir)
+    python_adapter.finalize(datastructure)
+    DiagramCreation(datastructure, Saver(source_dir, logger), logger).create_referenced_but_inexistent_classes(False)
+    return datastructure
+
+def get_variables(datastructure: Datastructure, class_name: str) -> Dict[str, str]:
+    return {variable.variable_name: variable.variable_type \
+        for variable in datastructure.get_datastructures_from_class_name(class_name).get_variable_fields()}
+
+def test_nested_functions_are_part_of_the_method(tmp_path):
+    datastructure: Datastructure = read_sources(write_sources(str(tmp_path / 'sources'), NESTED_SOURCES))
+    variables: Dict[str, str] = get_variables(datastructure, 'app.reader.Reader')
+    assert variables['read.parse.parsed'] == 'app.model.Item'
+    assert variables['self.output'] == 'app.model.format'
+    # Blocks of the method are not read, as before the visitor
+    assert 'self.item' not in variables
+    assert 'read.tree' not in variables
+    # Classes defined in a method are not part of the model
+    assert not datastructure.class_exists('app.reader.Local')
+    assert not datastructure.class_exists('app.reader.Reader.Local')
+
+def test_builtin_bases_keep_their_inheritance(tmp_path):
+    source_dir: str = write_sources(str(tmp_path / 'sources'), {'app/errors.py': \
+        'import ast\n\nclass ReadError(ValueError):\n    def __init__(self, node: ast.AST):\n        self.node: ast.AST = node\n'})
+    datastructure: Datastructure = read_sources(source_dir)
+    read_error: Datastructure.SubDataStructure = datastructure.get_datastructures_from_class_name('app.errors.ReadError')
+    assert read_error.get_base_classes() == ['app.errors.ValueError']
+    assert datastructure.class_exists('app.errors.ValueError')
+    # Dotted annotations are not imported
+    assert read_error.get_unsupported_members() == ['self.node']
+    assert [parameter.user_type for parameter in read_error.get_method_fields()[0].parameters] == ['**???**']
+
+def test_module_classes_shadow_builtin_names(tmp_path):
+    datastructure: Datastructure = read_sources(write_sources(str(tmp_path / 'sources'), NESTED_SOURCES))
+    assert get_variables(datastructure, 'app.reader.Reader')['self.output'] == 'app.model.format'
+
+def test_unsupported_members_are_reported_with_their_class(source_dir, run_revenger):
+    outputs = read_outputs(run_revenger(source_dir, 'out'))
+    warning: bytes = b"'WARNING: Will not import member named self.name"
+    full_diagram: List[bytes] = [line.strip() for line in outputs['full-diagram-detailed.puml'].split(b'\n')]
+    # Right before the class it belongs to, not in the header of all diagrams
+    assert full_diagram[full_diagram.index(warning) + 1].startswith(b'abstract class shapes.shape.Shape ')
+    assert warning in outputs['shapes.shape.Shape-diagram-detailed.puml']
+    assert warning not in outputs['shapes.shape.Shape-diagram-simplified.puml']
+    assert warning not in outputs['drawing.pen.Pen-diagram-detailed.puml']
+
+def test_files_without_class_statement_are_not_parsed(tmp_path):
+    source_dir: str = write_sources(str(tmp_path / 'sources'), {'app/helpers.py': 'def helper() -> None:\n    pass\n', \
+        'app/empty.py': '', 'app/__init__.py': '', 'app/indented.py': 'if True:\n    class Indented:\n        pass\n', \
+        'app/text.py': 'TEXT: str = "a class of its own"\n'})
+    assert PythonAdapter.parse_file(os.path.join(source_dir, 'app/helpers.py')) is None
+    assert PythonAdapter.parse_file(os.path.join(source_dir, 'app/empty.py')) is None
+    assert PythonAdapter.parse_file(os.path.join(source_dir, 'app/text.py')) is None
+    # Package init files may re-export classes
+    assert PythonAdapter.parse_file(os.path.join(source_dir, 'app/__init__.py')) is not None
+    assert PythonAdapter.parse_file(os.path.join(source_dir, 'app/indented.py')) is not None
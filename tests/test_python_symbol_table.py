@@ -0,0 +1,68 @@
+from typing import Dict
+import os
+
+from conftest import read_outputs, write_sources
+from test_python_adapter import read_sources, get_variables
+from revenger.domain.datastructure import Datastructure
+from revenger.infrastructure.python_symbol_table import PythonSymbolTable
+
+IMPORT_SOURCES: Dict[str, str] = {
+    'app/__init__.py': 'from app.model import Item\n',
+    'app/model.py': '''from enum import Enum
+from collections import OrderedDict as Ordered
+
+class Kind(Enum):
+    FIRST = 1
+
+class Item:
+    def __init__(self):
+        self.children: Ordered = Ordered()
+        self.kind: Kind = Kind.FIRST
+''',
+    'app/reader.py': '''from .model import Item as ModelItem
+from app import Item
+
+class Reader:
+    def __init__(self):
+        self.item: ModelItem = None
+        self.other: Item = None
+'''
+}
+
+def test_aliases_relative_imports_and_re_exports_are_resolved(tmp_path):
+    datastructure: Datastructure = read_sources(write_sources(str(tmp_path / 'sources'), IMPORT_SOURCES))
+    assert get_variables(datastructure, 'app.model.Item')['self.children'] == 'collections.OrderedDict'
+    variables: Dict[str, str] = get_variables(datastructure, 'app.reader.Reader')
+    assert variables['self.item'] == 'app.model.Item'
+    assert variables['self.other'] == 'app.model.Item'
+
+def test_imported_bases_are_shown_as_classes(tmp_path, run_revenger):
+    source_dir: str = write_sources(str(tmp_path / 'sources'), IMPORT_SOURCES)
+    full_diagram: bytes = read_outputs(run_revenger(source_dir, 'out'))['full-diagram-detailed.puml']
+    assert b'class enum.Enum [[enum.Enum-diagram-detailed.svg]] #MintCream {' in full_diagram
+    assert b'enum.Enum <|-- app.model.Kind' in full_diagram
+    assert b'class collections.OrderedDict [[collections.OrderedDict-diagram-detailed.svg]] #MintCream {' in full_diagram
+
+def test_resolution_is_memoized_per_module():
+    symbol_table: PythonSymbolTable = PythonSymbolTable(frozenset(['int']))
+    symbol_table.add_from_import('app.reader', 'model', 1, 'Item', None)
+    resolved_type: str = symbol_table.resolve('app.reader', 'Item')
+    assert resolved_type == 'app.model.Item'
+    assert symbol_table.resolve('app.reader', 'Item') is resolved_type
+    assert symbol_table.resolve('app.reader', 'int') == 'int'
+    assert symbol_table.resolved_types == {'app.reader': {'Item': 'app.model.Item', 'int': 'int'}}
+    # The memo of a module is dropped when its bindings change
+    symbol_table.add_from_import('app.reader', 'other', 1, 'Item', None)
+    assert 'app.reader' not in symbol_table.resolved_types
+    assert symbol_table.resolve('app.reader', 'Item') == 'app.other.Item'
+
+def test_shards_and_model_store_resolve_the_same_types(tmp_path, run_revenger):
+    source_dir: str = write_sources(str(tmp_path / 'sources'), IMPORT_SOURCES)
+    expected: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'plain'))
+    shard_dir: str = str(tmp_path / 'shards')
+    for shard in ['0/2', '1/2']:
+        run_revenger(source_dir, 'unused', '--ingest_shard', shard, '--shard_dir', shard_dir)
+    assert read_outputs(run_revenger(source_dir, 'merged', '--merge_shards', '--shard_dir', shard_dir)) == expected
+    model_store: str = os.path.join(str(tmp_path), 'model.sqlite')
+    run_revenger(source_dir, 'stored', '--model_store', model_store)
+    assert read_outputs(run_revenger(source_dir, 'reused', '--model_store', model_store, '--reuse_model_store')) == expected
@@ -0,0 +1,59 @@
+from typing import Dict, List
+import gzip
+import os
+import threading
+import time
+
+import pytest
+
+from conftest import read_outputs
+from test_svg_renderer import create_fake_plantuml, read_render_calls
+from revenger.domain.diagram_creation import DiagramCreation
+
+@pytest.mark.parametrize('render_workers', ['1', '3'])
+def test_rendered_runs_create_an_svg_file_per_diagram(source_dir, run_revenger, tmp_path, render_workers):
+    expected: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'plain'))
+    plantuml: str = create_fake_plantuml(str(tmp_path / 'bin'), 0)
+    outputs: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'rendered', '--render', '--plantuml', plantuml, \
+        '--no_render_cache', '--render_workers', render_workers))
+    assert {name: content for name, content in outputs.items() if not name.endswith('.svg')} == expected
+    puml_names: Dict[str, bytes] = {name: content for name, content in expected.items() if name.endswith('.puml')}
+    for name, content in puml_names.items():
+        assert outputs[name[0: -len('.puml')] + '.svg'] == f'<svg>{len(content.decode("utf-8"))}</svg>\n'.encode('utf-8'), name
+    # Files are rendered in batches, each file once
+    calls: List[List[str]] = read_render_calls(str(tmp_path / 'bin'))
+    assert len(calls) < len(puml_names)
+    assert sorted(name for call in calls for name in call[1:]) == sorted(puml_names)
+
+def test_compressed_rendered_runs_replace_the_files_by_compressed_ones(source_dir, run_revenger, tmp_path):
+    expected: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'plain', '--compress', 'svgz'))
+    plantuml: str = create_fake_plantuml(str(tmp_path / 'bin'), 0)
+    outputs: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'rendered', '--render', '--plantuml', plantuml, \
+        '--no_render_cache', '--compress', 'svgz'))
+    for name, content in expected.items():
+        if name.endswith('.puml'):
+            assert gzip.decompress(outputs[name + '.gz']) == content
+            assert gzip.decompress(outputs[name[0: -len('.puml')] + '.svgz']).startswith(b'<svg>')
+        else:
+            assert outputs[name] == content
+    assert not any(name.endswith(('.puml', '.svg')) for name in outputs)
+
+def test_failed_runs_kill_the_running_renders(source_dir, run_revenger, tmp_path, monkeypatch):
+    # Each file takes 5 s to render: the run fails once plantuml is started
+    plantuml: str = create_fake_plantuml(str(tmp_path / 'bin'), 5)
+    create_puml_files = DiagramCreation.create_puml_files
+    call_count: list = [0]
+    def create_puml_files_until_failed(self, *args):
+        call_count[0] += 1
+        if call_count[0] == 3:
+            while not os.path.isfile(str(tmp_path / 'bin' / 'calls')) or len(read_render_calls(str(tmp_path / 'bin'))) == 0:
+                time.sleep(0.05)
+            raise RuntimeError('failed')
+        create_puml_files(self, *args)
+    monkeypatch.setattr(DiagramCreation, 'create_puml_files', create_puml_files_until_failed)
+    with pytest.raises(RuntimeError):
+        run_revenger(source_dir, 'rendered', '--render', '--plantuml', plantuml, '--no_render_cache')
+    # The started batch is killed before writing any svg file and the queued files are not rendered
+    assert not any(name.endswith('.svg') for name in os.listdir(str(tmp_path / 'rendered')))
+    assert len(read_render_calls(str(tmp_path / 'bin'))) == 1
+    assert not any(thread.name.startswith('render-') for thread in threading.enumerate())
@@ -0,0 +1,71 @@
+from typing import Dict, List
+import json
+import os
+import tempfile
+
+import pytest
+
+from conftest import read_outputs
+from test_output_store import read_bundle
+from revenger.domain.diagram_creation import DiagramCreation
+from revenger.infrastructure.memory_budget import MemoryBudget
+from revenger.services.application_service import ApplicationService
+
+def test_write_workers_write_the_diagrams_of_a_synchronous_run(source_dir, run_revenger):
+    expected: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'synchronous'))
+    assert read_outputs(run_revenger(source_dir, 'write_behind', '--write_workers', '4')) == expected
+    assert read_outputs(run_revenger(source_dir, 'write_behind_skip', '--write_workers', '4', '--skip_uses_relation')) == \
+        read_outputs(run_revenger(source_dir, 'synchronous_skip', '--skip_uses_relation'))
+
+def test_write_workers_write_the_bundle_of_a_synchronous_run(source_dir, run_revenger):
+    expected: Dict[str, bytes] = read_bundle(os.path.join(run_revenger(source_dir, 'synchronous', '--bundle', 'sqlite'), 'diagrams.sqlite'))
+    assert read_bundle(os.path.join(run_revenger(source_dir, 'write_behind', '--bundle', 'sqlite', '--write_workers', '4'), \
+        'diagrams.sqlite')) == expected
+
+def test_negative_write_workers_are_rejected(source_dir, run_revenger, capsys):
+    with pytest.raises(SystemExit):
+        run_revenger(source_dir, 'negative', '--write_workers', '-1')
+    assert '--write_workers must be positive' in capsys.readouterr().err
+
+def test_memory_budget_runs_create_the_diagrams_of_an_unlimited_run(source_dir, run_revenger, tmp_path, monkeypatch, capsys):
+    os.makedirs(str(tmp_path / 'tmp'))
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path / 'tmp'))
+    expected: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'unlimited'))
+    assert read_outputs(run_revenger(source_dir, 'budget', '--memory_budget', '1g', '--write_workers', '4')) == expected
+    capsys.readouterr()
+    # The model does not fit in 2 kB: it is spilled to a temporary model store and the caches are released on each check
+    assert read_outputs(run_revenger(source_dir, 'spilled', '--memory_budget', '2k', '--write_workers', '4')) == expected
+    assert 'does not fit in the memory budget' in capsys.readouterr().out
+    assert os.listdir(str(tmp_path / 'tmp')) == []
+
+def test_failed_memory_budget_runs_remove_their_spilled_model(source_dir, run_revenger, tmp_path, monkeypatch):
+    os.makedirs(str(tmp_path / 'tmp'))
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path / 'tmp'))
+    create_memory_budget = ApplicationService.create_memory_budget
+    memory_budgets: List[MemoryBudget] = []
+    def create_recorded_memory_budget(*args):
+        result = create_memory_budget(*args)
+        memory_budgets.append(result[0])
+        return result
+    monkeypatch.setattr(ApplicationService, 'create_memory_budget', staticmethod(create_recorded_memory_budget))
+    def create_puml_files(self, *args):
+        raise RuntimeError('interrupted')
+    monkeypatch.setattr(DiagramCreation, 'create_puml_files', create_puml_files)
+    with pytest.raises(RuntimeError):
+        run_revenger(source_dir, 'spilled', '--memory_budget', '2k', '--write_workers', '4')
+    assert os.listdir(str(tmp_path / 'tmp')) == []
+    assert memory_budgets[0].on_pressure == []
+
+def test_events_follow_the_progress_of_the_run(source_dir, run_revenger, tmp_path):
+    expected: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'plain'))
+    events_file_name: str = str(tmp_path / 'events.jsonl')
+    assert read_outputs(run_revenger(source_dir, 'events', '--events', events_file_name)) == expected
+    with open(events_file_name) as file:
+        events: List[dict] = [json.loads(line) for line in file]
+    names: List[str] = [event['event'] for event in events]
+    assert names[0] == 'run_started' and names[-1] == 'run_completed'
+    assert names.index('files_discovered') < names.index('file_parsed') < names.index('model_completed') < \
+        names.index('slices_planned') < names.index('slice_completed')
+    parsed: List[dict] = [event for event in events if event['event'] == 'file_parsed']
+    assert [event['done'] for event in parsed] == list(range(1, len(parsed) + 1))
+    assert parsed[-1]['total'] == len(parsed) == 6
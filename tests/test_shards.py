@@ -0,0 +1,26 @@
+from typing import Dict
+
+from conftest import read_outputs
+
+def test_merged_shards_create_the_diagrams_of_a_single_run(source_dir, run_revenger, tmp_path):
+    expected: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'single'))
+    shard_dir: str = str(tmp_path / 'shards')
+    for shard in ['0/3', '1/3', '2/3']:
+        run_revenger(source_dir, 'ingested', '--ingest_shard', shard, '--shard_dir', shard_dir)
+    assert read_outputs(str(tmp_path / 'ingested')) == {}
+    assert read_outputs(run_revenger(source_dir, 'merged', '--merge_shards', '--shard_dir', shard_dir)) == expected
+
+def test_emitted_shards_create_the_diagrams_of_a_single_run(source_dir, run_revenger, tmp_path):
+    expected: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'single', '--skip_uses_relation'))
+    shard_dir: str = str(tmp_path / 'shards')
+    for shard in ['0/2', '1/2']:
+        run_revenger(source_dir, 'ingested', '--ingest_shard', shard, '--shard_dir', shard_dir)
+    # Each node writes its share of the diagrams into the shared output directory
+    first: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'emitted_first', '--skip_uses_relation', \
+        '--merge_shards', '--shard_dir', shard_dir, '--emit_shard', '0/2'))
+    second: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'emitted_second', '--skip_uses_relation', \
+        '--merge_shards', '--shard_dir', shard_dir, '--emit_shard', '1/2'))
+    assert len(first) > 0 and len(second) > 0
+    assert set(first).isdisjoint(second)
+    assert {**first, **second} == expected
+    assert 'full-diagram-detailed.puml' in first and 'full-diagram-detailed.puml' not in second
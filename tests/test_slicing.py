@@ -0,0 +1,57 @@
+from typing import Dict, Set
+import re
+
+from conftest import read_outputs, write_sources
+
+# An inheritance chain A <- B <- C <- D, B is used by User and uses Part
+CHAIN_SOURCES: Dict[str, str] = {
+    'chain/classes.py': '''class A:
+    pass
+
+class Part:
+    pass
+
+class B(A):
+    def __init__(self):
+        self.part: Part = Part()
+
+class C(B):
+    pass
+
+class D(C):
+    pass
+
+class User:
+    def use(self, b: B) -> None:
+        pass
+''',
+}
+
+def get_diagram_classes(outputs: Dict[str, bytes], class_name: str) -> Set[str]:
+    puml: str = outputs[f'chain.classes.{class_name}-diagram-detailed.puml'].decode('utf-8')
+    return {name[len('chain.classes.'):] for name in re.findall(r'^ *class (\S+) \[\[', puml, re.MULTILINE)}
+
+def test_slices_hold_the_classes_one_hop_away_by_default(run_revenger, tmp_path):
+    outputs: Dict[str, bytes] = read_outputs(run_revenger(write_sources(str(tmp_path / 'sources'), CHAIN_SOURCES), 'default'))
+    assert get_diagram_classes(outputs, 'D') == {'C', 'D'}
+    assert get_diagram_classes(outputs, 'B') == {'A', 'B', 'C', 'Part', 'User'}
+
+def test_slice_hops_are_given_per_direction(run_revenger, tmp_path):
+    source_dir: str = write_sources(str(tmp_path / 'sources'), CHAIN_SOURCES)
+    outputs: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'ancestors', '--slice_ancestors', '3'))
+    assert get_diagram_classes(outputs, 'D') == {'A', 'B', 'C', 'D'}
+    outputs = read_outputs(run_revenger(source_dir, 'descendants', '--slice_descendants', '2', '--slice_uses', '0', '--slice_used_by', '0'))
+    assert get_diagram_classes(outputs, 'B') == {'A', 'B', 'C', 'D'}
+    outputs = read_outputs(run_revenger(source_dir, 'none', '--slice_ancestors', '0', '--slice_descendants', '0', \
+        '--slice_uses', '0', '--slice_used_by', '0'))
+    assert get_diagram_classes(outputs, 'B') == {'B'}
+
+def test_slices_are_capped_with_base_classes_first(run_revenger, tmp_path):
+    source_dir: str = write_sources(str(tmp_path / 'sources'), CHAIN_SOURCES)
+    outputs: Dict[str, bytes] = read_outputs(run_revenger(source_dir, 'capped', '--slice_max_classes', '2'))
+    assert get_diagram_classes(outputs, 'B') == {'A', 'B'}
+    outputs = read_outputs(run_revenger(source_dir, 'capped_uses', '--slice_max_classes', '3'))
+    assert get_diagram_classes(outputs, 'B') == {'A', 'B', 'Part'}
+    # Derived classes come after the used classes and before the classes using them
+    outputs = read_outputs(run_revenger(source_dir, 'capped_hops', '--slice_max_classes', '4', '--slice_descendants', '2'))
+    assert get_diagram_classes(outputs, 'B') == {'A', 'B', 'C', 'Part'}
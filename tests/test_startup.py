@@ -0,0 +1,27 @@
+from typing import List
+import os
+import subprocess
+import sys
+
+from build_zipapp import LAZY_MODULE_NAMES
+
+ROOT_DIR: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def get_imported_module_names(code: str) -> List[str]:
+    # Modules loaded by code in a fresh interpreter
+    result = subprocess.run([sys.executable, '-c', code + '\nprint(" ".join(sorted(sys.modules)))'], cwd=ROOT_DIR, \
+        capture_output=True, text=True, check=True)
+    return result.stdout.strip().split('\n')[-1].split(' ')
+
+def test_cli_does_not_import_the_services():
+    module_names: List[str] = get_imported_module_names('import sys\nimport revenger.cli')
+    assert 'revenger.cli' in module_names
+    assert [module_name for module_name in LAZY_MODULE_NAMES if module_name in module_names] == []
+
+def test_cli_help_does_not_import_the_services():
+    module_names: List[str] = get_imported_module_names('import sys\nfrom revenger.cli import main\ntry:\n' + \
+        '    main(argv=["--help"])\nexcept SystemExit:\n    pass')
+    assert [module_name for module_name in LAZY_MODULE_NAMES if module_name in module_names] == []
+
+def test_domain_does_not_import_the_output_stores():
+    assert 'revenger.infrastructure.output_store' not in get_imported_module_names('import sys\nimport revenger.domain.diagram_creation')
@@ -0,0 +1,89 @@
+from typing import List
+import os
+import stat
+import sys
+
+from conftest import write_sources
+from revenger.domain.logger import Logger
+from revenger.infrastructure.svg_renderer import PlantUmlRenderer, RenderCache
+
+FAKE_PLANTUML: str = '''#!{python}
+# Renders each puml file in {delay} s, or 5 s when it contains "slow", and logs its calls
+import os
+import sys
+import time
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'calls'), 'a') as calls:
+    calls.write(' '.join(sys.argv[1:]) + '\\n')
+if sys.argv[1] == '-version':
+    print('PlantUML version 9.9 (fake)')
+    sys.exit(0)
+for name in sys.argv[2:]:
+    with open(name) as file:
+        content = file.read()
+    time.sleep(5 if 'slow' in content else {delay})
+    with open(name[0: -len('.puml')] + '.svg', 'w') as file:
+        file.write('<svg>' + str(len(content)) + '</svg>\\n')
+'''
+
+def create_fake_plantuml(directory: str, delay: float = 0.4) -> str:
+    file_name: str = os.path.join(write_sources(directory, {'plantuml': FAKE_PLANTUML.format(python=sys.executable, delay=delay)}), 'plantuml')
+    os.chmod(file_name, os.stat(file_name).st_mode | stat.S_IEXEC)
+    return file_name
+
+def read_render_calls(directory: str) -> List[List[str]]:
+    with open(os.path.join(directory, 'calls')) as calls:
+        return [line.split() for line in calls if not line.startswith('-version')]
+
+def test_render_timeout_is_given_per_diagram(tmp_path):
+    plantuml: str = create_fake_plantuml(str(tmp_path / 'bin'))
+    render_dir: str = write_sources(str(tmp_path / 'render'), {f'diagram-{index}.puml': '@startuml\n@enduml\n' for index in range(0, 4)})
+    renderer: PlantUmlRenderer = PlantUmlRenderer(plantuml, None, Logger(), 'fake', 1)
+    # The 4 files take 1.6 s, more than the timeout of one diagram
+    assert renderer.render_directory(render_dir) == 0
+    assert len(read_render_calls(str(tmp_path / 'bin'))) == 1
+    assert renderer.rendered_count == 4
+
+def test_diagrams_over_the_timeout_are_replaced_by_placeholders(tmp_path):
+    plantuml: str = create_fake_plantuml(str(tmp_path / 'bin'))
+    render_dir: str = write_sources(str(tmp_path / 'render'), {'a-fast.puml': '@startuml\n@enduml\n', \
+        'b-fast.puml': '@startuml\n@enduml\n', 'c-slow.puml': '@startuml\n\' slow\n@enduml\n'})
+    renderer: PlantUmlRenderer = PlantUmlRenderer(plantuml, None, Logger(), 'fake', 1)
+    assert renderer.render_directory(render_dir) == 1
+    # The batch timed out after 3 s, only the file not yet rendered is retried
+    assert [call[1:] for call in read_render_calls(str(tmp_path / 'bin'))] == [['a-fast.puml', 'b-fast.puml', 'c-slow.puml'], ['c-slow.puml']]
+    with open(os.path.join(render_dir, 'c-slow.svg')) as file:
+        assert 'could not be rendered within 1 s' in file.read()
+    with open(os.path.join(render_dir, 'a-fast.svg')) as file:
+        assert file.read() == '<svg>18</svg>\n'
+
+def test_render_cache_renders_identical_diagrams_once(tmp_path):
+    plantuml: str = create_fake_plantuml(str(tmp_path / 'bin'))
+    render_cache: RenderCache = RenderCache(str(tmp_path / 'cache'), 1024 * 1024, Logger())
+    first_dir: str = write_sources(str(tmp_path / 'first'), {'a.puml': '@startuml\n@enduml\n', 'b.puml': '@startuml\n\' b\n@enduml\n'})
+    assert PlantUmlRenderer(plantuml, render_cache, Logger()).render_directory(first_dir) == 0
+    # Another run (or branch) with one diagram changed
+    second_dir: str = write_sources(str(tmp_path / 'second'), {'a.puml': '@startuml\n@enduml\n', 'b.puml': '@startuml\n\' c\n@enduml\n'})
+    renderer: PlantUmlRenderer = PlantUmlRenderer(plantuml, render_cache, Logger())
+    assert renderer.render_directory(second_dir) == 0
+    assert (renderer.cached_count, renderer.rendered_count) == (1, 1)
+    # The version is detected once and kept in the cache
+    with open(os.path.join(str(tmp_path / 'bin'), 'calls')) as calls:
+        assert [line.split()[0] for line in calls].count('-version') == 1
+    assert [call[1:] for call in read_render_calls(str(tmp_path / 'bin'))] == [['a.puml', 'b.puml'], ['b.puml']]
+    with open(os.path.join(second_dir, 'a.svg')) as file:
+        assert file.read() == '<svg>18</svg>\n'
+
+def test_render_cache_evicts_the_least_recently_used_files(tmp_path):
+    render_cache: RenderCache = RenderCache(str(tmp_path / 'cache'), 2 * len('<svg/>\n'), Logger())
+    svg_file_name: str = os.path.join(write_sources(str(tmp_path / 'render'), {'diagram.svg': '<svg/>\n'}), 'diagram.svg')
+    keys: List[str] = [RenderCache.get_key(content, 'fake', PlantUmlRenderer.RENDER_OPTIONS) for content in [b'a', b'b', b'c']]
+    for key in keys:
+        render_cache.store(key, svg_file_name)
+    for index, key in enumerate(keys):
+        cached_file_name: str = os.path.join(str(tmp_path / 'cache'), key[0: 2], f'{key}.svg')
+        os.utime(cached_file_name, (1000 + index, 1000 + index))
+    # b is the least recently used file after a is fetched
+    assert render_cache.fetch(keys[0], str(tmp_path / 'used.svg'))
+    render_cache.evict()
+    fetched: List[bool] = [render_cache.fetch(key, str(tmp_path / f'fetched-{index}.svg')) for index, key in enumerate(keys)]
+    assert fetched == [True, False, True]